@@ -1,24 +1,28 @@
 # backend/agent.py
 
 import os
-from typing import List
-
-from langchain.agents import initialize_agent, Tool
-from langchain.memory import ConversationBufferMemory
-from langchain_openai import ChatOpenAI
-from langchain.agents.agent_types import AgentType
+from functools import lru_cache
 from rag import get_retriever
 from scoring import adaptive_score, score_answer
-from behavior_logs import get_recent as fetch_engagement
+from llm_gateway import CHAT_MODEL, REQUEST_TIMEOUT, MAX_ATTEMPTS
+from providers import langchain_chat_model
 
 # ─── 1) LLM Setup ─────────────────────────────────────────────
-llm = ChatOpenAI(temperature=0.7, model="gpt-4o")
+# LangChain agents need their own chat model; keep provider, timeouts and retries in line with llm_gateway.
+# LangChain is only imported when the first agent is built.
+@lru_cache(maxsize=None)
+def get_llm():
+    return langchain_chat_model(temperature=0.7, model=CHAT_MODEL, timeout=REQUEST_TIMEOUT, max_retries=MAX_ATTEMPTS - 1)
 
 # ─── 2) Memory for Personalization ────────────────────────────
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+@lru_cache(maxsize=None)
+def get_memory():
+    from langchain.memory import ConversationBufferMemory
+    return ConversationBufferMemory(memory_key="chat_history", return_messages=True)
 
 # ─── 3) Resume Retrieval Tool ─────────────────────────────────
 def make_resume_tool(candidate_id: str):
+    from langchain.agents import Tool
     retriever = get_retriever(candidate_id)
     def fetch(query: str):
         docs = retriever.get_relevant_documents(query)
@@ -31,24 +35,14 @@ def make_resume_tool(candidate_id: str):
 
 # ─── 4) Agent Initialization Function ─────────────────────────
 def build_interview_agent(candidate_id: str):
+    from langchain.agents import initialize_agent
+    from langchain.agents.agent_types import AgentType
     resume_tool = make_resume_tool(candidate_id)
 
     return initialize_agent(
         tools=[resume_tool],
-        llm=llm,
+        llm=get_llm(),
         agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,
-        memory=memory,
+        memory=get_memory(),
         verbose=True
     )
-
-# ─── 5) Adaptive Tone Computation ─────────────────────────────
-async def compute_tone(session_id: str, limit: int = 3) -> str:
-    scores: List[float] = await fetch_engagement(session_id, limit)
-    if not scores:
-        return "neutral"
-    avg = sum(scores) / len(scores)
-    return (
-        "confident" if avg > 0.85 else
-        "hesitant"  if avg > 0.5 else
-        "nervous"
-    )
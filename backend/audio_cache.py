@@ -0,0 +1,207 @@
+# backend/audio_cache.py
+
+import os
+import asyncio
+import time
+import hashlib
+import logging
+import tempfile
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+AUDIO_DIR     = os.getenv("TTS_CACHE_DIR", "./tts_cache")
+MAX_BYTES     = int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024)
+PREWARM_LIMIT = 4   # concurrent syntheses while pre-warming
+STALE_TMP_SECONDS = 300   # *.tmp files older than this are leftovers of an interrupted write
+
+# ─── Disk-Backed LRU Audio Cache ────────────────────────────────
+class AudioCache:
+    """
+    mp3 files on disk, indexed in memory by key → size in LRU order.
+
+    • The directory is scanned once, by load() at startup (lazily if never called).
+    • Total size is kept under `max_bytes`; least recently used files go first,
+      except pinned keys (pre-warmed static phrases).
+    • Writes go to a temp file and are renamed into place, so readers never
+      see a partial mp3.
+    • Concurrent misses for the same key share one synthesis (single-flight).
+    """
+
+    def __init__(self, directory: str = AUDIO_DIR, max_bytes: int = MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._pinned: Set[str] = set()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}      # callers awaiting each in-flight synthesis
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    @staticmethod
+    def key(text: str, voice: str, model: str = "") -> str:
+        return hashlib.sha256(f"{model}:{voice}:{text}".encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def lookup(self, key: str) -> Optional[str]:
+        self._ensure_loaded()
+        if key not in self._index:
+            return None
+        path = self.path(key)
+        if not os.path.exists(path):
+            # Removed behind our back — forget it and treat as a miss
+            self._bytes -= self._index.pop(key)
+            return None
+        self._index.move_to_end(key)
+        return path
+
+    async def get_or_create(self, text: str, voice: str, synth: Callable[[], Awaitable[bytes]],
+                            pin: bool = False, abandon: bool = False, model: str = "") -> str:
+        """
+        Path to the cached mp3 for (model, voice, text), synthesizing it at most once.
+        With `abandon`, cancelling this caller also cancels the synthesis unless
+        another caller is waiting for it (speculative pre-synthesis).
+        """
+        key = self.key(text, voice, model)
+        if pin:
+            self._pinned.add(key)
+
+        path = self.lookup(key)
+        if path:
+            self.hits += 1
+            return path
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Own task, so a cancelled caller doesn't abort a synthesis others are waiting on
+            task = self._inflight[key] = asyncio.create_task(self._fill(key, synth))
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if abandon and self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    async def read(self, text: str, voice: str, synth: Callable[[], Awaitable[bytes]],
+                   pin: bool = False, model: str = "") -> bytes:
+        path = await self.get_or_create(text, voice, synth, pin=pin, model=model)
+        with open(path, "rb") as f:
+            return f.read()
+
+    async def prewarm(self, texts: Iterable[str], voice: str, synth_for: Callable[[str], Awaitable[bytes]],
+                      model: str = "") -> int:
+        """Synthesize and pin static phrases so they are never evicted."""
+        limit = asyncio.Semaphore(PREWARM_LIMIT)
+
+        async def warm(text: str) -> bool:
+            async with limit:
+                try:
+                    await self.get_or_create(text, voice, lambda: synth_for(text), pin=True, model=model)
+                    return True
+                except Exception as e:
+                    logger.warning(f"[TTS] Pre-warm failed for {text[:40]!r}: {e}")
+                    return False
+
+        results = await asyncio.gather(*(warm(t) for t in dict.fromkeys(texts)))
+        return sum(results)
+
+    def stats(self) -> dict:
+        self._ensure_loaded()
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries":    len(self._index),
+            "bytes":      self._bytes,
+            "max_bytes":  self.max_bytes,
+            "pinned":     len(self._pinned),
+            "hits":       self.hits,
+            "misses":     self.misses,
+            "coalesced":  self.coalesced,
+            "evictions":  self.evictions,
+            "hit_rate":   round((self.hits + self.coalesced) / lookups, 3) if lookups else None,
+            "inflight":   len(self._inflight),
+        }
+
+    async def _fill(self, key: str, synth: Callable[[], Awaitable[bytes]]) -> str:
+        audio = await synth()
+        path = await asyncio.to_thread(self._write_atomic, key, audio)
+        self._add(key, len(audio))
+        return path
+
+    def _write_atomic(self, key: str, data: bytes) -> str:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f"{os.getpid()}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            path = self.path(key)
+            os.replace(tmp, path)
+            return path
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _add(self, key: str, size: int) -> None:
+        if key in self._index:
+            self._bytes -= self._index.pop(key)
+        self._index[key] = size
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        for key in list(self._index):
+            if self._bytes <= self.max_bytes:
+                break
+            if key in self._pinned or key in self._inflight:
+                continue
+            size = self._index.pop(key)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def load(self) -> None:
+        """Index the files already on disk (blocking; the app runs it in its lifespan)."""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        stale = time.time() - STALE_TMP_SECONDS
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(".tmp"):
+                # Other workers share the directory: only remove what no write can still be renaming
+                try:
+                    if entry.stat().st_mtime < stale:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+            elif entry.name.endswith(".mp3"):
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name[:-4], st.st_size))
+        for _, key, size in sorted(entries):   # oldest first = least recently used
+            self._index[key] = size
+            self._bytes += size
+        self._loaded = True
+        self._evict()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+audio_cache = AudioCache()
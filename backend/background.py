@@ -0,0 +1,35 @@
+# backend/background.py
+
+import asyncio
+import logging
+from typing import Coroutine, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Strong references keep fire-and-forget tasks alive until they finish
+_tasks: Set[asyncio.Task] = set()
+
+def spawn(coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+    """Run `coro` off the request's critical path; drained on shutdown."""
+    task = asyncio.create_task(coro, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_finished)
+    return task
+
+def _finished(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed", exc_info=task.exception())
+
+def pending() -> int:
+    return len(_tasks)
+
+async def drain(timeout: float = 30.0) -> None:
+    """Wait for outstanding background work (e.g. answer scoring) before shutdown."""
+    if not _tasks:
+        return
+    logger.info(f"⏳ Waiting for {len(_tasks)} background tasks...")
+    done, still_running = await asyncio.wait(set(_tasks), timeout=timeout)
+    for task in still_running:
+        logger.warning(f"Background task {task.get_name()} did not finish before shutdown")
+        task.cancel()
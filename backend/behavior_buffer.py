@@ -0,0 +1,99 @@
+# backend/behavior_buffer.py
+
+import os
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from db import database, behavior_logs
+
+logger = logging.getLogger(__name__)
+
+# ─── Tunables ───────────────────────────────────────────────────
+FLUSH_SIZE     = int(os.getenv("BEHAVIOR_FLUSH_SIZE", "500"))
+FLUSH_INTERVAL = float(os.getenv("BEHAVIOR_FLUSH_INTERVAL", "1.0"))
+MAX_PENDING    = int(os.getenv("BEHAVIOR_MAX_PENDING", "50000"))
+
+# ─── Write-Behind Buffer ────────────────────────────────────────
+class BehaviorBuffer:
+    """
+    Collects behavior_logs rows in memory and writes them as multi-row
+    INSERTs once `flush_size` rows are pending or `flush_interval` seconds
+    have passed, whichever comes first.
+    """
+
+    def __init__(self, flush_size: int = FLUSH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 max_pending: int = MAX_PENDING):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._rows: List[Dict] = []
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def add(self, rows: List[Dict]) -> None:
+        self._rows.extend(rows)
+        overflow = len(self._rows) - self.max_pending
+        if overflow > 0:
+            # Shed the oldest frames rather than grow without bound while the DB is down
+            del self._rows[:overflow]
+            self.dropped += overflow
+            logger.warning(f"[⚠] Behavior buffer full — dropped {overflow} oldest rows")
+        if len(self._rows) >= self.flush_size:
+            self._full.set()
+        self._ensure_running()
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            written = 0
+            for i in range(0, len(rows), self.flush_size):
+                batch = rows[i:i + self.flush_size]
+                try:
+                    await database.execute(behavior_logs.insert().values(batch))
+                    written += len(batch)
+                except Exception as e:
+                    logger.warning(f"Behavior flush failed, re-queueing {len(rows) - i} rows: {e}")
+                    self._rows[:0] = rows[i:]
+                    break
+            return written
+
+    def start(self) -> None:
+        self._ensure_running()
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._task.get_loop() is not loop:
+            # Bound to a previous event loop (reload / test runner) — start over
+            self._full, self._lock = asyncio.Event(), asyncio.Lock()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            if self._rows:
+                await self.flush()
+
+behavior_buffer = BehaviorBuffer()
@@ -1,39 +1,39 @@
 # backend/behavior_logs.py
 
 from db import database
-from typing import List, Dict
+from engagement import engagement_tracker
+from typing import List
 import logging
 
 logger = logging.getLogger(__name__)
 
-# ─── Helper: Engagement Scoring ────────────────────────────────
-def compute_engagement_score(row: Dict) -> float:
-    score = 1.0
-
-    if not row.get("face_present"):
-        score -= 0.5
-    if row.get("emotion") in ["neutral", "sad", "angry", "disgusted"]:
-        score -= 0.3
-    if row.get("gaze_direction") in ["away", "down"]:
-        score -= 0.2
-
-    return max(0.0, min(1.0, score))
-
-# ─── Used by /agent.py → compute_tone ───────────────────────────
+# ─── Used by tone.compute_tone and coaching_trigger.get_hint ──
 async def get_recent(session_id: str, limit: int = 3) -> List[float]:
     """
-    Fetch the last `limit` engagement rows and compute score from emotion/gaze/face.
+    Return the last `limit` engagement scores (newest first).
+
+    Served from the in-memory rolling window that /log-behavior keeps up to
+    date; the DB is only queried on a cold miss, which also warms the window.
+    Scores are the ones computed at ingest time, so hints and tone agree.
     """
+    scores = engagement_tracker.recent(session_id, limit)
+    if scores is not None:
+        return scores
+
     query = """
-        SELECT engagement_score, emotion, face_present, gaze_direction
+        SELECT engagement_score
         FROM behavior_logs
         WHERE session_id = :sid
         ORDER BY timestamp DESC
         LIMIT :lim
     """
     try:
-        rows = await database.fetch_all(query, {"sid": session_id, "lim": limit})
-        return [compute_engagement_score(r) for r in rows]
+        rows = await database.fetch_all(query, {"sid": session_id, "lim": max(limit, engagement_tracker.window)})
+        scores = [r["engagement_score"] for r in rows]
+        if scores:
+            # An empty seed would hide frames logged through another worker until the idle TTL
+            engagement_tracker.seed(session_id, scores)
+        return scores[:limit]
     except Exception as e:
         logger.warning(f"Failed to fetch engagement logs: {e}")
         return []
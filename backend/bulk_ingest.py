@@ -0,0 +1,332 @@
+# backend/bulk_ingest.py
+"""
+Bulk resume ingestion for pre-loading candidate pools.
+
+    python bulk_ingest.py ./resumes/ [more.pdf ...] [--manifest ./resumes/.ingested.jsonl]
+
+PDFs are parsed in parallel across cores, chunks from many resumes are packed
+into full embedding batches, and vectors are written to Chroma in large
+upserts. Every fully written resume is appended to a JSONL manifest, so an
+interrupted run picks up where it stopped.
+"""
+
+import os
+import sys
+import shutil
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import argparse
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import sqlalchemy
+import llm_gateway
+import rag
+from db import database, get_engine, interview_sessions, candidate_resumes
+
+logger = logging.getLogger(__name__)
+
+EMBED_PARALLEL = int(os.getenv("BULK_EMBED_PARALLEL", "4"))   # embedding batches in flight
+MANIFEST_NAME  = ".ingested.jsonl"
+
+# ─── Progress Report ────────────────────────────────────────────
+class BulkReport:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = "running"
+        self.files_total = self.files_done = self.files_skipped = self.files_failed = 0
+        self.pages = self.chunks = 0
+        self.errors: List[str] = []
+        self.started = time.time()
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        elapsed = max((self.finished or time.time()) - self.started, 1e-9)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_skipped": self.files_skipped,
+            "files_failed": self.files_failed,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "elapsed": round(elapsed, 3),
+            "pages_per_sec": round(self.pages / elapsed, 2),
+            "chunks_per_sec": round(self.chunks / elapsed, 2),
+            "errors": self.errors[-20:],
+        }
+
+# ─── Worker-Process Side ────────────────────────────────────────
+def parse_file(path: str) -> Tuple[str, str, List[str], int]:
+    """(path, sha256, chunk texts, page count) — runs in a worker process."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    texts, pages = rag.parse_and_split(path)
+    return path, digest, texts, pages
+
+def candidate_id_for(digest: str) -> str:
+    # Deterministic, so re-running an interrupted load upserts the same ids
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, f"resume:{digest}"))
+
+# ─── Manifest ───────────────────────────────────────────────────
+def load_manifest(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["file"])
+            except (ValueError, KeyError):
+                continue   # torn last line from an interrupted write
+    return done
+
+def append_manifest(path: str, entries: List[dict]) -> None:
+    with open(path, "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+# ─── Pipeline ───────────────────────────────────────────────────
+class _Pipeline:
+    def __init__(self, manifest_path: str, report: BulkReport):
+        self.manifest_path = manifest_path
+        self.report = report
+        self.queue: List[Tuple[str, int, str]] = []          # (resume_hash, chunk_id, text)
+        self.written: List[Tuple[str, int, str, List[float]]] = []
+        self.remaining: Dict[str, int] = {}                   # resume_hash → chunks not yet written
+        self.files: Dict[str, dict] = {}                      # resume_hash → manifest entry
+        self.duplicates: Dict[str, List[dict]] = {}           # resume_hash → entries of other paths, same content
+        self.completed: Set[str] = set()                      # resume_hashes recorded in this run
+        self.ready: List[dict] = []                           # duplicates of completed resumes, to record
+        self.embed_slots = asyncio.Semaphore(EMBED_PARALLEL)
+        self.embedding: Set[asyncio.Task] = set()
+        self.write_lock = asyncio.Lock()
+        self.write_batch = rag.get_chroma_client().get_max_batch_size()
+
+    def add_file(self, path: str, digest: str, texts: List[str], pages: int, indexed: bool = False) -> None:
+        """Queue a parsed resume; `indexed` ones (same PDF stored before) only get linked."""
+        self.report.pages += pages
+        entry = {"file": path, "candidate_id": candidate_id_for(digest), "sha256": digest,
+                 "pages": pages, "chunks": len(texts), "deduplicated": indexed}
+        if digest in self.files:
+            # Same document under another path in this run: recorded with the first copy, embedded once
+            entry.update(deduplicated=True, duplicate_of=self.files[digest]["file"])
+            if digest in self.completed:
+                self.ready.append(entry)
+            else:
+                self.duplicates.setdefault(digest, []).append(entry)
+            return
+        self.files[digest] = entry
+        self.remaining[digest] = 0 if indexed else len(texts)
+        if not indexed:
+            self.queue.extend((digest, i, t) for i, t in enumerate(texts))
+
+    def unfinished(self) -> int:
+        """Files (duplicates included) whose resume was not fully written."""
+        return sum(1 + len(self.duplicates.get(digest, ())) for digest in self.remaining)
+
+    async def pump(self, final: bool = False) -> None:
+        """Start embedding full batches (or everything left, when `final`)."""
+        while len(self.queue) >= llm_gateway.EMBED_BATCH or (final and self.queue):
+            batch = self.queue[:llm_gateway.EMBED_BATCH]
+            del self.queue[:llm_gateway.EMBED_BATCH]
+            await self.embed_slots.acquire()
+            task = asyncio.create_task(self._embed(batch))
+            self.embedding.add(task)
+            task.add_done_callback(self.embedding.discard)
+        if final:
+            if self.embedding:
+                await asyncio.gather(*self.embedding)
+            await self.write(force=True)
+        await self.complete_files()
+
+    async def _embed(self, batch) -> None:
+        try:
+            vectors = await llm_gateway.embed([text for _, _, text in batch])
+            self.written.extend((cid, i, text, v) for (cid, i, text), v in zip(batch, vectors))
+        except Exception as e:
+            self.fail({digest for digest, _, _ in batch}, f"embedding failed: {e}")
+        finally:
+            self.embed_slots.release()
+        await self.write()
+
+    def fail(self, digests: Set[str], error: str) -> None:
+        self.report.errors.append(f"{error} ({len(digests)} resumes)")
+        for digest in digests:
+            self.remaining[digest] = -1   # never reaches zero → not recorded, retried next run
+
+    async def write(self, force: bool = False) -> None:
+        async with self.write_lock:
+            while len(self.written) >= self.write_batch or (force and self.written):
+                rows = self.written[:self.write_batch]
+                del self.written[:self.write_batch]
+                try:
+                    collection = rag.get_or_create_collection()
+                    await asyncio.to_thread(
+                        collection.upsert,
+                        ids=[f"{digest}_{i}" for digest, i, _, _ in rows],
+                        documents=[text for _, _, text, _ in rows],
+                        metadatas=[{"resume_hash": digest, "chunk_id": i, "chunk_hash": rag.chunk_hash(text)}
+                                   for digest, i, text, _ in rows],
+                        embeddings=[v for _, _, _, v in rows],
+                    )
+                except Exception as e:
+                    # Every resume with a row in this upsert, not just the batch that triggered it
+                    self.fail({digest for digest, _, _, _ in rows}, f"vector store write failed: {e}")
+                    continue
+                self.report.chunks += len(rows)
+                for digest, _, _, _ in rows:
+                    if self.remaining.get(digest, -1) > 0:
+                        self.remaining[digest] -= 1
+
+    async def complete_files(self) -> None:
+        entries, self.ready = self.ready, []
+        for digest in [digest for digest, left in self.remaining.items() if left == 0]:
+            del self.remaining[digest]
+            self.completed.add(digest)
+            entries.append(self.files[digest])
+            entries.extend(self.duplicates.pop(digest, ()))
+        if not entries:
+            return
+        await create_sessions(entries)
+        append_manifest(self.manifest_path, entries)
+        self.report.files_done += len(entries)
+
+async def create_sessions(entries: List[dict]) -> None:
+    """One interview session per resume (not per copy of it), linked to its stored chunks."""
+    unique = list({e["candidate_id"]: e for e in reversed(entries)}.values())   # first path wins
+    ids = [e["candidate_id"] for e in unique]
+    existing = {r["id"] for r in await database.fetch_all(
+        sqlalchemy.select(interview_sessions.c.id).where(interview_sessions.c.id.in_(ids))
+    )}
+    new = [e for e in unique if e["candidate_id"] not in existing]
+    if not new:
+        return
+    now = datetime.utcnow()
+    await database.execute(interview_sessions.insert().values([
+        {
+            "id": e["candidate_id"],
+            "created_at": now,
+            "candidate_name": os.path.splitext(os.path.basename(e["file"]))[0],
+            "job_role": None,
+            "resume_file": os.path.basename(e["file"]),
+        }
+        for e in new
+    ]))
+    await database.execute(candidate_resumes.insert().values([
+        {"candidate_id": e["candidate_id"], "resume_hash": e["sha256"], "created_at": now} for e in new
+    ]))
+
+def collect_pdfs(inputs: List[str]) -> List[str]:
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                paths.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(".pdf"))
+        elif item.lower().endswith(".pdf"):
+            paths.append(item)
+    return [os.path.abspath(p) for p in paths]
+
+async def run_bulk(paths: List[str], manifest_path: str, report: BulkReport,
+                   executor: Optional[Executor] = None) -> BulkReport:
+    """Ingest `paths`, skipping files already recorded in `manifest_path`."""
+    done = load_manifest(manifest_path)
+    todo = [p for p in paths if p not in done]
+    report.files_total = len(paths)
+    report.files_skipped = len(paths) - len(todo)
+
+    pipeline = _Pipeline(manifest_path, report)
+    loop = asyncio.get_running_loop()
+    parses = [loop.run_in_executor(executor, parse_file, p) for p in todo]
+    try:
+        for next_parsed in asyncio.as_completed(parses):
+            try:
+                path, digest, texts, pages = await next_parsed
+            except Exception as e:
+                report.files_failed += 1
+                report.errors.append(str(e))
+                continue
+            indexed = await asyncio.to_thread(rag.resume_indexed, digest)
+            pipeline.add_file(path, digest, texts, pages, indexed=indexed)
+            await pipeline.pump()
+        await pipeline.pump(final=True)
+        # Completed files have left `remaining`; anything still there was not fully written
+        report.files_failed += pipeline.unfinished()
+        report.status = "done"
+    except BaseException:
+        report.status = "interrupted"
+        raise
+    finally:
+        report.finished = time.time()
+    return report
+
+# ─── Background Jobs (admin endpoint) ───────────────────────────
+_jobs: Dict[str, BulkReport] = {}
+
+def get_job(job_id: str) -> Optional[BulkReport]:
+    return _jobs.get(job_id)
+
+async def run_job(job_id: str, directory: str, executor: Optional[Executor] = None) -> BulkReport:
+    """Ingest every PDF under `directory`; the manifest lives next to them so the job can be resumed."""
+    report = _jobs[job_id] = BulkReport(job_id)
+    try:
+        await run_bulk(collect_pdfs([directory]), os.path.join(directory, MANIFEST_NAME), report, executor)
+        # Uploads are only removed once every file is recorded in the manifest
+        if report.status == "done" and report.files_failed == 0:
+            shutil.rmtree(directory, ignore_errors=True)
+    except Exception as e:
+        report.status = "failed"
+        report.errors.append(str(e))
+        logger.exception(f"Bulk ingestion {job_id} failed")
+    logger.info(f"📦 Bulk ingestion {job_id}: {report.to_dict()}")
+    return report
+
+# ─── CLI ────────────────────────────────────────────────────────
+async def _main(args) -> None:
+    paths = collect_pdfs(args.inputs)
+    manifest = args.manifest or os.path.join(
+        args.inputs[0] if os.path.isdir(args.inputs[0]) else os.path.dirname(os.path.abspath(args.inputs[0])),
+        MANIFEST_NAME,
+    )
+    report = BulkReport(job_id="cli")
+
+    async def progress():
+        while True:
+            await asyncio.sleep(args.report_every)
+            r = report.to_dict()
+            print(f"… {r['files_done']}/{r['files_total'] - r['files_skipped']} files, "
+                  f"{r['pages_per_sec']} pages/s, {r['chunks_per_sec']} chunks/s", flush=True)
+
+    await asyncio.to_thread(get_engine)   # fails fast without DATABASE_URL; applies pending migrations
+    await database.connect()
+    ticker = asyncio.create_task(progress())
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            await run_bulk(paths, manifest, report, pool)
+    finally:
+        ticker.cancel()
+        await llm_gateway.aclose()
+        await database.disconnect()
+    print(json.dumps(report.to_dict(), indent=2))
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Bulk-ingest resume PDFs into the vector store.")
+    parser.add_argument("inputs", nargs="+", help="PDF files and/or directories (searched recursively)")
+    parser.add_argument("--manifest", help=f"resume manifest (default: <first dir>/{MANIFEST_NAME})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="PDF parsing processes")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between progress lines")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        sys.exit("Interrupted — re-run the same command to resume.")
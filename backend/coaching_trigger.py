@@ -1,7 +1,6 @@
 # backend/coaching_trigger.py
 
-from db import database, behavior_logs
-from sqlalchemy import desc
+from behavior_logs import get_recent
 import random
 
 COACHING_HINTS = [
@@ -14,15 +13,14 @@ COACHING_HINTS = [
 
 async def get_hint(session_id: str) -> str:
     try:
-        # Fetch the last few behavior logs
-        query = behavior_logs.select().where(behavior_logs.c.session_id == session_id).order_by(desc(behavior_logs.c.timestamp)).limit(3)
-        logs = await database.fetch_all(query)
+        # Last few engagement scores from the rolling window
+        scores = await get_recent(session_id, limit=3)
 
-        if not logs:
+        if not scores:
             return ""
 
         # If recent engagement scores are low, return a helpful hint
-        avg_score = sum(l["engagement_score"] for l in logs) / len(logs)
+        avg_score = sum(scores) / len(scores)
         if avg_score < 0.6:
             return random.choice(COACHING_HINTS)
 
@@ -0,0 +1,164 @@
+# backend/conversation_store.py
+
+import os
+import time
+import asyncio
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import sqlalchemy
+
+from db import database, conversation_turns
+
+# ─── Tunables ───────────────────────────────────────────────────
+MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "5000"))
+IDLE_TTL     = float(os.getenv("CONVERSATION_IDLE_TTL", "1800"))   # seconds before a quiet session leaves memory
+
+MARKERS = ("[EMPTY]", "[SKIP]")
+KICKOFF = "[INIT]"   # first /ask of a session: nothing said yet, never stored
+
+# Assistant turns that are not interview questions (repeat prompts, silence nudges, hints)
+NOT_A_QUESTION = ("would you like me to repeat", "let's move on", "since i didn't hear anything", "💡 hint")
+
+def is_real_answer(role: str, content: str) -> bool:
+    return role == "user" and content not in MARKERS and content != KICKOFF
+
+def is_real_question(role: str, content: str) -> bool:
+    if role != "assistant":
+        return False
+    lowered = content.strip().lower()
+    return not any(phrase in lowered for phrase in NOT_A_QUESTION)
+
+# ─── Per-Session State ──────────────────────────────────────────
+class Conversation:
+    """
+    Turns of one session plus counters kept up to date as turns are added,
+    so a request never has to re-walk the history. `summary` covers
+    turns[:summarized] (prompt_builder.py); it is not persisted.
+    """
+    __slots__ = ("session_id", "turns", "answers", "last_question", "last_seen",
+                 "summary", "summarized", "summarizing")
+
+    def __init__(self, session_id: str, turns: Optional[List[Dict]] = None):
+        self.session_id = session_id
+        self.turns: List[Dict] = []
+        self.answers = 0
+        self.last_question = "[unknown]"
+        self.last_seen = time.monotonic()
+        self.summary = ""
+        self.summarized = 0
+        self.summarizing = False
+        for turn in turns or []:
+            self.add(turn["role"], turn["content"])
+
+    @classmethod
+    def from_history(cls, session_id: str, history: List[Dict]) -> "Conversation":
+        """State for clients that still send the full history with every turn."""
+        return cls(session_id, [{"role": m["role"], "content": m["content"]} for m in history])
+
+    def add(self, role: str, content: str) -> None:
+        self.turns.append({"role": role, "content": content})
+        if is_real_answer(role, content):
+            self.answers += 1
+        elif is_real_question(role, content):
+            self.last_question = content
+
+    def answers_with(self, user_input: str) -> int:
+        """Answer count including an utterance that is not stored yet."""
+        return self.answers + is_real_answer("user", user_input)
+
+# ─── Store ──────────────────────────────────────────────────────
+class ConversationStore:
+    """
+    In-memory conversations with write-through to `conversation_turns`.
+    Sessions are kept in last-use order; idle ones are evicted from the front
+    and reloaded from the DB on their next turn (also after a restart).
+    A cached conversation first picks up turns stored past its end (by
+    another worker), and turns are numbered under a per-session lock.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_ttl: float = IDLE_TTL):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.hits = self.loads = 0
+
+    async def get(self, session_id: str) -> Conversation:
+        self._evict_idle()
+        conversation = self._sessions.get(session_id)
+        if conversation is not None:
+            self.hits += 1
+            await self._catch_up(conversation)
+            return self._touch(conversation)
+
+        # Cold miss: one DB load per session, shared by concurrent requests
+        pending = self._loading.get(session_id)
+        if pending is None:
+            pending = self._loading[session_id] = asyncio.ensure_future(self._load(session_id))
+            pending.add_done_callback(lambda _: self._loading.pop(session_id, None))
+        conversation = await asyncio.shield(pending)
+        return self._touch(self._sessions.setdefault(session_id, conversation))
+
+    async def record_turn(self, session_id: str, user_input: str, reply: str) -> None:
+        """Store one exchange: written to the DB first, then applied in memory."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        async with lock:
+            conversation = await self.get(session_id)   # up to date with the DB, so numbering continues
+            turns = [("assistant", reply)] if user_input == KICKOFF else [("user", user_input), ("assistant", reply)]
+            now = datetime.utcnow()
+            await database.execute(conversation_turns.insert().values([
+                {"session_id": session_id, "turn": len(conversation.turns) + i, "role": role,
+                 "content": content, "created_at": now}
+                for i, (role, content) in enumerate(turns)
+            ]))
+            for role, content in turns:
+                conversation.add(role, content)
+
+    def forget(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        return {"sessions": len(self._sessions), "hits": self.hits, "loads": self.loads}
+
+    async def _load(self, session_id: str) -> Conversation:
+        self.loads += 1
+        return Conversation(session_id, await self._turns_from(session_id, 0))
+
+    async def _catch_up(self, conversation: Conversation) -> None:
+        """Apply turns stored after ours (usually none: one indexed lookup)."""
+        for turn in await self._turns_from(conversation.session_id, len(conversation.turns)):
+            conversation.add(turn["role"], turn["content"])
+
+    async def _turns_from(self, session_id: str, first: int) -> List[Dict]:
+        rows = await database.fetch_all(
+            sqlalchemy.select(conversation_turns.c.role, conversation_turns.c.content)
+            .where(conversation_turns.c.session_id == session_id, conversation_turns.c.turn >= first)
+            .order_by(conversation_turns.c.turn, conversation_turns.c.id)
+        )
+        return [dict(role=r["role"], content=r["content"]) for r in rows]
+
+    def _touch(self, conversation: Conversation) -> Conversation:
+        self._sessions.move_to_end(conversation.session_id)
+        conversation.last_seen = time.monotonic()
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return conversation
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_seen >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+
+conversation_store = ConversationStore()
@@ -0,0 +1,137 @@
+# backend/embedding_cache.py
+
+import os
+import re
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+
+import llm_gateway
+import providers
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+DISK_PATH   = os.getenv("EMBED_CACHE_PATH")   # e.g. ./embedding_cache.sqlite3; unset = memory only
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def cache_key(text: str, model: str) -> str:
+    # Provider is part of the key: local hashing vectors must never answer for OpenAI ones
+    return hashlib.sha256(f"{providers.provider_name()}\0{model}\0{normalize(text)}".encode()).hexdigest()
+
+# ─── Content-Hashed Embedding Cache ─────────────────────────────
+class EmbeddingCache:
+    """
+    LRU of query embeddings keyed by (model, normalized text), optionally
+    backed by a SQLite file so warm entries survive restarts and are shared
+    by workers on the same host.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, disk_path: Optional[str] = DISK_PATH):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def get(self, text: str, model: str = llm_gateway.EMBEDDING_MODEL) -> Optional[List[float]]:
+        key = cache_key(text, model)
+        vector = self._memory_get(key)
+        if vector is None:
+            vector = self._disk_get(key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+        return vector
+
+    def put(self, text: str, vector: List[float], model: str = llm_gateway.EMBEDDING_MODEL) -> None:
+        key = cache_key(text, model)
+        self._remember(key, vector)
+        self._disk_put(key, vector)
+
+    async def embed_query(self, text: str, model: str = llm_gateway.EMBEDDING_MODEL) -> List[float]:
+        """Cached replacement for llm_gateway.embed_query; disk I/O runs off the event loop."""
+        key = cache_key(text, model)
+        vector = self._memory_get(key)
+        if vector is not None:
+            return vector
+        if self.disk_path:
+            vector = await asyncio.to_thread(self._disk_get, key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+
+        self.misses += 1
+        vector = await llm_gateway.embed_query(text, model=model)
+        self._remember(key, vector)
+        if self.disk_path:
+            await asyncio.to_thread(self._disk_put, key, vector)
+        return vector
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def _memory_get(self, key: str) -> Optional[List[float]]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+        return vector
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # ─── Disk store ─────────────────────────────────────────────
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if not self.disk_path:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[List[float]]:
+        try:
+            with self._db_lock:
+                conn = self._conn()
+                if conn is None:
+                    return None
+                row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return array("f", row[0]).tolist()
+
+    def _disk_put(self, key: str, vector: List[float]) -> None:
+        try:
+            with self._db_lock:
+                conn = self._conn()
+                if conn is None:
+                    return
+                conn.execute("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                             (key, array("f", vector).tobytes()))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+embedding_cache = EmbeddingCache()
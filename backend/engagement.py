@@ -0,0 +1,96 @@
+# backend/engagement.py
+
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional
+
+# ─── Tunables ───────────────────────────────────────────────────
+WINDOW       = int(os.getenv("ENGAGEMENT_WINDOW", "10"))
+MAX_SESSIONS = int(os.getenv("ENGAGEMENT_MAX_SESSIONS", "5000"))
+IDLE_TTL     = float(os.getenv("ENGAGEMENT_IDLE_TTL", "900"))
+RESYNC_TTL   = float(os.getenv("ENGAGEMENT_RESYNC_TTL", "30"))   # seconds before a window is re-read from the DB
+EMA_ALPHA    = 0.3
+
+class _SessionWindow:
+    __slots__ = ("scores", "ema", "last_seen", "synced")
+
+    def __init__(self, window: int):
+        self.scores: Deque[float] = deque(maxlen=window)
+        self.ema: Optional[float] = None
+        self.last_seen = time.monotonic()
+        self.synced = self.last_seen    # last time the window matched the DB
+
+    def push(self, score: float) -> None:
+        self.scores.append(score)
+        self.ema = score if self.ema is None else EMA_ALPHA * score + (1 - EMA_ALPHA) * self.ema
+
+# ─── Rolling Aggregator ─────────────────────────────────────────
+class EngagementTracker:
+    """
+    Per-session ring buffer of the most recent engagement scores, fed by
+    /log-behavior as samples are accepted. Sessions are kept in last-update
+    order so idle ones can be evicted from the front in O(1).
+
+    Each worker only sees the samples posted to it, so a window is treated
+    as a cold miss (and re-seeded from the DB) once it is `resync_ttl` old.
+    """
+
+    def __init__(self, window: int = WINDOW, max_sessions: int = MAX_SESSIONS, idle_ttl: float = IDLE_TTL,
+                 resync_ttl: float = RESYNC_TTL):
+        self.window = window
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.resync_ttl = resync_ttl
+        self._sessions: "OrderedDict[str, _SessionWindow]" = OrderedDict()
+
+    def record(self, session_id: str, score: float) -> None:
+        self._touch(session_id).push(score)
+
+    def seed(self, session_id: str, scores_newest_first: List[float]) -> None:
+        """Warm a session from the DB after a cold miss."""
+        entry = self._touch(session_id)
+        entry.scores.clear()
+        entry.ema = None
+        for score in reversed(scores_newest_first[:self.window]):
+            entry.push(score)
+        entry.synced = time.monotonic()
+
+    def recent(self, session_id: str, limit: int = 3) -> Optional[List[float]]:
+        """Newest-first scores, or None on a cold miss (not tracked, or due for a resync)."""
+        self._evict_idle()
+        entry = self._sessions.get(session_id)
+        if entry is None or limit > self.window or time.monotonic() - entry.synced > self.resync_ttl:
+            return None
+        scores = list(entry.scores)[-limit:]
+        scores.reverse()
+        return scores
+
+    def ema(self, session_id: str) -> Optional[float]:
+        entry = self._sessions.get(session_id)
+        return entry.ema if entry else None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _touch(self, session_id: str) -> _SessionWindow:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._sessions[session_id] = _SessionWindow(self.window)
+        else:
+            self._sessions.move_to_end(session_id)
+        entry.last_seen = time.monotonic()
+        self._evict_idle()
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return entry
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_seen >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+
+engagement_tracker = EngagementTracker()
@@ -0,0 +1,166 @@
+# backend/ingest_jobs.py
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import background
+import rag
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS     = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))   # jobs past this wait as "queued"
+JOB_TTL            = 3600   # seconds a finished job stays visible to the status endpoint
+INGEST_TIMEOUT     = int(os.getenv("INGEST_TIMEOUT", "600"))   # an unindexed upload older than this has failed
+
+# ─── Job State ──────────────────────────────────────────────────
+class IngestJob:
+    def __init__(self, job_id: str, filename: str):
+        self.job_id = job_id
+        self.filename = filename
+        self.status = "queued"      # queued → parsing → embedding → indexing → done | failed
+        self.pages: Optional[int] = None
+        self.chunks_total: Optional[int] = None
+        self.chunks_embedded = 0
+        self.error: Optional[str] = None
+        self.deduplicated = False   # same PDF was already indexed; linked without re-embedding
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "done":
+            return 1.0
+        if self.status == "embedding" and self.chunks_total:
+            return round(0.2 + 0.7 * self.chunks_embedded / self.chunks_total, 3)
+        return {"queued": 0.0, "parsing": 0.1, "embedding": 0.2, "indexing": 0.9}.get(self.status, 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "candidate_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "progress": self.progress,
+            "pages": self.pages,
+            "chunks_total": self.chunks_total,
+            "chunks_embedded": self.chunks_embedded,
+            "error": self.error,
+            "deduplicated": self.deduplicated,
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+
+_jobs: Dict[str, IngestJob] = {}
+_inflight: Dict[str, asyncio.Task] = {}   # resume_hash → indexing task (single-flight per document)
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+def get_pool() -> ProcessPoolExecutor:
+    """PDF parsing/splitting runs here so a slow or scanned PDF never blocks the event loop."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=INGEST_WORKERS)
+    return _pool
+
+def _job_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(INGEST_CONCURRENCY)
+    return _slots
+
+# ─── Queue API ──────────────────────────────────────────────────
+def submit(job_id: str, path: str, filename: str, resume_hash: str) -> IngestJob:
+    """
+    Queue ingestion of the PDF at `path` (deleted afterwards); job_id doubles as
+    candidate_id. Concurrent uploads of the same document share one indexing run.
+    """
+    _evict_finished()
+    job = _jobs[job_id] = IngestJob(job_id, filename)
+    background.spawn(_run(job, path, resume_hash), name=f"ingest:{job_id}")
+    return job
+
+def finished(job_id: str, filename: str, chunks: Optional[int] = None) -> IngestJob:
+    """Record a job that needed no work (the document was already indexed)."""
+    _evict_finished()
+    job = _jobs[job_id] = IngestJob(job_id, filename)
+    job.status, job.deduplicated, job.chunks_total = "done", True, chunks
+    job.finished_at = time.time()
+    return job
+
+def get(job_id: str) -> Optional[IngestJob]:
+    return _jobs.get(job_id)
+
+def from_link(job_id: str, link, indexed: bool, chunks: Optional[int] = None) -> dict:
+    """
+    Status from the candidate_resumes row, for a job this worker doesn't know
+    (ran on another worker, or expired): done, failed, or still pending.
+    """
+    status = {"job_id": job_id, "candidate_id": job_id, "status": "pending", "progress": 0.0}
+    if indexed:
+        return {**status, "status": "done", "progress": 1.0, "chunks_total": chunks}
+    if link.ingest_error:
+        return {**status, "status": "failed", "error": link.ingest_error}
+    if (datetime.utcnow() - link.created_at).total_seconds() > INGEST_TIMEOUT:
+        # The worker ingesting it went away without recording an outcome
+        return {**status, "status": "failed", "error": "Resume indexing did not finish"}
+    return status
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+async def _index(job: IngestJob, path: str, resume_hash: str) -> int:
+    async with _job_slots():
+        if await asyncio.to_thread(rag.resume_indexed, resume_hash):
+            job.deduplicated = True
+            return 0
+        job.status = "parsing"
+        loop = asyncio.get_running_loop()
+        texts, job.pages = await loop.run_in_executor(get_pool(), rag.parse_and_split, path)
+        job.chunks_total = len(texts)
+
+        job.status = "embedding"
+
+        def on_progress(embedded: int) -> None:
+            job.chunks_embedded = embedded
+            if embedded >= len(texts):
+                job.status = "indexing"
+
+        return await rag.index_chunks(resume_hash, texts, on_progress=on_progress)
+
+async def _run(job: IngestJob, path: str, resume_hash: str) -> None:
+    try:
+        task = _inflight.get(resume_hash)
+        if task is not None:
+            job.deduplicated = True
+        else:
+            task = _inflight[resume_hash] = asyncio.create_task(_index(job, path, resume_hash))
+            task.add_done_callback(lambda _t: _inflight.pop(resume_hash, None))
+        count = await asyncio.shield(task)
+        job.status = "done"
+        logger.info(f"✅ Ingested {count} resume chunks for {job.job_id} in {time.time() - job.created_at:.2f}s"
+                    + (" (deduplicated)" if job.deduplicated else ""))
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e) or type(e).__name__
+        logger.exception(f"Resume ingestion failed for {job.job_id}")
+        try:
+            await rag.mark_link_failed(job.job_id, job.error)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record the failed ingestion of {job.job_id}: {e}")
+    finally:
+        job.finished_at = time.time()
+        if os.path.exists(path):
+            os.remove(path)
+
+def _evict_finished() -> None:
+    cutoff = time.time() - JOB_TTL
+    for job_id in [j.job_id for j in _jobs.values() if j.finished_at and j.finished_at < cutoff]:
+        del _jobs[job_id]
@@ -0,0 +1,105 @@
+# backend/llm_gateway.py
+
+import os
+import asyncio
+import logging
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List
+
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+import providers
+
+logger = logging.getLogger(__name__)
+
+# ─── Config ─────────────────────────────────────────────────────
+CHAT_MODEL      = os.getenv("CHAT_MODEL", "gpt-4o")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+TTS_MODEL       = os.getenv("TTS_MODEL", "tts-1")
+
+REQUEST_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+MAX_ATTEMPTS    = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+EMBED_BATCH     = 1000   # inputs per embeddings request
+
+# In-flight request caps per model; anything unlisted gets DEFAULT_CONCURRENCY
+MODEL_CONCURRENCY: Dict[str, int] = {
+    CHAT_MODEL: int(os.getenv("CHAT_CONCURRENCY", "32")),
+    TTS_MODEL:  int(os.getenv("TTS_CONCURRENCY", "8")),
+}
+DEFAULT_CONCURRENCY = 16
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> tuple:
+    """Transient SDK errors worth retrying (the openai import is deferred to the first call)."""
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+    return (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+# ─── Provider Dispatch ──────────────────────────────────────────
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+def provider():
+    """Backend for every call below (MODEL_PROVIDER=openai|local, see providers.py)."""
+    return providers.get(timeout=REQUEST_TIMEOUT, connect_timeout=CONNECT_TIMEOUT)
+
+def _limit(model: str) -> asyncio.Semaphore:
+    sem = _semaphores.get(model)
+    if sem is None:
+        sem = _semaphores[model] = asyncio.Semaphore(MODEL_CONCURRENCY.get(model, DEFAULT_CONCURRENCY))
+    return sem
+
+async def _retrying(model: str, fn, **kwargs):
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(MAX_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=0.5, max=8),
+        retry=retry_if_exception_type(retryable_errors()),
+        reraise=True,
+    ):
+        with attempt:
+            if attempt.retry_state.attempt_number > 1:
+                logger.warning(f"[LLM] Retrying {model} (attempt {attempt.retry_state.attempt_number})")
+            return await fn(model=model, **kwargs)
+
+async def _call(model: str, fn, **kwargs):
+    async with _limit(model):
+        return await _retrying(model, fn, **kwargs)
+
+async def aclose() -> None:
+    await providers.aclose()
+    _semaphores.clear()
+
+# ─── Public API ─────────────────────────────────────────────────
+async def chat(messages: List[Dict], model: str = CHAT_MODEL, **kwargs) -> str:
+    """Single chat completion; returns the message text."""
+    return await _call(model, provider().chat, messages=messages, **kwargs)
+
+async def chat_stream(messages: List[Dict], model: str = CHAT_MODEL, **kwargs) -> AsyncIterator[str]:
+    """
+    Streamed chat completion yielding text deltas. Only opening the stream is
+    retried; the model's concurrency slot is held until the stream ends.
+    """
+    async with _limit(model):
+        deltas = await _retrying(model, provider().chat_stream, messages=messages, **kwargs)
+        try:
+            async for delta in deltas:
+                yield delta
+        finally:
+            await deltas.aclose()
+
+async def embed(texts: List[str], model: str = EMBEDDING_MODEL) -> List[List[float]]:
+    """Embed texts in batches of EMBED_BATCH; output order matches input."""
+    vectors: List[List[float]] = []
+    for i in range(0, len(texts), EMBED_BATCH):
+        vectors.extend(await _call(model, provider().embed, texts=texts[i:i + EMBED_BATCH]))
+    return vectors
+
+async def embed_query(text: str, model: str = EMBEDDING_MODEL) -> List[float]:
+    return (await embed([text], model=model))[0]
+
+def embed_query_sync(text: str, model: str = EMBEDDING_MODEL) -> List[float]:
+    """Blocking single embedding, for sync callers (LangChain tools) off the event loop."""
+    return provider().embed_sync(model, [text])[0]
+
+async def speech(text: str, voice: str, model: str = TTS_MODEL) -> bytes:
+    """Synthesize `text` to mp3 bytes."""
+    return await _call(model, provider().speech, text=text, voice=voice)
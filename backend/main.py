@@ -1,31 +1,84 @@
 # backend/main.py
 
+import startup_profile
+startup_profile.install()   # times every import below (GET /admin/startup-profile)
+
 from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 # ─── Routers ─────────────────────────────────────────────────────
-from db import database
+from db import database, get_engine
+from behavior_buffer import behavior_buffer
+import background
+import llm_gateway
+import ingest_jobs
+import rag
+import prompt_builder
+from audio_cache import audio_cache
+from trace_recorder import trace_recorder
 from routes.admin import router as admin_router
 from routes.interview import router as interview_router
 from routes.log_behavior import router as behavior_router
-from routes.speak import router as speak_router
+from routes.speak import router as speak_router, prewarm_static_phrases
+from phrases import STATIC_PHRASES
 from routes.clarify_check import router as clarify_router
 
 # ─── Logger Setup ───────────────────────────────────────────────
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ─── Startup / Shutdown (lifespan) ─────────────────────────────
+def warm_up() -> None:
+    rag.get_chroma_client()
+    llm_gateway.retryable_errors()
+    prompt_builder.encoding()
+    audio_cache.load()   # scan the TTS cache directory here, not on the first /speak
+
+# Heavy resources are created here or on first use, never at import time
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_profile.phase("migrations"):
+        await asyncio.to_thread(get_engine)
+    # Heavy clients load here rather than at import (fast test collection) or on the
+    # first request (a cold import there would stall the event loop)
+    with startup_profile.phase("warm-up"):
+        await asyncio.to_thread(warm_up)
+    logger.info("🚀 Connecting to database...")
+    with startup_profile.phase("database connect"):
+        await database.connect()
+    behavior_buffer.start()
+    trace_recorder.start()
+    # Only phrases missing from the shared disk cache are synthesized; TTS_PREWARM=0 skips it
+    if os.getenv("TTS_PREWARM", "1") == "1":
+        background.spawn(prewarm_static_phrases(), name="tts-prewarm")
+    startup_profile.mark_ready()
+    logger.info(startup_profile.summary())
+
+    yield
+
+    await background.drain()
+    ingest_jobs.shutdown()
+    logger.info(f"🧹 Flushing {behavior_buffer.pending} buffered behavior logs...")
+    await behavior_buffer.stop()
+    await trace_recorder.stop()
+    await llm_gateway.aclose()
+    logger.info("🛑 Disconnecting database...")
+    await database.disconnect()
+
 # ─── FastAPI App ────────────────────────────────────────────────
 app = FastAPI(
     title="AI Interview Agent",
     description="A personalized AI-powered voice interview backend with resume ingestion, scoring, behavioral analysis, and hallucination detection.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # ─── CORS Config ────────────────────────────────────────────────
@@ -54,6 +107,13 @@ async def log_requests(request: Request, call_next):
         logger.exception(f"❌ Error: {e}")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+# ─── Opt-in Session Trace Recording (TRACE_DIR) ─────────────────
+trace_recorder.keep_verbatim(STATIC_PHRASES)
+
+@app.middleware("http")
+async def record_trace(request: Request, call_next):
+    return await trace_recorder.capture(request, call_next)
+
 # ─── Router Registration ────────────────────────────────────────
 app.include_router(interview_router, prefix="/interview", tags=["Interview Flow"])
 app.include_router(behavior_router, prefix="/interview", tags=["Behavior Logs"])
@@ -65,14 +125,3 @@ app.include_router(clarify_router, tags=["Clarify Check"])
 @app.get("/", tags=["Health"])
 def health_check():
     return {"status": "backend is running"}
-
-# ─── Startup / Shutdown Events ──────────────────────────────────
-@app.on_event("startup")
-async def startup():
-    logger.info("🚀 Connecting to database...")
-    await database.connect()
-
-@app.on_event("shutdown")
-async def shutdown():
-    logger.info("🛑 Disconnecting database...")
-    await database.disconnect()
@@ -0,0 +1,236 @@
+# backend/migrations.py
+"""
+Versioned, forward-only schema migrations.
+
+Applied versions are recorded in `schema_migrations`; `migrate()` runs the
+pending ones in order when db.get_engine() is first called (app startup).
+Each step only adds (tables, columns, indexes) and backfills in place, so it
+is safe on a live database. On PostgreSQL indexes are built CONCURRENTLY,
+without blocking writes. Workers that start together serialize on a lock
+(a PostgreSQL advisory lock, or a lock file next to a SQLite database), so
+each version is applied exactly once.
+
+    python backend/migrations.py            # apply pending migrations
+    python backend/migrations.py status     # list applied / pending
+    python backend/migrations.py check      # fail if a hot query plan uses a sequential scan
+"""
+
+import sys
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+try:
+    import fcntl
+except ImportError:   # Windows: SQLite migrations run unlocked
+    fcntl = None
+
+import sqlalchemy
+import sqlalchemy.exc
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK_ID = 7_211_864_001   # pg_advisory_lock key shared by every worker
+
+migrations_table = sqlalchemy.Table(
+    "schema_migrations",
+    sqlalchemy.MetaData(),
+    sqlalchemy.Column("version",    sqlalchemy.Integer,  primary_key=True),
+    sqlalchemy.Column("name",       sqlalchemy.String,   nullable=False),
+    sqlalchemy.Column("applied_at", sqlalchemy.DateTime, nullable=False),
+)
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection, sqlalchemy.MetaData], None]
+    transactional: bool = True   # False for CREATE INDEX CONCURRENTLY, which can't run in a transaction
+
+# ─── Steps ──────────────────────────────────────────────────────
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    return column in {c["name"] for c in sqlalchemy.inspect(conn).get_columns(table)}
+
+def create_tables(conn: Connection, metadata: sqlalchemy.MetaData) -> None:
+    """Baseline: any table that does not exist yet, as declared in db.py."""
+    metadata.create_all(conn, checkfirst=True)
+
+def add_engagement_score(conn: Connection, metadata: sqlalchemy.MetaData) -> None:
+    """behavior_logs.engagement_score, backfilled with compute_engagement_score's rules."""
+    if has_column(conn, "behavior_logs", "engagement_score"):
+        return
+    conn.execute(sqlalchemy.text(
+        "ALTER TABLE behavior_logs ADD COLUMN engagement_score FLOAT NOT NULL DEFAULT 1.0"
+    ))
+    conn.execute(sqlalchemy.text("""
+        UPDATE behavior_logs SET engagement_score = 1.0
+            - CASE WHEN face_present THEN 0 ELSE 0.5 END
+            - CASE WHEN emotion IN ('sad', 'angry', 'disgusted') THEN 0.3 ELSE 0 END
+            - CASE WHEN gaze_direction IN ('down', 'away') THEN 0.2 ELSE 0 END
+    """))
+
+def create_indexes(conn: Connection, metadata: sqlalchemy.MetaData, names) -> None:
+    """Indexes declared in db.py, by name; CONCURRENTLY on PostgreSQL."""
+    for name in names:
+        table = next(t for t in metadata.tables.values() if any(i.name == name for i in t.indexes))
+        if conn.dialect.name == "postgresql":
+            # A private copy: the flag must not leak into create_all() on the shared metadata
+            table = table.to_metadata(sqlalchemy.MetaData())
+        index = next(i for i in table.indexes if i.name == name)
+        if conn.dialect.name == "postgresql":
+            index.dialect_kwargs["postgresql_concurrently"] = True
+        index.create(conn, checkfirst=True)
+
+def create_log_indexes(conn: Connection, metadata: sqlalchemy.MetaData) -> None:
+    """(session_id, timestamp) and (candidate_id, timestamp) for the per-session log reads."""
+    create_indexes(conn, metadata, ("ix_behavior_logs_session_ts", "ix_interview_logs_candidate_ts"))
+
+def create_conversation_turns(conn: Connection, metadata: sqlalchemy.MetaData) -> None:
+    """Server-side conversation history (conversation_store.py), with its (session_id, turn) index."""
+    metadata.tables["conversation_turns"].create(conn, checkfirst=True)
+
+def add_ingest_error(conn: Connection, metadata: sqlalchemy.MetaData) -> None:
+    """candidate_resumes.ingest_error: a failed ingestion outlives its in-memory job."""
+    if has_column(conn, "candidate_resumes", "ingest_error"):
+        return
+    conn.execute(sqlalchemy.text("ALTER TABLE candidate_resumes ADD COLUMN ingest_error TEXT"))
+
+def create_session_list_index(conn: Connection, metadata: sqlalchemy.MetaData) -> None:
+    """(created_at, id) on interview_sessions: each admin session page is one index range."""
+    create_indexes(conn, metadata, ("ix_interview_sessions_created_id",))
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline tables", create_tables),
+    Migration(2, "behavior_logs.engagement_score", add_engagement_score),
+    Migration(3, "per-session log indexes", create_log_indexes, transactional=False),
+    Migration(4, "conversation_turns", create_conversation_turns),
+    Migration(5, "candidate_resumes.ingest_error", add_ingest_error),
+    Migration(6, "interview_sessions keyset index", create_session_list_index, transactional=False),
+]
+
+# ─── Runner ─────────────────────────────────────────────────────
+def applied_versions(engine: Engine) -> set:
+    with engine.begin() as conn:
+        migrations_table.create(conn, checkfirst=True)
+        return {row.version for row in conn.execute(sqlalchemy.select(migrations_table.c.version))}
+
+@contextmanager
+def migration_lock(engine: Engine):
+    """Held while migrating, so concurrent workers don't apply the same version."""
+    if engine.dialect.name == "postgresql":
+        # Session-level lock on an autocommit connection: an open transaction here
+        # would make CREATE INDEX CONCURRENTLY wait for it
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(sqlalchemy.text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            try:
+                yield
+            finally:
+                conn.execute(sqlalchemy.text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+        return
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def migrate(engine: Engine, metadata: sqlalchemy.MetaData) -> List[int]:
+    """Apply pending migrations in order; returns the versions applied."""
+    with migration_lock(engine):
+        # Read inside the lock: another worker may have just finished migrating
+        return apply_pending(engine, metadata, applied_versions(engine))
+
+def apply_pending(engine: Engine, metadata: sqlalchemy.MetaData, done: set) -> List[int]:
+    applied = []
+    for step in MIGRATIONS:
+        if step.version in done:
+            continue
+        logger.info(f"🗄️ Applying migration {step.version}: {step.name}")
+        if step.transactional:
+            with engine.begin() as conn:
+                step.apply(conn, metadata)
+                record(conn, step)
+        else:
+            with engine.connect() as conn:
+                step.apply(conn.execution_options(isolation_level="AUTOCOMMIT"), metadata)
+            with engine.begin() as conn:
+                record(conn, step)
+        applied.append(step.version)
+    return applied
+
+def record(conn: Connection, step: Migration) -> None:
+    conn.execute(migrations_table.insert().values(
+        version=step.version, name=step.name, applied_at=datetime.utcnow(),
+    ))
+
+# ─── Plan Check ─────────────────────────────────────────────────
+# Per-session reads on the request path (and admin pages); each must be served by an index
+HOT_QUERIES = {
+    "recent engagement": "SELECT engagement_score FROM behavior_logs WHERE session_id = :sid "
+                         "ORDER BY timestamp DESC LIMIT 10",
+    "behavior log page": "SELECT id, timestamp, emotion, face_present, gaze_direction FROM behavior_logs "
+                         "WHERE session_id = :sid ORDER BY timestamp, id LIMIT 101",
+    "engagement timeline": "SELECT count(*), avg(engagement_score) FROM behavior_logs WHERE session_id = :sid",
+    "qa log page": "SELECT id, question, answer, score FROM interview_logs WHERE candidate_id = :sid "
+                   "ORDER BY timestamp, id LIMIT 101",
+    "session rescoring": "SELECT * FROM interview_logs WHERE candidate_id = :sid ORDER BY timestamp",
+    "conversation load": "SELECT role, content FROM conversation_turns WHERE session_id = :sid ORDER BY turn, id",
+    "conversation catch-up": "SELECT role, content FROM conversation_turns WHERE session_id = :sid AND turn >= 4 "
+                             "ORDER BY turn, id",
+    "session list page": "SELECT id, candidate_name, job_role, resume_file, created_at FROM interview_sessions "
+                         "WHERE (created_at, id) < ('2025-01-01 00:00:00', :sid) "
+                         "ORDER BY created_at DESC, id DESC LIMIT 101",
+}
+
+def sequential_scans(engine: Engine) -> List[str]:
+    """Hot queries whose plan falls back to a full table scan ("name: plan" lines)."""
+    failures = []
+    for name, sql in HOT_QUERIES.items():
+        try:
+            plan = query_plan(engine, sql)
+        except sqlalchemy.exc.DBAPIError as e:
+            failures.append(f"{name}: {e.orig}")   # e.g. a column a pending migration adds
+            continue
+        if engine.dialect.name == "sqlite":
+            scans = [line for line in plan if line.startswith("SCAN ") and "USING" not in line]
+        else:
+            scans = [line for line in plan if "Seq Scan" in line]
+        if scans:
+            failures.append(f"{name}: {' | '.join(plan)}")
+    return failures
+
+def query_plan(engine: Engine, sql: str) -> List[str]:
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            return [row[-1] for row in conn.execute(sqlalchemy.text(f"EXPLAIN QUERY PLAN {sql}"), {"sid": "x"})]
+        # Tiny tables make a seq scan cheapest; we want to know whether an index *can* be used
+        conn.execute(sqlalchemy.text("SET enable_seqscan = off"))
+        return [row[0] for row in conn.execute(sqlalchemy.text(f"EXPLAIN {sql}"), {"sid": "x"})]
+
+def main() -> int:
+    from db import database_url, metadata
+    engine = sqlalchemy.create_engine(database_url())
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    if command == "status":
+        done = applied_versions(engine)
+        for step in MIGRATIONS:
+            print(f"{'✅' if step.version in done else '⏳'} {step.version:03d} {step.name}")
+    elif command == "check":
+        failures = sequential_scans(engine)
+        for failure in failures:
+            print(f"❌ {failure}")
+        print("✅ All hot queries use an index." if not failures else f"{len(failures)} hot queries scan a table.")
+        return 1 if failures else 0
+    else:
+        applied = migrate(engine, metadata)
+        print(f"✅ Applied migrations {applied}" if applied else "✅ Schema is up to date.")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,21 @@
+# backend/phrases.py
+"""Fixed lines the interviewer speaks verbatim, shared by the ask and TTS routes."""
+
+from coaching_trigger import COACHING_HINTS
+
+OPENING_QUESTIONS = [
+    "Hello! Which role are you applying for today?",
+    "Please give me a brief introduction of your previous work experience, education, and key skills.",
+]
+
+TEACH_REPLY = "I'm here to evaluate your understanding, so I can’t explain the answer. Please try your best."
+
+# Phrases spoken verbatim in most sessions (incl. the frontend's silence prompts)
+STATIC_PHRASES = [
+    *OPENING_QUESTIONS,
+    TEACH_REPLY,
+    *(f"💡 Hint: {h}" for h in COACHING_HINTS),
+    "It seems you’ve been quiet. Would you like me to repeat the last question?",
+    "Since I didn't hear anything, let's move on to the next question.",
+    "Your 30-minute session has ended. Thank you!",
+]
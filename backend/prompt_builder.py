@@ -0,0 +1,207 @@
+# backend/prompt_builder.py
+"""
+Token-budgeted chat prompts, laid out for provider-side prefix caching.
+
+Messages go from most to least stable:
+  1. system prompt            identical for every request
+  2. resume profile           fixed for the whole session
+  3. summary of older turns   changes only when turns are folded into it
+  4. recent turns, verbatim   append-only between folds
+  5. excerpts + tone          different every turn
+  6. the candidate's utterance
+Providers reuse a cached prompt up to the first byte that differs, so the
+per-turn parts go last. When the prompt would exceed PROMPT_TOKEN_BUDGET the
+oldest turns are left out and folded into the running summary in the
+background: the summarizer sees the previous summary plus the folded turns,
+never the whole history.
+
+Summaries live on the in-memory Conversation only; after an eviction or a
+restart the next over-budget turn rebuilds one.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import background
+import llm_gateway
+import rag
+
+logger = logging.getLogger(__name__)
+
+# ─── Tunables ───────────────────────────────────────────────────
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+PROFILE_TOKENS      = int(os.getenv("PROFILE_TOKENS", "1500"))    # resume text kept in the stable prefix
+SUMMARY_MODEL       = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+FOLD_TARGET         = 0.5    # after a fold, verbatim turns fill at most this share of the history room
+PROFILE_CACHE_SIZE  = 1000
+
+MESSAGE_OVERHEAD = 3   # role and separator tokens per chat message
+REPLY_PRIMING    = 3
+
+SUMMARY_PROMPT = """Update the running summary of a job interview with the new turns below.
+Keep the role, every question already asked, the candidate's key claims, strengths and gaps,
+so later questions build on them and nothing is asked twice. Plain prose, at most 150 words.
+
+Running summary:
+{summary}
+
+New turns:
+{turns}"""
+
+# ─── Token Counting ─────────────────────────────────────────────
+_encoding = None
+
+def encoding():
+    """tiktoken encoder for CHAT_MODEL; None when it can't be loaded (the BPE file is fetched on first use)."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(llm_gateway.CHAT_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning(f"⚠️ tiktoken encoding unavailable, estimating tokens from length: {e}")
+            _encoding = False
+    return _encoding or None
+
+@lru_cache(maxsize=16384)
+def count_tokens(text: str) -> int:
+    enc = encoding()
+    if enc is None:
+        return len(text) // 4 + 1
+    return len(enc.encode(text, disallowed_special=()))
+
+def turn_tokens(message: Dict) -> int:
+    return MESSAGE_OVERHEAD + count_tokens(message["content"])
+
+def message_tokens(messages: Sequence[Dict]) -> int:
+    return REPLY_PRIMING + sum(turn_tokens(m) for m in messages)
+
+def newest_within(turns: Sequence[Dict], room: int) -> int:
+    """How many of the most recent turns fit in `room` tokens."""
+    used = kept = 0
+    for turn in reversed(turns):
+        used += turn_tokens(turn)
+        if used > room:
+            break
+        kept += 1
+    return kept
+
+# ─── Resume Profile ─────────────────────────────────────────────
+# Keyed by resume hash, so a re-upload (new hash) never serves the old text
+_profiles: "OrderedDict[str, str]" = OrderedDict()
+_profiles_lock = threading.Lock()   # filled from worker threads, read on the event loop
+
+def cached_profile(key: str) -> Optional[str]:
+    with _profiles_lock:
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+        return profile
+
+def resume_profile(candidate_id: str) -> str:
+    """The candidate's resume chunks in order, capped at PROFILE_TOKENS (sync — worker threads)."""
+    key = rag.resume_filter(candidate_id)[0]
+    profile = cached_profile(key)
+    if profile is not None:
+        return profile
+    index = rag.candidate_index(candidate_id)
+    if index is None:
+        return ""   # not cached: the resume may still be ingesting
+    chunks, used = [], 0
+    for text in index.texts:
+        used += count_tokens(text)
+        if used > PROFILE_TOKENS:
+            break
+        chunks.append(text)
+    profile = "\n".join(chunks)
+    with _profiles_lock:
+        _profiles[key] = profile
+        _profiles.move_to_end(key)
+        while len(_profiles) > PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    return profile
+
+async def load_profile(candidate_id: str) -> str:
+    resume_hash = rag.linked_resume(candidate_id)
+    profile = cached_profile(resume_hash) if resume_hash else None
+    if profile is not None:
+        return profile
+    return await asyncio.to_thread(resume_profile, candidate_id)
+
+# ─── Summaries ──────────────────────────────────────────────────
+async def summarize(summary: str, turns: Sequence[Dict]) -> str:
+    transcript = "\n".join(
+        f"{'Interviewer' if t['role'] == 'assistant' else 'Candidate'}: {t['content']}" for t in turns
+    )
+    prompt = SUMMARY_PROMPT.format(summary=summary or "(none yet)", turns=transcript)
+    reply = await llm_gateway.chat([{"role": "user", "content": prompt}], model=SUMMARY_MODEL, temperature=0)
+    return reply.strip()
+
+# ─── Builder ────────────────────────────────────────────────────
+def system(content: str) -> Dict:
+    return {"role": "system", "content": content}
+
+class PromptBuilder:
+    def __init__(self, system_prompt: str, budget: int = PROMPT_TOKEN_BUDGET):
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.folds = 0
+
+    def build(self, conversation, user_input: str, profile: str = "", excerpts: Sequence[str] = (),
+              tone: Optional[str] = None, summarize: bool = True) -> List[Dict]:
+        """
+        Messages for one turn within the budget. `summarize=False` only drops
+        old turns (clients that send their own history every turn).
+        """
+        prefix = [system(self.system_prompt)]
+        if profile:
+            prefix.append(system(f"Candidate resume profile:\n{profile}"))
+        if conversation.summary:
+            prefix.append(system(f"Summary of the interview so far:\n{conversation.summary}"))
+
+        notes = []
+        fresh = [chunk for chunk in excerpts if chunk not in profile]
+        if fresh:
+            notes.append("Resume excerpts relevant to this answer:\n" + "\n".join(fresh))
+        if tone:
+            notes.append(f"The candidate seems {tone}. Adjust your tone accordingly.")
+        tail = ([system("\n\n".join(notes))] if notes else []) + [{"role": "user", "content": user_input}]
+
+        room = self.budget - message_tokens(prefix + tail)
+        pending = conversation.turns[conversation.summarized:]
+        kept = newest_within(pending, room)
+        if kept < len(pending) and summarize:
+            self.fold(conversation, room)
+
+        history = [{"role": t["role"], "content": t["content"]} for t in pending[len(pending) - kept:]]
+        return prefix + history + tail
+
+    def fold(self, conversation, room: int) -> None:
+        """Fold the oldest verbatim turns into the summary, in the background, one fold at a time."""
+        if conversation.summarizing:
+            return
+        pending = conversation.turns[conversation.summarized:]
+        # Fold well past the limit so the verbatim turns stay a stable prefix for a few turns
+        upto = len(conversation.turns) - newest_within(pending, int(room * FOLD_TARGET))
+        conversation.summarizing = True
+        background.spawn(self._fold(conversation, upto), name=f"summary:{conversation.session_id}")
+
+    async def _fold(self, conversation, upto: int) -> None:
+        try:
+            turns = conversation.turns[conversation.summarized:upto]
+            conversation.summary = await summarize(conversation.summary, turns)
+            conversation.summarized = upto
+            self.folds += 1
+        except Exception as e:
+            # Retried on the next over-budget turn; meanwhile old turns are just left out
+            logger.warning(f"⚠️ Summarizing {conversation.session_id} failed: {e}")
+        finally:
+            conversation.summarizing = False
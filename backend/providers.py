@@ -0,0 +1,215 @@
+# backend/providers.py
+"""
+Model providers behind llm_gateway, selected with MODEL_PROVIDER:
+
+    openai  (default)  AsyncOpenAI on one pooled HTTP client
+    local              deterministic stand-ins, no network or API key:
+                       hashing embedder, scripted chat, silent-mp3 TTS
+
+Local stand-ins sleep for LOCAL_<KIND>_LATENCY_MS (falling back to
+LOCAL_LATENCY_MS) so our own overhead can be profiled in isolation.
+"""
+
+import os
+import re
+import json
+import math
+import asyncio
+import hashlib
+from typing import AsyncIterator, Dict, List
+
+import httpx
+
+# ─── Config ─────────────────────────────────────────────────────
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LOCAL_EMBED_DIM = int(os.getenv("LOCAL_EMBED_DIM", "256"))
+
+def provider_name() -> str:
+    return os.getenv("MODEL_PROVIDER", "openai").lower()
+
+def local_latency(kind: str) -> float:
+    """Artificial latency (seconds) for a local stand-in: chat, token, embed or tts."""
+    default = os.getenv("LOCAL_LATENCY_MS", "0") if kind != "token" else "0"
+    return float(os.getenv(f"LOCAL_{kind.upper()}_LATENCY_MS", default)) / 1000
+
+# ─── OpenAI ─────────────────────────────────────────────────────
+class OpenAIProvider:
+    name = "openai"
+
+    def __init__(self, timeout: float, connect_timeout: float):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._client = None
+        self._sync_client = None
+
+    def client(self):
+        """One AsyncOpenAI client (and one pooled HTTP connection pool) per process."""
+        if self._client is None:
+            from openai import AsyncOpenAI
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            )
+            # Retries are handled in llm_gateway with tenacity, so the SDK's own are disabled
+            self._client = AsyncOpenAI(http_client=http_client, max_retries=0, timeout=self.timeout)
+        return self._client
+
+    async def chat(self, model: str, messages: List[Dict], **kwargs) -> str:
+        resp = await self.client().chat.completions.create(model=model, messages=messages, **kwargs)
+        return resp.choices[0].message.content or ""
+
+    async def chat_stream(self, model: str, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        """Opens the stream (the retryable part) and returns an iterator of text deltas."""
+        stream = await self.client().chat.completions.create(model=model, messages=messages, stream=True, **kwargs)
+
+        async def deltas():
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+
+        return deltas()
+
+    async def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        resp = await self.client().embeddings.create(model=model, input=texts)
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+    def embed_sync(self, model: str, texts: List[str]) -> List[List[float]]:
+        """Blocking variant for sync LangChain tools."""
+        if self._sync_client is None:
+            from openai import OpenAI
+            self._sync_client = OpenAI(timeout=self.timeout)
+        resp = self._sync_client.embeddings.create(model=model, input=texts)
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+    async def speech(self, model: str, text: str, voice: str) -> bytes:
+        resp = await self.client().audio.speech.create(model=model, voice=voice, input=text)
+        return resp.content
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+# ─── Local Stand-ins ────────────────────────────────────────────
+LOCAL_QUESTIONS = [
+    "Can you walk me through a recent project you're proud of?",
+    "What was the hardest technical problem you solved there, and how?",
+    "How did you measure whether that work was successful?",
+    "Tell me about a time you disagreed with a teammate. What happened?",
+    "Which part of your resume best prepares you for this role, and why?",
+]
+
+# One silent MPEG-1 Layer III frame: 32 kbps, 44.1 kHz, mono, 1152 samples (~26 ms)
+SILENT_MP3_FRAME = bytes([0xFF, 0xFB, 0x10, 0xC0]) + bytes(100)
+SECONDS_PER_WORD = 0.3
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+
+def hashing_embedding(text: str, dim: int = LOCAL_EMBED_DIM) -> List[float]:
+    """Signed feature hashing of word unigrams and bigrams, L2-normalized."""
+    words = re.findall(r"\w+", text.lower())
+    vector = [0.0] * dim
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        h = _digest(feature)
+        vector[h % dim] += 1.0 if (h >> 32) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+def silent_mp3(text: str) -> bytes:
+    seconds = max(1, len(text.split())) * SECONDS_PER_WORD
+    return SILENT_MP3_FRAME * math.ceil(seconds / (1152 / 44100))
+
+def scripted_rubric(seed: int) -> dict:
+    """Valid rubric scores, stable per seed."""
+    score = lambda salt: round(0.5 + ((seed >> salt) % 50) / 100, 2)
+    return {"relevance": score(0), "accuracy": score(8), "completeness": score(16), "clarity": score(24),
+            "hallucination": "Valid"}
+
+def scripted_reply(messages: List[Dict]) -> str:
+    """Canned but well-formed replies for each prompt the app sends."""
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    last = str(messages[-1].get("content", "")) if messages else ""
+    seed = _digest(last)
+
+    if '"scores"' in prompt:
+        # Multi-answer rubric: one entry per "### Answer N" block
+        blocks = re.findall(r"### Answer (\d+)(.*?)(?=### Answer|\Z)", prompt, re.S)
+        return json.dumps({"scores": [{"id": int(i), **scripted_rubric(_digest(block))} for i, block in blocks]})
+    if '"hallucination"' in prompt:
+        return json.dumps(scripted_rubric(seed))
+    if "running summary of a job interview" in prompt:
+        return f"The candidate answered {prompt.count('Candidate:')} more questions."
+    if "single word only: clarify, teach, or other" in prompt:
+        return "other"
+
+    question = LOCAL_QUESTIONS[seed % len(LOCAL_QUESTIONS)]
+    if "INTENT:" in prompt:
+        return f"INTENT: other\n{question}"
+    return question
+
+class LocalProvider:
+    name = "local"
+
+    async def chat(self, model: str, messages: List[Dict], **kwargs) -> str:
+        await asyncio.sleep(local_latency("chat"))
+        return scripted_reply(messages)
+
+    async def chat_stream(self, model: str, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        await asyncio.sleep(local_latency("chat"))   # time to first token
+        reply = scripted_reply(messages)
+
+        async def deltas():
+            for token in re.findall(r"\S+\s*|\s+", reply):
+                await asyncio.sleep(local_latency("token"))
+                yield token
+
+        return deltas()
+
+    async def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(local_latency("embed"))
+        return self.embed_sync(model, texts)
+
+    def embed_sync(self, model: str, texts: List[str]) -> List[List[float]]:
+        return [hashing_embedding(t) for t in texts]
+
+    async def speech(self, model: str, text: str, voice: str) -> bytes:
+        await asyncio.sleep(local_latency("tts"))
+        return silent_mp3(text)
+
+    async def aclose(self) -> None:
+        pass
+
+# ─── Selection ──────────────────────────────────────────────────
+_providers: Dict[str, object] = {}
+
+def get(timeout: float = 30.0, connect_timeout: float = 5.0):
+    """The configured provider (one instance per name, so clients are reused)."""
+    name = provider_name()
+    provider = _providers.get(name)
+    if provider is None:
+        if name == "local":
+            provider = LocalProvider()
+        elif name == "openai":
+            provider = OpenAIProvider(timeout, connect_timeout)
+        else:
+            raise ValueError(f"Unknown MODEL_PROVIDER {name!r} (expected 'openai' or 'local')")
+        _providers[name] = provider
+    return provider
+
+async def aclose() -> None:
+    for provider in _providers.values():
+        await provider.aclose()
+    _providers.clear()
+
+def langchain_chat_model(temperature: float, model: str, timeout: float, max_retries: int):
+    """Chat model for LangChain agents, following MODEL_PROVIDER."""
+    if provider_name() == "local":
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        # Conversational ReAct format: answer directly, no tool call
+        return FakeListChatModel(responses=[f"Do I need to use a tool? No\nAI: {q}" for q in LOCAL_QUESTIONS])
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(temperature=temperature, model=model, timeout=timeout, max_retries=max_retries)
@@ -1,70 +1,338 @@
 # backend/rag.py
 
 import os
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from chromadb import Client
-from chromadb.config import Settings
-from chromadb.utils import embedding_functions
+import numpy as np
+import sqlalchemy
+import llm_gateway
+from embedding_cache import embedding_cache
+from db import database, get_engine, candidate_resumes
 
 # Set ChromaDB directory (persistent)
 CHROMA_DIR = "./chroma_db"
 COLLECTION_NAME = "resumes"
 
-chroma_client = Client(Settings(persist_directory=CHROMA_DIR))
+TOP_K = 4
+INDEX_CACHE_SIZE = int(os.getenv("RESUME_INDEX_CACHE_SIZE", "256"))
+LINK_CACHE_SIZE = 10000
+CHUNK_LOOKUP_BATCH = 500   # chunk hashes per Chroma "$in" lookup
+NO_RESUME_TTL = float(os.getenv("NO_RESUME_TTL", "15"))   # seconds a "no resume indexed" answer is reused
+# "matrix" = in-memory NumPy top-k per candidate; "chroma" = metadata-filtered HNSW query
+SEARCH_MODE = os.getenv("RESUME_SEARCH_MODE", "matrix")
+
+# Chroma (and its import tree) is loaded on first use, not at import
+_chroma_client = None
+_chroma_lock = threading.Lock()
+
+def get_chroma_client():
+    global _chroma_client
+    if _chroma_client is None:
+        with _chroma_lock:
+            if _chroma_client is None:
+                from chromadb import Client
+                from chromadb.config import Settings
+                _chroma_client = Client(Settings(persist_directory=CHROMA_DIR, anonymized_telemetry=False))
+    return _chroma_client
 
 def get_or_create_collection():
     """Returns the resumes collection, creates it if it doesn’t exist."""
     try:
-        return chroma_client.get_collection(COLLECTION_NAME)
+        return get_chroma_client().get_collection(COLLECTION_NAME)
     except:
         print("⚠️ Collection not found. Creating new collection...")
-        return chroma_client.create_collection(name=COLLECTION_NAME)
+        return get_chroma_client().create_collection(name=COLLECTION_NAME)
 
-async def ingest_resume(path: str, content_type: str, candidate_id: str):
+def parse_and_split(path: str) -> Tuple[List[str], int]:
     """
-    Ingest a PDF resume into ChromaDB using OpenAI embeddings.
+    Load a PDF and split it into chunk texts; returns (texts, page_count).
+    CPU-bound and self-contained, so it can run in a worker process.
     """
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Resume file not found at {path}")
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-    # 1. Load PDF and extract text chunks
     loader = PyPDFLoader(path)
     documents = loader.load()
 
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
     chunks = text_splitter.split_documents(documents)
+    return [chunk.page_content for chunk in chunks], len(documents)
+
+def document_hash(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
 
-    # 2. Extract plain text
-    texts = [chunk.page_content for chunk in chunks]
-    metadatas = [{"candidate_id": candidate_id, "chunk_id": i} for i in range(len(texts))]
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
 
-    # 3. Embed using OpenAI
-    embedder = OpenAIEmbeddings()
-    vectors = await embedder.aembed_documents(texts)
+def resume_indexed(resume_hash: str) -> bool:
+    """True once this document's chunks are in Chroma (an identical upload can just link to them)."""
+    with _cache_lock:
+        if resume_hash in _indexes:
+            return True
+    found = get_or_create_collection().get(where={"resume_hash": resume_hash}, limit=1, include=[])
+    if found["ids"]:
+        resume_ready(resume_hash)
+    return bool(found["ids"])
 
-    # 4. Save to ChromaDB
+def known_chunk_vectors(hashes: List[str]) -> Dict[str, List[float]]:
+    """Embeddings already stored for any of these chunk hashes, from any resume."""
+    known: Dict[str, List[float]] = {}
     collection = get_or_create_collection()
-    ids = [f"{candidate_id}_{i}" for i in range(len(texts))]
-    collection.add(documents=texts, metadatas=metadatas, ids=ids, embeddings=vectors)
+    unique = list(dict.fromkeys(hashes))
+    for i in range(0, len(unique), CHUNK_LOOKUP_BATCH):
+        found = collection.get(
+            where={"chunk_hash": {"$in": unique[i:i + CHUNK_LOOKUP_BATCH]}},
+            include=["metadatas", "embeddings"],
+        )
+        for meta, vector in zip(found["metadatas"], found["embeddings"]):
+            known[meta["chunk_hash"]] = list(vector)
+    return known
 
-    print(f"✅ Ingested {len(texts)} resume chunks for {candidate_id}")
+async def index_chunks(resume_hash: str, texts: List[str], on_progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Store chunk texts in ChromaDB under `resume_hash`. Chunks whose text was
+    already embedded (for any resume) reuse that vector; only new ones are embedded.
+    """
+    if not texts:
+        return 0
+
+    # 1. Reuse stored vectors by chunk hash, embed the rest (shared async gateway, one request per batch)
+    hashes = [chunk_hash(t) for t in texts]
+    vectors_by_hash = await asyncio.to_thread(known_chunk_vectors, hashes)
+    missing = list(dict.fromkeys(h for h in hashes if h not in vectors_by_hash))
+    text_for = dict(zip(hashes, texts))
+    reused = len(texts) - len(missing)
+    if on_progress:
+        on_progress(reused)
+    for i in range(0, len(missing), llm_gateway.EMBED_BATCH):
+        batch = missing[i:i + llm_gateway.EMBED_BATCH]
+        vectors_by_hash.update(zip(batch, await llm_gateway.embed([text_for[h] for h in batch])))
+        if on_progress:
+            on_progress(reused + i + len(batch))
+    vectors = [vectors_by_hash[h] for h in hashes]
+
+    # 2. Save to ChromaDB (upsert: ids are deterministic, so a retried ingestion is harmless)
+    collection = get_or_create_collection()
+    metadatas = [{"resume_hash": resume_hash, "chunk_id": i, "chunk_hash": h} for i, h in enumerate(hashes)]
+    ids = [f"{resume_hash}_{i}" for i in range(len(texts))]
+    await asyncio.to_thread(collection.upsert, documents=texts, metadatas=metadatas, ids=ids, embeddings=vectors)
+    remember_index(resume_hash, CandidateIndex(texts, vectors))
+    resume_ready(resume_hash)
     return len(texts)
 
+async def ingest_resume(path: str, content_type: str, candidate_id: str, executor: Optional[Executor] = None):
+    """
+    Ingest a PDF resume into ChromaDB (embedded via llm_gateway), linked to `candidate_id`.
+    Parsing runs in `executor` (a process pool for ingestion jobs), never on the event loop.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Resume file not found at {path}")
+
+    with open(path, "rb") as f:
+        resume_hash = document_hash(f.read())
+    if await asyncio.to_thread(resume_indexed, resume_hash):
+        count = 0
+    else:
+        texts, _ = await asyncio.get_running_loop().run_in_executor(executor, parse_and_split, path)
+        count = await index_chunks(resume_hash, texts)
+    await link_resume(candidate_id, resume_hash)
+
+    print(f"✅ Ingested {count} resume chunks for {candidate_id}")
+    return count
+
+# ─── Candidate → Resume Links ─────────────────────────────────
+# These caches are used from worker threads (asyncio.to_thread) and the event loop alike
+_cache_lock = threading.Lock()
+_links: "OrderedDict[str, str]" = OrderedDict()   # candidate_id → resume_hash
+_missing: "OrderedDict[str, float]" = OrderedDict()   # candidate_id → when no indexed resume was found
+
+def remember_link(candidate_id: str, resume_hash: str) -> None:
+    with _cache_lock:
+        _links[candidate_id] = resume_hash
+        _links.move_to_end(candidate_id)
+        while len(_links) > LINK_CACHE_SIZE:
+            _links.popitem(last=False)
+        _missing.pop(candidate_id, None)
+
+def linked_resume(candidate_id: str) -> Optional[str]:
+    with _cache_lock:
+        return _links.get(candidate_id)
+
+def remember_missing(candidate_id: str) -> None:
+    with _cache_lock:
+        _missing[candidate_id] = time.monotonic()
+        _missing.move_to_end(candidate_id)
+        while len(_missing) > LINK_CACHE_SIZE:
+            _missing.popitem(last=False)
+
+def resume_ready(resume_hash: str) -> None:
+    """Candidates linked to a freshly indexed resume stop being treated as resume-less."""
+    with _cache_lock:
+        for candidate_id in [c for c, h in _links.items() if h == resume_hash]:
+            _missing.pop(candidate_id, None)
+
+def has_no_resume(candidate_id: str) -> bool:
+    """True if a lookup in the last NO_RESUME_TTL seconds found nothing (e.g. voice-only sessions)."""
+    with _cache_lock:
+        found_at = _missing.get(candidate_id)
+        if found_at is None:
+            return False
+        if time.monotonic() - found_at < NO_RESUME_TTL:
+            return True
+        del _missing[candidate_id]
+        return False
+
+async def link_resume(candidate_id: str, resume_hash: str) -> None:
+    await database.execute(
+        candidate_resumes.insert().values(candidate_id=candidate_id, resume_hash=resume_hash,
+                                          created_at=datetime.utcnow())
+    )
+    remember_link(candidate_id, resume_hash)
+
+async def mark_link_failed(candidate_id: str, error: str) -> None:
+    """Persist a failed ingestion; the status endpoint reports it after the job is gone."""
+    await database.execute(
+        candidate_resumes.update()
+        .where(candidate_resumes.c.candidate_id == candidate_id)
+        .values(ingest_error=error[:1000] or "Resume ingestion failed")
+    )
+
+def resume_link(candidate_id: str):
+    """The candidate's link row (resume_hash, created_at, ingest_error), or None (sync engine)."""
+    with get_engine().connect() as conn:
+        return conn.execute(
+            sqlalchemy.select(candidate_resumes.c.resume_hash, candidate_resumes.c.created_at,
+                              candidate_resumes.c.ingest_error)
+            .where(candidate_resumes.c.candidate_id == candidate_id)
+        ).first()
+
+def resolve_resume(candidate_id: str) -> Optional[str]:
+    """Linked resume hash (sync engine — called from worker threads); None for unlinked candidates."""
+    resume_hash = linked_resume(candidate_id)
+    if resume_hash is None:
+        with get_engine().connect() as conn:
+            resume_hash = conn.execute(
+                sqlalchemy.select(candidate_resumes.c.resume_hash)
+                .where(candidate_resumes.c.candidate_id == candidate_id)
+            ).scalar()
+        if resume_hash is None:
+            return None
+    remember_link(candidate_id, resume_hash)
+    return resume_hash
+
+# ─── Candidate-Scoped Vector Search ───────────────────────────
+class Doc:
+    def __init__(self, page_content: str):
+        self.page_content = page_content
+
+class CandidateIndex:
+    """One candidate's chunks as a row-normalized matrix; top-k is a single dot product."""
+
+    def __init__(self, texts: List[str], vectors):
+        self.texts = list(texts)
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    def top_k(self, query_vector, k: int = TOP_K) -> List[str]:
+        q = np.asarray(query_vector, dtype=np.float32)
+        q /= (np.linalg.norm(q) or 1.0)
+        scores = self.matrix @ q
+        k = min(k, len(self.texts))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [self.texts[i] for i in best]
+
+_indexes: "OrderedDict[str, CandidateIndex]" = OrderedDict()
+
+def remember_index(candidate_id: str, index: CandidateIndex) -> None:
+    with _cache_lock:
+        _indexes[candidate_id] = index
+        _indexes.move_to_end(candidate_id)
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+
+def cached_index(key: str) -> Optional[CandidateIndex]:
+    with _cache_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+        return index
+
+def resume_filter(candidate_id: str) -> Tuple[str, dict]:
+    """(cache key, Chroma where-filter) for a candidate's chunks."""
+    resume_hash = resolve_resume(candidate_id)
+    if resume_hash is None:
+        # Stored before content-addressed dedup: chunks carry the candidate id
+        return candidate_id, {"candidate_id": candidate_id}
+    return resume_hash, {"resume_hash": resume_hash}
+
+def candidate_index(candidate_id: str) -> Optional[CandidateIndex]:
+    """Cached matrix of the candidate's resume (shared by every candidate linked to it), loaded on first use."""
+    if has_no_resume(candidate_id):
+        return None
+    key, where = resume_filter(candidate_id)
+    index = cached_index(key)
+    if index is not None:
+        return index
+
+    found = get_or_create_collection().get(where=where, include=["documents", "embeddings"])
+    if not found["ids"]:
+        # Briefly remembered: the resume may still be ingesting (cleared when it is indexed here)
+        remember_missing(candidate_id)
+        return None
+    index = CandidateIndex(found["documents"], found["embeddings"])
+    remember_index(key, index)
+    return index
+
 def get_retriever(candidate_id: str):
     """
-    Returns a simple retriever interface to fetch relevant docs.
+    Returns a simple retriever over this candidate's resume chunks only.
     """
-    collection = get_or_create_collection()
+    def to_docs(query_vector):
+        if SEARCH_MODE == "chroma":
+            results = get_or_create_collection().query(
+                query_embeddings=[query_vector],
+                n_results=TOP_K,
+                where=resume_filter(candidate_id)[1],
+            )
+            if not results["documents"][0]:
+                remember_missing(candidate_id)
+            return [Doc(d) for d in results["documents"][0]]
+
+        index = candidate_index(candidate_id)
+        if index is None:
+            return []
+        return [Doc(d) for d in index.top_k(query_vector)]
 
     class SimpleRetriever:
         def get_relevant_documents(self, query: str):
-            embedder = OpenAIEmbeddings()
-            query_vector = embedder.embed_query(query)
-            results = collection.query(query_embeddings=[query_vector], n_results=4)
-            return [type("Doc", (), {"page_content": d}) for d in results["documents"][0]]
+            # Sync path for LangChain tools (agent.py)
+            if has_no_resume(candidate_id):
+                return []
+            query_vector = embedding_cache.get(query)
+            if query_vector is None:
+                query_vector = llm_gateway.embed_query_sync(query)
+                embedding_cache.put(query, query_vector)
+            return to_docs(query_vector)
+
+        async def aget_relevant_documents(self, query: str):
+            if has_no_resume(candidate_id):
+                return []   # skip the embedding call as well
+            query_vector = await embedding_cache.embed_query(query)
+            if SEARCH_MODE != "chroma" and cached_index(linked_resume(candidate_id) or candidate_id) is not None:
+                return to_docs(query_vector)
+            # Chroma I/O (cold index load or HNSW query) stays off the event loop
+            return await asyncio.to_thread(to_docs, query_vector)
 
     return SimpleRetriever()
@@ -1,12 +1,26 @@
 # backend/routes/admin.py
 
 import os
+import json
+import math
+import base64
+import asyncio
 import secrets
-from fastapi import APIRouter, Query, HTTPException, Depends, status
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from uuid import uuid4
+from fastapi import APIRouter, Query, HTTPException, Depends, status, UploadFile, File
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from db import database, interview_logs, behavior_logs, interview_sessions
+from routes.log_behavior import VALID_EMOTIONS, VALID_GAZE
+from background import spawn
+import bulk_ingest
+import ingest_jobs
+import startup_profile
 import sqlalchemy
 
+BULK_UPLOAD_DIR = os.getenv("BULK_UPLOAD_DIR", "./bulk_uploads")
+
 # HTTP Basic auth setup
 security = HTTPBasic()
 
@@ -34,14 +48,66 @@ router = APIRouter(
     prefix="/admin"
 )
 
+# ─── Keyset Pagination ────────────────────────────────────
+# Pages are ordered by (timestamp, id) and continue strictly after the last row
+# seen (no OFFSET), so deep pages cost the same as the first one.
+PAGE_SIZE     = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(at: datetime, key) -> str:
+    raw = json.dumps([at.isoformat(), key]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, object]:
+    try:
+        at, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(at), key
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Invalid cursor.")
+
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; accept offset-aware filters too."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+async def fetch_page(columns, time_col, id_col, where, cursor: Optional[str], limit: int,
+                     since: Optional[datetime], until: Optional[datetime], newest_first: bool = False):
+    """One page of `columns` plus the cursor for the next page (None on the last one)."""
+    conditions = list(where)
+    if since:
+        conditions.append(time_col >= utc_naive(since))
+    if until:
+        conditions.append(time_col < utc_naive(until))
+    if cursor:
+        position = sqlalchemy.tuple_(time_col, id_col)
+        at, key = decode_cursor(cursor)
+        after = sqlalchemy.tuple_(sqlalchemy.literal(at, time_col.type), sqlalchemy.literal(key, id_col.type))
+        conditions.append(position < after if newest_first else position > after)
+
+    order = (time_col.desc(), id_col.desc()) if newest_first else (time_col.asc(), id_col.asc())
+    q = sqlalchemy.select(*columns).where(*conditions).order_by(*order).limit(limit + 1)
+    rows = await database.fetch_all(q)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][time_col.name], rows[-1][id_col.name])
+    return rows, next_cursor
+
 # ─── 1) List all sessions ─────────────────────────────────
 @router.get("/interview-sessions")
-async def get_sessions():
-    q = (
-        interview_sessions.select()
-        .order_by(interview_sessions.c.created_at.desc())
+async def get_sessions(
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    t = interview_sessions.c
+    rows, next_cursor = await fetch_page(
+        [t.id, t.candidate_name, t.job_role, t.resume_file, t.created_at],
+        t.created_at, t.id, [], cursor, limit, since, until, newest_first=True,
     )
-    rows = await database.fetch_all(q)
     return {
         "sessions": [
             {
@@ -52,25 +118,30 @@ async def get_sessions():
                 "created_at": r["created_at"],
             }
             for r in rows
-        ]
+        ],
+        "next_cursor": next_cursor,
     }
 
 # ─── 2) Q&A log ───────────────────────────────────────────
 @router.get("/qa-log")
 async def get_qa_log(
     candidate_id: str = Query(...),
-    include_unscored: bool = False
+    include_unscored: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
 ):
-    q = (
-        interview_logs.select()
-        .where(interview_logs.c.candidate_id == candidate_id)
-        .order_by(interview_logs.c.timestamp.asc())
-    )
+    t = interview_logs.c
+    where = [t.candidate_id == candidate_id]
     if not include_unscored:
-        q = q.where(interview_logs.c.score.isnot(None))
+        where.append(t.score.isnot(None))
 
-    rows = await database.fetch_all(q)
-    if not rows:
+    rows, next_cursor = await fetch_page(
+        [t.id, t.question, t.answer, t.score, t.subscores, t.hallucination, t.timestamp],
+        t.timestamp, t.id, where, cursor, limit, since, until,
+    )
+    if not rows and not cursor:
         raise HTTPException(404, "No answers found for this candidate.")
     return {
         "qa_log": [
@@ -83,18 +154,24 @@ async def get_qa_log(
                 "timestamp": r["timestamp"].isoformat()
             }
             for r in rows
-        ]
+        ],
+        "next_cursor": next_cursor,
     }
 
 # ─── 3) Behavior logs ────────────────────────────────────
 @router.get("/behavior-logs")
-async def get_behavior_logs(candidate_id: str = Query(...)):
-    q = (
-        behavior_logs.select()
-        .where(behavior_logs.c.session_id == candidate_id)
-        .order_by(behavior_logs.c.timestamp.asc())
+async def get_behavior_logs(
+    candidate_id: str = Query(...),
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    t = behavior_logs.c
+    rows, next_cursor = await fetch_page(
+        [t.id, t.timestamp, t.emotion, t.face_present, t.gaze_direction],
+        t.timestamp, t.id, [t.session_id == candidate_id], cursor, limit, since, until,
     )
-    rows = await database.fetch_all(q)
     return {
         "logs": [
             {
@@ -104,5 +181,135 @@ async def get_behavior_logs(candidate_id: str = Query(...)):
                 "gaze_direction": r["gaze_direction"]
             }
             for r in rows
-        ]
+        ],
+        "next_cursor": next_cursor,
     }
+
+# ─── 4) Bulk resume ingestion ─────────────────────────────
+def save_upload(path: str, contents: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(contents)
+
+@router.post("/bulk-ingest")
+async def start_bulk_ingest(files: List[UploadFile] = File(...)):
+    job_id = str(uuid4())
+    directory = os.path.join(BULK_UPLOAD_DIR, job_id)
+    os.makedirs(directory, exist_ok=True)
+
+    saved = 0
+    for i, upload in enumerate(files):
+        if not upload.filename.lower().endswith(".pdf"):
+            continue
+        name = f"{i:05d}_{os.path.basename(upload.filename)}"
+        await asyncio.to_thread(save_upload, os.path.join(directory, name), await upload.read())
+        saved += 1
+    if not saved:
+        raise HTTPException(400, "No PDF files uploaded.")
+
+    spawn(bulk_ingest.run_job(job_id, directory, ingest_jobs.get_pool()), name=f"bulk:{job_id}")
+    return {"job_id": job_id, "files": saved, "status_url": f"/admin/bulk-ingest/{job_id}"}
+
+@router.get("/bulk-ingest/{job_id}")
+async def bulk_ingest_status(job_id: str):
+    report = bulk_ingest.get_job(job_id)
+    if report:
+        return report.to_dict()
+    if os.path.isdir(os.path.join(BULK_UPLOAD_DIR, job_id)):
+        return {"job_id": job_id, "status": "interrupted"}
+    raise HTTPException(404, "Unknown bulk ingestion job.")
+
+@router.post("/bulk-ingest/{job_id}/resume")
+async def resume_bulk_ingest(job_id: str):
+    """Continue an interrupted job (e.g. after a restart); finished resumes are skipped."""
+    directory = os.path.join(BULK_UPLOAD_DIR, job_id)
+    if not os.path.isdir(directory):
+        raise HTTPException(404, "Nothing to resume for this job.")
+    report = bulk_ingest.get_job(job_id)
+    if report and report.status == "running":
+        raise HTTPException(409, "Job is still running.")
+    spawn(bulk_ingest.run_job(job_id, directory, ingest_jobs.get_pool()), name=f"bulk:{job_id}")
+    return {"job_id": job_id, "status": "running", "status_url": f"/admin/bulk-ingest/{job_id}"}
+
+# ─── 5) Engagement timeline ──────────────────────────────
+# Behavior frames aggregated per time bucket in SQL: a session of tens of
+# thousands of frames comes back as at most a few hundred points.
+TIMELINE_POINTS      = 300                 # target bucket count when no width is given
+MAX_TIMELINE_BUCKETS = 5000
+
+def bucket_of(col, width: int):
+    """Bucket number (epoch seconds // width), computed by the database."""
+    if database.url.dialect == "sqlite":
+        # Epoch milliseconds from the Julian day, then integer division
+        epoch_ms = sqlalchemy.func.round((sqlalchemy.func.julianday(col) - 2440587.5) * 86400000)
+        return sqlalchemy.cast(epoch_ms, sqlalchemy.Integer) // (width * 1000)
+    return sqlalchemy.func.floor(sqlalchemy.extract("epoch", col) / width)
+
+def count_where(condition):
+    return sqlalchemy.func.sum(sqlalchemy.case((condition, 1), else_=0))
+
+@router.get("/engagement-timeline")
+async def get_engagement_timeline(
+    candidate_id: str = Query(...),
+    bucket_seconds: Optional[int] = Query(None, ge=1, le=86400),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    t = behavior_logs.c
+    where = [t.session_id == candidate_id]
+    if since:
+        where.append(t.timestamp >= utc_naive(since))
+    if until:
+        where.append(t.timestamp < utc_naive(until))
+
+    span = await database.fetch_one(
+        sqlalchemy.select(sqlalchemy.func.min(t.timestamp).label("first"),
+                          sqlalchemy.func.max(t.timestamp).label("last")).where(*where)
+    )
+    if span is None or span["first"] is None:
+        return {"candidate_id": candidate_id, "bucket_seconds": bucket_seconds, "buckets": []}
+
+    seconds = (span["last"] - span["first"]).total_seconds()
+    if bucket_seconds is None:
+        bucket_seconds = max(1, math.ceil(seconds / TIMELINE_POINTS))
+    if seconds / bucket_seconds > MAX_TIMELINE_BUCKETS:
+        raise HTTPException(400, f"bucket_seconds too small for this range (max {MAX_TIMELINE_BUCKETS} buckets).")
+
+    emotions, gazes = sorted(VALID_EMOTIONS), sorted(VALID_GAZE)
+    bucket = bucket_of(t.timestamp, bucket_seconds).label("bucket")
+    q = (
+        sqlalchemy.select(
+            bucket,
+            sqlalchemy.func.count().label("frames"),
+            sqlalchemy.func.avg(t.engagement_score).label("engagement"),
+            count_where(t.face_present.is_(True)).label("face_present"),
+            *(count_where(t.emotion == e).label(f"emotion_{e}") for e in emotions),
+            *(count_where(t.gaze_direction == g).label(f"gaze_{g}") for g in gazes),
+        )
+        .where(*where)
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    rows = await database.fetch_all(q)
+
+    return {
+        "candidate_id": candidate_id,
+        "bucket_seconds": bucket_seconds,
+        "buckets": [
+            {
+                "start": datetime.fromtimestamp(int(r["bucket"]) * bucket_seconds, timezone.utc)
+                         .replace(tzinfo=None).isoformat(),
+                "frames": r["frames"],
+                "engagement": round(float(r["engagement"]), 3),
+                "face_present_ratio": round(r["face_present"] / r["frames"], 3),
+                "emotions": {e: r[f"emotion_{e}"] for e in emotions if r[f"emotion_{e}"]},
+                "gaze": {g: r[f"gaze_{g}"] for g in gazes if r[f"gaze_{g}"]},
+            }
+            for r in rows
+        ],
+    }
+
+# ─── 6) Startup profile ──────────────────────────────────
+@router.get("/startup-profile")
+async def get_startup_profile(top: int = Query(20, ge=1, le=200)):
+    """Per-module import cost and startup phase timings (see startup_profile.py)."""
+    return startup_profile.report(top)
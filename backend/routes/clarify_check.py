@@ -1,11 +1,37 @@
 # backend/routes/clarify_check.py
 
+import re
+from typing import Tuple
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from openai import OpenAI
+import llm_gateway
 
 router = APIRouter()
-client = OpenAI()
+
+INTENTS = ("clarify", "teach", "other")
+
+# ─── In-process intent (folded into the /ask completion) ─────────
+INTENT_INSTRUCTIONS = """
+Before anything else, classify the candidate's latest message against your previous question.
+The FIRST line of every reply must be exactly one of:
+  INTENT: clarify   → they asked you to rephrase or simplify the question. Then give a simpler rephrasing of that same question.
+  INTENT: teach     → they asked you to explain the answer. Then write nothing else.
+  INTENT: other     → a normal answer, [EMPTY], [SKIP] or anything else. Then continue as instructed above.
+"""
+
+INTENT_LINE = re.compile(r"^\s*INTENT:\s*(clarify|teach|other)\b[^\n]*(\n|$)", re.IGNORECASE)
+
+def parse_intent_header(text: str) -> Tuple[str, str]:
+    """(intent, rest) for a reply prefix; `rest` keeps trailing whitespace so deltas can follow."""
+    m = INTENT_LINE.match(text or "")
+    if not m:
+        return "other", (text or "").lstrip()
+    return m.group(1).lower(), text[m.end():].lstrip()
+
+def split_intent(reply: str) -> Tuple[str, str]:
+    """Split a completion into (intent, body). Replies without a header count as "other"."""
+    intent, body = parse_intent_header(reply)
+    return intent, body.strip()
 
 class ClarifyCheckRequest(BaseModel):
     user_input: str
@@ -29,15 +55,15 @@ Question: {req.question}
 User Input: {req.user_input}
 """
 
-        resp = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": "Classify user intent."},
-                      {"role": "user", "content": prompt}],
+        reply = await llm_gateway.chat(
+            [{"role": "system", "content": "Classify user intent."},
+             {"role": "user", "content": prompt}],
+            model=llm_gateway.CHAT_MODEL,
             temperature=0,
         )
-        intent = resp.choices[0].message.content.strip().lower()
+        intent = reply.strip().lower()
 
-        if intent not in ("clarify", "teach", "other"):
+        if intent not in INTENTS:
             intent = "other"
 
         return {"type": intent}
@@ -1,18 +1,28 @@
 import os
+import json
+import asyncio
 import traceback
 from uuid import uuid4
 from datetime import datetime
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from db import database, interview_logs, interview_sessions
-from rag import ingest_resume, get_retriever
-from scoring import score_answer
+from rag import get_retriever, candidate_index, document_hash, link_resume, resume_indexed, resume_link
+from scoring import scoring_batcher, score_session
 from tone import compute_tone
 from coaching_trigger import get_hint
-
-import requests
-from openai import OpenAI
-client = OpenAI()
+from phrases import OPENING_QUESTIONS, TEACH_REPLY
+from background import spawn
+from conversation_store import KICKOFF, MARKERS, Conversation, conversation_store
+from prompt_builder import PromptBuilder, load_profile
+from speculation import speculator
+from audio_cache import audio_cache
+from routes.speak import DEFAULT_VOICE, synth
+import ingest_jobs
+from routes.clarify_check import INTENT_INSTRUCTIONS, parse_intent_header, split_intent
+import llm_gateway
 
 router = APIRouter()
 
@@ -32,6 +42,10 @@ async def start_session():
     return {"session_id": session_id}
 
 # ─── Upload Resume ─────────────────────────────────────────────
+def write_file(path: str, contents: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(contents)
+
 @router.post("/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     ext = file.filename.split(".")[-1].lower()
@@ -43,13 +57,7 @@ async def upload_resume(file: UploadFile = File(...)):
 
     try:
         contents = await file.read()
-        with open(temp_path, "wb") as f:
-            f.write(contents)
-
-        print(f"📄 Saved uploaded resume: {temp_path}")
-        print(f"📄 Ingesting for candidate_id: {candidate_id}")
-
-        chunks = await ingest_resume(temp_path, "application/pdf", candidate_id)
+        resume_hash = document_hash(contents)
 
         await database.execute(
             interview_sessions.insert().values(
@@ -60,83 +68,62 @@ async def upload_resume(file: UploadFile = File(...)):
                 resume_file=file.filename
             )
         )
-
-        print(f"✅ Resume ingested: {chunks} chunks")
-        return {"status": "ok", "chunks_indexed": chunks, "candidate_id": candidate_id}
+        await link_resume(candidate_id, resume_hash)
+
+        if await asyncio.to_thread(resume_indexed, resume_hash):
+            # Same PDF seen before: the new session just points at the stored vectors
+            print(f"📄 Resume already indexed, linked candidate_id: {candidate_id}")
+            job = ingest_jobs.finished(candidate_id, file.filename)
+        else:
+            await asyncio.to_thread(write_file, temp_path, contents)
+            print(f"📄 Saved uploaded resume: {temp_path}")
+            print(f"📄 Queued ingestion for candidate_id: {candidate_id}")
+
+            # Parsing, embedding and indexing continue in the background; poll resume-status
+            job = ingest_jobs.submit(candidate_id, temp_path, file.filename, resume_hash)
+        return {
+            "status": job.status,
+            "candidate_id": candidate_id,
+            "job_id": job.job_id,
+            "deduplicated": job.deduplicated,
+            "status_url": f"/interview/resume-status/{candidate_id}",
+        }
 
     except Exception as e:
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Resume ingestion failed: {str(e)}")
-
-    finally:
         if os.path.exists(temp_path):
             os.remove(temp_path)
+        raise HTTPException(status_code=500, detail=f"Resume ingestion failed: {str(e)}")
+
+@router.get("/resume-status/{candidate_id}")
+async def resume_status(candidate_id: str):
+    job = ingest_jobs.get(candidate_id)
+    if job:
+        return job.to_dict()
+
+    # Job ran on another worker or has expired — the link row and the index are the source of truth
+    link = await asyncio.to_thread(resume_link, candidate_id)
+    if link is not None:
+        indexed = await asyncio.to_thread(resume_indexed, link.resume_hash)
+        index = await asyncio.to_thread(candidate_index, candidate_id) if indexed else None
+        return ingest_jobs.from_link(candidate_id, link, indexed, index and len(index.texts))
+    index = await asyncio.to_thread(candidate_index, candidate_id)
+    if index is None:
+        return {"job_id": candidate_id, "candidate_id": candidate_id, "status": "unknown", "progress": 0.0}
+    return {"job_id": candidate_id, "candidate_id": candidate_id, "status": "done",
+            "progress": 1.0, "chunks_total": len(index.texts)}
 
 # ─── Ask Endpoint ──────────────────────────────────────────────
 class AskRequest(BaseModel):
     user_input: str
-    history: list
     candidate_id: str
     session_id: str
+    # Legacy clients send the whole conversation every turn; omit it to use the server-side store
+    history: Optional[list] = None
+    # What ASR has heard so far, while the candidate is still speaking (speculation.py)
+    partial: bool = False
 
-@router.post("/ask")
-async def ask(req: AskRequest):
-    try:
-        real_answers = [
-            m for m in req.history 
-            if m["role"] == "user" and m["content"] not in ("[EMPTY]", "[SKIP]")
-        ]
-
-        # ── Initial questions ──
-        if len(real_answers) == 0:
-            return {"answer": "Hello! Which role are you applying for today?", "score": None}
-        if len(real_answers) == 1:
-            return {"answer": "Please give me a brief introduction of your previous work experience, education, and key skills.", "score": None}
-
-        # ── Extract previous real question ──
-        def extract_last_question(history):
-            for entry in reversed(history):
-                if entry["role"] != "assistant":
-                    continue
-                content = entry["content"].strip().lower()
-                if any(skip in content for skip in [
-                    "would you like me to repeat",
-                    "let's move on",
-                    "since i didn't hear anything",
-                    "💡 hint"
-                ]):
-                    continue
-                return entry["content"]
-            return "[unknown]"
-
-        prev_q = extract_last_question(req.history)
-
-        # ─── Clarify / Teach Check ───────────────────────────────
-        try:
-            clarify_url = os.getenv("CLARIFY_CHECK_URL", f"{os.getenv('BACKEND_URL', 'http://localhost:8000')}/clarify-check")
-            response = requests.post(clarify_url, json={
-                "user_input": req.user_input,
-                "question": prev_q
-            }, timeout=10)
-            clarify_type = response.json().get("type", "other")
-        except Exception as e:
-            print("⚠️ Clarify check failed:", e)
-            clarify_type = "other"
-
-        if clarify_type == "teach":
-            return {
-                "answer": "I'm here to evaluate your understanding, so I can’t explain the answer. Please try your best.",
-                "score": None
-            }
-
-        if clarify_type == "clarify":
-            return {
-                "answer": f"Sure! Here's a simpler version of the question:\n\n{prev_q}",
-                "score": None
-            }
-
-        # ─── Construct LLM Prompt ───────────────────────────────
-        SYSTEM_PROMPT = """
+SYSTEM_PROMPT = """
 You are a professional, supportive AI interview agent.
 On each turn you will receive exactly one of:
   • The candidate’s spoken text  
@@ -156,66 +143,319 @@ Adapt difficulty level:
 • Start with foundational questions if the topic is new or under-explored.
 • Progress to advanced follow-ups if the candidate shows strong understanding.
 Tone should be adapted based on recent behavior logs (e.g., supportive if the user appears disengaged).
-"""
-
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        for m in req.history:
-            messages.append({"role": m["role"], "content": m["content"]})
-        messages.append({"role": "user", "content": req.user_input})
-
-        # ─── Inject Resume Context ──────────────────────────────
-        try:
-            retriever = get_retriever(candidate_id=req.candidate_id)
-            docs = retriever.get_relevant_documents(req.user_input)
-            context = "\n".join(d.page_content for d in docs)
-        except Exception as e:
-            print(f"⚠️ Vector DB retrieval failed: {e}")
-            context = ""
-        messages.insert(1, {"role": "system", "content": f"Resume context:\n{context}"})
-
-
-        # ─── Inject Candidate Tone ──────────────────────────────
-        try:
-            tone = await compute_tone(req.session_id)
-            messages.insert(2, {"role": "system", "content": f"The candidate seems {tone}. Adjust your tone accordingly."})
-        except:
-            pass
-
-        # ─── Query LLM ──────────────────────────────────────────
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0.7,
+""" + INTENT_INSTRUCTIONS
+
+prompt_builder = PromptBuilder(SYSTEM_PROMPT)
+
+# ─── Conversation State ────────────────────────────────────────
+async def load_conversation(req: AskRequest) -> Tuple[Conversation, int]:
+    """The conversation so far and the answer count including this turn."""
+    if req.history is not None:
+        # Legacy: the client's history already contains this turn's utterance
+        conversation = Conversation.from_history(req.session_id, req.history)
+        return conversation, conversation.answers
+    conversation = await conversation_store.get(req.session_id)
+    return conversation, conversation.answers_with(req.user_input)
+
+async def remember_turn(req: AskRequest, answer: str) -> None:
+    """Write-through of this exchange (server-side conversations only)."""
+    if req.history is None:
+        await conversation_store.record_turn(req.session_id, req.user_input, answer)
+
+# ─── Pipeline Stages ───────────────────────────────────────────
+async def retrieve_context(candidate_id: str, query: str) -> List[str]:
+    try:
+        retriever = get_retriever(candidate_id=candidate_id)
+        docs = await retriever.aget_relevant_documents(query)
+        return [d.page_content for d in docs]
+    except Exception as e:
+        print(f"⚠️ Vector DB retrieval failed: {e}")
+        return []
+
+async def safe_profile(candidate_id: str) -> str:
+    try:
+        return await load_profile(candidate_id)
+    except Exception as e:
+        print(f"⚠️ Resume profile failed: {e}")
+        return ""
+
+async def safe_tone(session_id: str):
+    try:
+        return await compute_tone(session_id)
+    except Exception as e:
+        print("⚠️ Tone computation failed:", e)
+        return None
+
+async def safe_hint(session_id: str) -> str:
+    try:
+        return await get_hint(session_id)
+    except Exception as e:
+        print("⚠️ Coaching hint error:", e)
+        return ""
+
+async def log_answer(candidate_id: str, question: str, answer: str, result: dict, asked_at: datetime) -> None:
+    await database.execute(
+        interview_logs.insert().values(
+            candidate_id=candidate_id,
+            question=question,
+            answer=answer,
+            score=result["score"],
+            subscores=result["subscores"],
+            hallucination=result["hallucination"],
+            timestamp=asked_at,
         )
-        next_q = response.choices[0].message.content
+    )
+
+async def score_and_log(candidate_id: str, question: str, answer: str, resume: str, asked_at: datetime) -> dict:
+    result = await scoring_batcher.score(question, answer, resume=resume)
+    await log_answer(candidate_id, question, answer, result, asked_at)
+    return result
+
+async def log_when_scored(score_task: asyncio.Task, candidate_id: str, question: str, answer: str, asked_at: datetime) -> None:
+    await log_answer(candidate_id, question, answer, await score_task, asked_at)
+
+def initial_reply(answers: int):
+    """Fixed opening questions for the first two turns, else None."""
+    if answers < len(OPENING_QUESTIONS):
+        return OPENING_QUESTIONS[answers]
+    return None
+
+def build_messages(req: AskRequest, conversation: Conversation, profile: str, excerpts: List[str], tone) -> list:
+    # Legacy clients resend their history each turn, so there is no summary to keep
+    return prompt_builder.build(conversation, req.user_input, profile=profile, excerpts=excerpts,
+                                tone=tone, summarize=req.history is None)
+
+def clarify_reply(question: str) -> str:
+    return f"Sure! Here's a simpler version of the question:\n\n{question}"
+
+async def draft_turn(req: AskRequest, conversation: Conversation) -> dict:
+    """
+    The reply to `req.user_input` as {"intent", "answer", "context"}. Nothing is
+    stored or scored here, so a draft made from a partial transcript can be dropped.
+    """
+    # Hint is only needed after generation, so it overlaps the LLM call too
+    hint_task = asyncio.create_task(safe_hint(req.session_id))
+    try:
+        # ─── Independent stages run concurrently ────────────────
+        excerpts, tone, profile = await asyncio.gather(
+            retrieve_context(req.candidate_id, req.user_input),
+            safe_tone(req.session_id),
+            safe_profile(req.candidate_id),
+        )
+        context = "\n".join(excerpts)
+        messages = build_messages(req, conversation, profile, excerpts, tone)
+
+        # ─── Query LLM (next question + clarify/teach intent) ────
+        reply = await llm_gateway.chat(messages, model=llm_gateway.CHAT_MODEL, temperature=0.7)
+        intent, next_q = split_intent(reply)
+
+        if intent == "teach":
+            return {"intent": intent, "answer": TEACH_REPLY, "context": context}
+        if intent == "clarify":
+            return {"intent": intent, "answer": clarify_reply(next_q or conversation.last_question), "context": context}
 
         # ─── Append Coaching Hint ──────────────────────────────
-        try:
-            coaching_hint = await get_hint(req.session_id)
-            if coaching_hint:
-                next_q += f"\n\n💡 Hint: {coaching_hint}"
-        except Exception as e:
-            print("⚠️ Coaching hint error:", e)
-
-        # ─── Score & Log Last Answer (✅ now passes resume to scoring) ─────
-        result = await score_answer(prev_q, req.user_input, resume=context)
-        await database.execute(
-            interview_logs.insert().values(
-                candidate_id=req.candidate_id,
-                question=prev_q,
-                answer=req.user_input,
-                score=result["score"],
-                subscores=result["subscores"],
-                hallucination=result["hallucination"],
-                timestamp=datetime.utcnow(),
-            )
+        coaching_hint = await hint_task
+        if coaching_hint:
+            next_q += f"\n\n💡 Hint: {coaching_hint}"
+        return {"intent": "other", "answer": next_q, "context": context}
+    finally:
+        hint_task.cancel()
+
+async def presynthesize(draft: dict) -> None:
+    # Same text the client will post to /speak; a request arriving mid-synthesis shares it.
+    # Runs inside the speculation task, so a dropped draft stops paying for its audio.
+    answer = draft["answer"]
+    await audio_cache.get_or_create(answer, DEFAULT_VOICE, synth(answer, DEFAULT_VOICE), abandon=True,
+                                    model=llm_gateway.TTS_MODEL)
+
+async def speculate(req: AskRequest) -> dict:
+    """Start drafting the reply to a partial transcript; the final /ask decides whether it is used."""
+    if req.history is not None or req.user_input in MARKERS or req.user_input == KICKOFF:
+        return {"answer": None, "speculating": False}
+    conversation = await conversation_store.get(req.session_id)
+    if initial_reply(conversation.answers_with(req.user_input)):
+        return {"answer": None, "speculating": False}   # fixed, pre-warmed opening questions
+    speculator.start(req.session_id, req.user_input, len(conversation.turns),
+                     lambda: draft_turn(req, conversation), presynthesize)
+    return {"answer": None, "speculating": True}
+
+@router.post("/ask")
+async def ask(req: AskRequest):
+    try:
+        if req.partial:
+            return await speculate(req)
+
+        conversation, answers = await load_conversation(req)
+
+        # ── Initial questions ──
+        opening = initial_reply(answers)
+        if opening:
+            speculator.discard(req.session_id)
+            await remember_turn(req, opening)
+            return {"answer": opening, "score": None}
+
+        asked_at = datetime.utcnow()
+        prev_q = conversation.last_question
+
+        draft = None
+        if req.history is None:
+            draft = await speculator.take(req.session_id, req.user_input, len(conversation.turns))
+        speculated = draft is not None
+        if draft is None:
+            draft = await draft_turn(req, conversation)
+
+        if draft["intent"] != "other":
+            await remember_turn(req, draft["answer"])
+            return {"answer": draft["answer"], "score": None}
+
+        # ─── Score & Log Last Answer off the critical path ──────
+        # Always the final utterance, even when the question was drafted from a partial one
+        spawn(
+            score_and_log(req.candidate_id, prev_q, req.user_input, draft["context"], asked_at),
+            name=f"score:{req.candidate_id}",
         )
 
-        return {
-            "answer": next_q,
-            **result
-        }
+        await remember_turn(req, draft["answer"])
+        return {"answer": draft["answer"], "score": None, "scoring": "pending", "speculated": speculated}
 
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(500, f"/ask failed: {e}")
+
+@router.get("/speculation-stats")
+async def speculation_stats():
+    return speculator.stats()
+
+# ─── Streaming Ask (SSE) ───────────────────────────────────────
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+INTENT_HEADER_MAX = 40   # chars to buffer while looking for the INTENT line
+
+async def stream_turn(req: AskRequest):
+    """
+    Event order: `token`* → `hint`? → `score`? → `done`, or `error`.
+    `done.answer` is the full text exactly as /ask would have returned it.
+    """
+    try:
+        conversation, answers = await load_conversation(req)
+    except Exception as e:
+        traceback.print_exc()
+        yield sse("error", {"detail": f"/ask failed: {e}"})
+        return
+
+    opening = initial_reply(answers)
+    if opening:
+        await remember_turn(req, opening)
+        yield sse("token", {"text": opening})
+        yield sse("done", {"answer": opening, "intent": "other"})
+        return
+
+    asked_at = datetime.utcnow()
+    prev_q = conversation.last_question
+
+    hint_task = asyncio.create_task(safe_hint(req.session_id))
+    score_task = None
+    committed = False
+
+    def commit():
+        # Log the scored answer in the background so it survives a client disconnect
+        nonlocal committed
+        committed = True
+        spawn(log_when_scored(score_task, req.candidate_id, prev_q, req.user_input, asked_at),
+              name=f"log:{req.candidate_id}")
+
+    try:
+        excerpts, tone, profile = await asyncio.gather(
+            retrieve_context(req.candidate_id, req.user_input),
+            safe_tone(req.session_id),
+            safe_profile(req.candidate_id),
+        )
+        context = "\n".join(excerpts)
+        # Scoring doesn't depend on the next question, so it runs alongside generation;
+        # it is dropped again if the turn turns out to be a clarify/teach request
+        score_task = spawn(scoring_batcher.score(prev_q, req.user_input, resume=context), name=f"score:{req.candidate_id}")
+
+        intent, head, prefix, body = None, "", "", ""
+        async for delta in llm_gateway.chat_stream(build_messages(req, conversation, profile, excerpts, tone), model=llm_gateway.CHAT_MODEL, temperature=0.7):
+            if intent is None:
+                # Hold tokens back until the INTENT header line is complete
+                head += delta
+                if "\n" not in head and len(head) < INTENT_HEADER_MAX:
+                    continue
+                intent, delta = parse_intent_header(head)
+                if intent == "teach":
+                    break
+                if intent == "clarify":
+                    prefix = clarify_reply("")
+                    yield sse("token", {"text": prefix})
+                else:
+                    commit()
+            elif not body:
+                delta = delta.lstrip()
+            if delta:
+                body += delta
+                yield sse("token", {"text": delta})
+
+        if intent is None:
+            # Stream ended while still buffering the header
+            intent, body = split_intent(head)
+            if intent == "clarify":
+                prefix = clarify_reply("")
+                yield sse("token", {"text": prefix})
+            elif intent == "other":
+                commit()
+            if intent != "teach" and body:
+                yield sse("token", {"text": body})
+
+        if intent != "other":
+            if intent == "clarify" and not body.strip():
+                body = prev_q
+                yield sse("token", {"text": body})
+            answer = TEACH_REPLY if intent == "teach" else prefix + body.rstrip()
+            if intent == "teach":
+                yield sse("token", {"text": TEACH_REPLY})
+            await remember_turn(req, answer)
+            yield sse("done", {"answer": answer, "intent": intent})
+            return
+
+        answer = body.rstrip()
+        coaching_hint = await hint_task
+        if coaching_hint:
+            hint_text = f"\n\n💡 Hint: {coaching_hint}"
+            answer += hint_text
+            yield sse("hint", {"hint": coaching_hint, "text": hint_text})
+
+        yield sse("score", await asyncio.shield(score_task))
+        await remember_turn(req, answer)
+        yield sse("done", {"answer": answer, "intent": intent})
+
+    except Exception as e:
+        traceback.print_exc()
+        yield sse("error", {"detail": f"/ask failed: {e}"})
+
+    finally:
+        hint_task.cancel()
+        if score_task is not None and not committed:
+            score_task.cancel()
+
+@router.post("/ask/stream")
+async def ask_stream(req: AskRequest):
+    return StreamingResponse(
+        stream_turn(req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ─── End-of-Session Scoring ────────────────────────────────────
+class EndSessionRequest(BaseModel):
+    candidate_id: str
+    rescore: bool = False   # re-score every answer, not just the unscored ones
+
+@router.post("/end-session")
+async def end_session(req: EndSessionRequest):
+    """Score the session's remaining answers in batched rubric requests (against the whole resume)."""
+    index = await asyncio.to_thread(candidate_index, req.candidate_id)
+    resume = "\n".join(index.texts) if index else ""
+    return await score_session(req.candidate_id, resume=resume, rescore=req.rescore)
@@ -1,9 +1,11 @@
 # backend/routes/log_behavior.py
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from datetime import datetime
-from db import database, behavior_logs
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from typing import List, Optional
+from behavior_buffer import behavior_buffer
+from engagement import engagement_tracker
 import logging
 
 router = APIRouter()
@@ -18,6 +20,16 @@ class BehaviorLogIn(BaseModel):
     face_present:   bool
     gaze_direction: str
 
+class BehaviorSampleIn(BaseModel):
+    emotion:        str
+    face_present:   bool
+    gaze_direction: str
+    timestamp:      Optional[datetime] = None   # client capture time; server time if omitted
+
+class BehaviorBatchIn(BaseModel):
+    session_id: str
+    samples:    List[BehaviorSampleIn] = Field(..., max_length=1000)
+
 def compute_engagement_score(emotion: str, face_present: bool, gaze: str) -> float:
     score = 1.0
     if not face_present:
@@ -28,34 +40,71 @@ def compute_engagement_score(emotion: str, face_present: bool, gaze: str) -> flo
         score -= 0.2
     return max(0.0, min(1.0, score))
 
+def build_row(session_id: str, emotion: str, face_present: bool, gaze: str,
+              timestamp: Optional[datetime] = None) -> dict:
+    """Validate one sample and turn it into a behavior_logs row."""
+    if emotion not in VALID_EMOTIONS:
+        raise HTTPException(400, f"Invalid emotion: {emotion}")
+    if gaze not in VALID_GAZE:
+        raise HTTPException(400, f"Invalid gaze direction: {gaze}")
+
+    if timestamp is None:
+        timestamp = datetime.utcnow()
+    elif timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return {
+        "session_id":       session_id,
+        "timestamp":        timestamp,
+        "engagement_score": compute_engagement_score(emotion, face_present, gaze),
+        "emotion":          emotion,
+        "face_present":     face_present,
+        "gaze_direction":   gaze,
+    }
+
 @router.post("/log-behavior")
 async def log_behavior(entry: BehaviorLogIn):
     try:
-        # Basic input validation
-        if entry.emotion not in VALID_EMOTIONS:
-            raise HTTPException(400, f"Invalid emotion: {entry.emotion}")
-        if entry.gaze_direction not in VALID_GAZE:
-            raise HTTPException(400, f"Invalid gaze direction: {entry.gaze_direction}")
-
-        # Compute engagement score
-        score = compute_engagement_score(entry.emotion, entry.face_present, entry.gaze_direction)
+        row = build_row(entry.session_id, entry.emotion, entry.face_present, entry.gaze_direction)
 
         # Log suspicious behavior
         if not entry.face_present or entry.gaze_direction in {"away", "down"}:
             logger.warning(f"[⚠] Suspicious behavior — session={entry.session_id}, gaze={entry.gaze_direction}, face={entry.face_present}")
 
-        await database.execute(
-            behavior_logs.insert().values(
-                session_id       = entry.session_id,
-                timestamp        = datetime.utcnow(),
-                engagement_score = score,
-                emotion          = entry.emotion,
-                face_present     = entry.face_present,
-                gaze_direction   = entry.gaze_direction,
-            )
-        )
-
-        return {"status": "ok", "engagement_score": score}
+        # Written by the write-behind buffer as part of a multi-row INSERT
+        behavior_buffer.add([row])
+        engagement_tracker.record(entry.session_id, row["engagement_score"])
+
+        return {"status": "ok", "engagement_score": row["engagement_score"]}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Behavior log failed")
         raise HTTPException(500, f"Could not log behavior: {e}")
+
+@router.post("/log-behavior/batch")
+async def log_behavior_batch(batch: BehaviorBatchIn):
+    try:
+        rows = [
+            build_row(batch.session_id, s.emotion, s.face_present, s.gaze_direction, s.timestamp)
+            for s in batch.samples
+        ]
+
+        suspicious = sum(1 for r in rows if not r["face_present"] or r["gaze_direction"] in {"away", "down"})
+        if suspicious:
+            logger.warning(f"[⚠] Suspicious behavior — session={batch.session_id}, frames={suspicious}/{len(rows)}")
+
+        behavior_buffer.add(rows)
+        for r in rows:
+            engagement_tracker.record(batch.session_id, r["engagement_score"])
+
+        return {
+            "status": "ok",
+            "accepted": len(rows),
+            "engagement_score": rows[-1]["engagement_score"] if rows else None,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Behavior batch log failed")
+        raise HTTPException(500, f"Could not log behavior batch: {e}")
@@ -1,33 +1,63 @@
 # backend/routes/speak.py
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-import os, uuid, hashlib, time
-import openai
+import os, re
+import asyncio
 import logging
-from dotenv import load_dotenv
-
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+import llm_gateway
+from audio_cache import audio_cache
+from phrases import STATIC_PHRASES
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 VALID_VOICES = {"alloy", "echo", "fable", "onyx", "nova", "shimmer"}
-AUDIO_DIR = "./tts_cache"
-os.makedirs(AUDIO_DIR, exist_ok=True)
+DEFAULT_VOICE = "alloy"
+
+STREAM_PARALLELISM = int(os.getenv("TTS_STREAM_PARALLELISM", "3"))
+MIN_SENTENCE_CHARS = 12   # shorter fragments are merged into the next sentence
 
 class SpeechInput(BaseModel):
     text:  str
-    voice: str = "alloy"
+    voice: str = DEFAULT_VOICE
+
+def split_sentences(text: str) -> list:
+    """Split on sentence punctuation and line breaks, keeping tiny fragments attached."""
+    parts = [p.strip() for p in re.split(r"(?<!e\.g\.)(?<!i\.e\.)(?<=[.!?])\s+|\n+", text) if p.strip()]
+    sentences, carry = [], ""
+    for part in parts:
+        carry = f"{carry} {part}".strip()
+        if len(carry) >= MIN_SENTENCE_CHARS:
+            sentences.append(carry)
+            carry = ""
+    if carry:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {carry}"
+        else:
+            sentences.append(carry)
+    return sentences
+
+def static_texts() -> frozenset:
+    """Static phrases whole and per sentence, as /speak and /speak/stream request them."""
+    texts = set()
+    for phrase in STATIC_PHRASES:
+        texts.add(phrase)
+        texts.update(split_sentences(phrase))
+    return frozenset(texts)
 
-def clean_old_audio_files(threshold_seconds=600):
-    now = time.time()
-    for fname in os.listdir(AUDIO_DIR):
-        path = os.path.join(AUDIO_DIR, fname)
-        if os.path.isfile(path) and now - os.path.getmtime(path) > threshold_seconds:
-            os.remove(path)
+STATIC_TEXTS = static_texts()   # pinned in the audio cache: never evicted
+
+def synth(text: str, voice: str):
+    return lambda: llm_gateway.speech(text, voice=voice, model=llm_gateway.TTS_MODEL)
+
+async def prewarm_static_phrases(voice: str = DEFAULT_VOICE) -> int:
+    """Cache (and pin) static phrases both whole and per sentence, for /speak and /speak/stream."""
+    warmed = await audio_cache.prewarm(sorted(STATIC_TEXTS), voice, lambda t: synth(t, voice)(),
+                                       model=llm_gateway.TTS_MODEL)
+    logger.info(f"[TTS] Pre-warmed {warmed} static phrases")
+    return warmed
 
 @router.post("/speak")
 async def synthesize_speech(data: SpeechInput):
@@ -38,30 +68,51 @@ async def synthesize_speech(data: SpeechInput):
         if data.voice not in VALID_VOICES:
             raise HTTPException(400, f"Invalid voice: {data.voice}")
 
-        # ─── Generate hash for caching ─────────────
-        h = hashlib.sha256(f"{data.voice}:{text}".encode()).hexdigest()
-        output_path = os.path.join(AUDIO_DIR, f"{h}.mp3")
+        # ─── Hash-keyed cache (shared with /speak/stream sentences); a new TTS_MODEL misses ──
+        output_path = await audio_cache.get_or_create(text, data.voice, synth(text, data.voice),
+                                                      pin=text in STATIC_TEXTS, model=llm_gateway.TTS_MODEL)
+        return FileResponse(output_path, media_type="audio/mpeg", filename="speech.mp3")
 
-        if os.path.exists(output_path):
-            logger.info(f"[TTS] Cache hit for {h}")
-            return FileResponse(output_path, media_type="audio/mpeg", filename="speech.mp3")
+    except Exception as e:
+        logger.exception("TTS generation failed")
+        return JSONResponse(status_code=500, content={"error": str(e)})
 
-        logger.info(f"[TTS] Generating new audio for hash {h}")
+# ─── Sentence-Chunked Streaming TTS ─────────────────────────────
+async def stream_sentences(sentences: list, voice: str):
+    """Synthesize up to STREAM_PARALLELISM sentences at once; yield audio in order."""
+    limit = asyncio.Semaphore(STREAM_PARALLELISM)
 
-        speech_response = openai.audio.speech.create(
-            model="tts-1",
-            voice=data.voice,
-            input=text
-        )
+    async def synth_sentence(sentence: str) -> bytes:
+        async with limit:
+            return await audio_cache.read(sentence, voice, synth(sentence, voice),
+                                          pin=sentence in STATIC_TEXTS, model=llm_gateway.TTS_MODEL)
 
-        with open(output_path, "wb") as f:
-            f.write(speech_response.content)
+    tasks = [asyncio.create_task(synth_sentence(s)) for s in sentences]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        # Client went away or a sentence failed — stop paying for the rest
+        for task in tasks:
+            task.cancel()
 
-        # Optionally clean old files
-        clean_old_audio_files()
+@router.post("/speak/stream")
+async def synthesize_speech_stream(data: SpeechInput):
+    text = data.text.strip()
+    if not text:
+        raise HTTPException(400, "Text input is empty.")
+    if data.voice not in VALID_VOICES:
+        raise HTTPException(400, f"Invalid voice: {data.voice}")
 
-        return FileResponse(output_path, media_type="audio/mpeg", filename="speech.mp3")
+    sentences = split_sentences(text)
+    logger.info(f"[TTS] Streaming {len(sentences)} sentences")
+    return StreamingResponse(
+        stream_sentences(sentences, data.voice),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    except Exception as e:
-        logger.exception("TTS generation failed")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+# ─── Cache Metrics ──────────────────────────────────────────────
+@router.get("/speak/cache-stats")
+async def tts_cache_stats():
+    return audio_cache.stats()
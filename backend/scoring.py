@@ -1,14 +1,17 @@
 # backend/scoring.py
 
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
-from typing import Dict
-from collections import Counter
-import logging
+import os
 import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+from collections import Counter, OrderedDict
 
-from db import database, behavior_logs  
+from db import database, behavior_logs, interview_logs
+import background
+import llm_gateway
 
 # ─── Score Weights ────────────────────────────────────────────────
 SCORE_WEIGHTS = {
@@ -18,13 +21,14 @@ SCORE_WEIGHTS = {
     "clarity": 1,
 }
 
-llm = ChatOpenAI(model="gpt-4o", temperature=0.3)
+SCORING_MODEL = "gpt-4o"
+SCORING_TEMPERATURE = 0.3
 logger = logging.getLogger(__name__)
 
 # ─── Rubric Prompt (MODIFIED to include resume context) ─────────
-rubric_prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are a strict but fair AI interviewer. Use the resume as context, but do NOT assume an answer is false just because it's not mentioned there. Only flag hallucinations if the answer contains clearly fabricated or implausible information."),
-    ("user", """
+RUBRIC_SYSTEM = "You are a strict but fair AI interviewer. Use the resume as context, but do NOT assume an answer is false just because it's not mentioned there. Only flag hallucinations if the answer contains clearly fabricated or implausible information."
+
+RUBRIC_USER = """
 Resume:
 {resume}
 
@@ -47,39 +51,321 @@ Hallucination Guidelines:
 - "Valid": Answer is plausible and either supported or not contradicted by resume.
 - "Speculative": Reasonable extrapolation from the resume or generic domain knowledge.
 - "Hallucination": Clearly invented or factually incorrect detail.
-""")
-])
-scoring_chain = LLMChain(llm=llm, prompt=rubric_prompt)
+"""
+
+# ─── Multi-Answer Rubric (one request for several answers) ──────
+RUBRIC_BATCH_USER = """
+Score each answer below independently against its question, using the referenced resume as context.
+
+{resumes}
+
+{items}
+
+Respond ONLY in this JSON format, with exactly one entry per answer id:
+{{
+  "scores": [
+    {{
+      "id": int,
+      "relevance": float (0-1),
+      "accuracy": float (0-1),
+      "completeness": float (0-1),
+      "clarity": float (0-1),
+      "hallucination": "Valid" | "Speculative" | "Hallucination"
+    }}
+  ]
+}}
+
+Hallucination Guidelines:
+- "Valid": Answer is plausible and either supported or not contradicted by resume.
+- "Speculative": Reasonable extrapolation from the resume or generic domain knowledge.
+- "Hallucination": Clearly invented or factually incorrect detail.
+"""
+
+RUBRIC_BATCH_ITEM = """### Answer {id} (resume {resume_id})
+Question:
+{question}
+
+Answer:
+{answer}
+"""
+
+SCORING_BATCH_SIZE   = int(os.getenv("SCORING_BATCH_SIZE", "8"))           # answers per rubric request
+SCORING_BATCH_WINDOW = float(os.getenv("SCORING_BATCH_WINDOW_MS", "200")) / 1000
+SESSION_BATCH_SIZE   = 20                                                  # answers per end-of-session request
+RESUME_CHARS         = 6000                                                # resume context cap per request
+
+SCORING_STRICT_JSON = os.getenv("SCORING_STRICT_JSON", "1") == "1"    # json_schema structured output
+SCORE_CACHE_SIZE    = int(os.getenv("SCORE_CACHE_SIZE", "5000"))
+SCORE_CACHE_TTL     = float(os.getenv("SCORE_CACHE_TTL", "3600"))       # seconds
+
+# ─── Structured-Output Schemas ──────────────────────────────────
+RUBRIC_FIELDS = ("relevance", "accuracy", "completeness", "clarity")
+HALLUCINATION_LABELS = ["Valid", "Speculative", "Hallucination"]
+
+RUBRIC_PROPERTIES = {
+    **{field: {"type": "number"} for field in RUBRIC_FIELDS},
+    "hallucination": {"type": "string", "enum": HALLUCINATION_LABELS},
+}
+RUBRIC_SCHEMA = {
+    "type": "object",
+    "properties": RUBRIC_PROPERTIES,
+    "required": [*RUBRIC_FIELDS, "hallucination"],
+    "additionalProperties": False,
+}
+RUBRIC_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, **RUBRIC_PROPERTIES},
+                "required": ["id", *RUBRIC_FIELDS, "hallucination"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["scores"],
+    "additionalProperties": False,
+}
+
+def response_format(name: str, schema: dict) -> dict:
+    """Strict JSON-schema output, so every completion parses; plain JSON mode when disabled."""
+    if not SCORING_STRICT_JSON:
+        return {"type": "json_object"}
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+def unscored(error: str) -> Dict:
+    """Explicit failure result: no score is recorded rather than a made-up one."""
+    return {"score": None, "subscores": {}, "hallucination": "Unknown", "error": error}
+
+def parse_rubric(parsed: dict) -> Dict:
+    subscores = {field: min(1.0, max(0.0, float(parsed[field]))) for field in RUBRIC_FIELDS}
+    return {
+        "score": adaptive_score(subscores),
+        "subscores": subscores,
+        "hallucination": parsed["hallucination"],
+    }
+
+# ─── Score Cache ────────────────────────────────────────────────
+# Prompt text is part of the key, so editing the rubric invalidates old scores
+RUBRIC_ID = hashlib.sha256((RUBRIC_SYSTEM + RUBRIC_USER + RUBRIC_BATCH_USER).encode()).hexdigest()[:12]
+
+class ScoreCache:
+    """Bounded LRU of successful scores for (question, answer, resume context); entries expire after `ttl`."""
+
+    def __init__(self, max_entries: int = SCORE_CACHE_SIZE, ttl: float = SCORE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(item: Dict) -> str:
+        parts = (SCORING_MODEL, RUBRIC_ID, item["question"], item["answer"], item.get("resume") or "")
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry[1])
+
+    def put(self, key: str, result: Dict) -> None:
+        if result.get("score") is None:
+            return   # failures are retried, never cached
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+score_cache = ScoreCache()
 
 # ─── Main Scoring Function ( Accepts resume input) ───────────────
 async def score_answer(question: str, answer: str, resume: str = "") -> Dict:
+    return (await score_answers([{"question": question, "answer": answer, "resume": resume}]))[0]
+
+async def score_answers(items: List[Dict], use_cache: bool = True) -> List[Dict]:
+    """
+    Score {question, answer, resume} items. Cached triples are answered from
+    the score cache; the rest (deduplicated) go out in one rubric request.
+    """
+    keys = [ScoreCache.key(item) for item in items]
+    results: List[Optional[Dict]] = [score_cache.get(k) if use_cache else None for k in keys]
+
+    todo: Dict[str, Dict] = {}
+    for key, item, result in zip(keys, items, results):
+        if result is None:
+            todo.setdefault(key, item)
+    if todo:
+        fresh = await (_score_one(*todo.values()) if len(todo) == 1 else _score_many(list(todo.values())))
+        by_key = dict(zip(todo, fresh))
+        for key, result in by_key.items():
+            score_cache.put(key, result)
+        results = [result or by_key[key] for key, result in zip(keys, results)]
+    return results
+
+async def _score_one(item: Dict) -> List[Dict]:
     try:
-        result = await scoring_chain.arun({
-            "question": question,
-            "answer": answer,
-            "resume": resume or "No resume provided."
-        })
-        parsed = json.loads(result)
-        subscores = {
-            "relevance":    float(parsed["relevance"]),
-            "accuracy":     float(parsed["accuracy"]),
-            "completeness": float(parsed["completeness"]),
-            "clarity":      float(parsed["clarity"]),
-        }
-        hallucination = parsed["hallucination"]
-        total_score = adaptive_score(subscores)
-        return {
-            "score": total_score,
-            "subscores": subscores,
-            "hallucination": hallucination
-        }
+        result = await llm_gateway.chat(
+            [
+                {"role": "system", "content": RUBRIC_SYSTEM},
+                {"role": "user", "content": RUBRIC_USER.format(
+                    question=item["question"],
+                    answer=item["answer"],
+                    resume=item.get("resume") or "No resume provided.",
+                )},
+            ],
+            model=SCORING_MODEL,
+            temperature=SCORING_TEMPERATURE,
+            response_format=response_format("rubric", RUBRIC_SCHEMA),
+        )
+        return [parse_rubric(json.loads(result))]
     except Exception as e:
         logger.exception("Scoring failed: %s", e)
-        return {
-            "score": 0.5,
-            "subscores": {},
-            "hallucination": "Unknown"
-        }
+        return [unscored(str(e))]
+
+async def _score_many(items: List[Dict]) -> List[Dict]:
+    """One multi-answer rubric request; identical resumes are sent once, missing answers come back unscored."""
+    resume_ids: Dict[str, int] = {}
+    for item in items:
+        resume_ids.setdefault((item.get("resume") or "No resume provided.")[:RESUME_CHARS], len(resume_ids) + 1)
+    resumes = "\n\n".join(f"Resume {rid}:\n{text}" for text, rid in resume_ids.items())
+    body = "\n".join(
+        RUBRIC_BATCH_ITEM.format(
+            id=i, question=item["question"], answer=item["answer"],
+            resume_id=resume_ids[(item.get("resume") or "No resume provided.")[:RESUME_CHARS]],
+        )
+        for i, item in enumerate(items, 1)
+    )
+
+    try:
+        reply = await llm_gateway.chat(
+            [
+                {"role": "system", "content": RUBRIC_SYSTEM},
+                {"role": "user", "content": RUBRIC_BATCH_USER.format(resumes=resumes, items=body)},
+            ],
+            model=SCORING_MODEL,
+            temperature=SCORING_TEMPERATURE,
+            response_format=response_format("rubric_batch", RUBRIC_BATCH_SCHEMA),
+        )
+        entries = {int(e["id"]): e for e in json.loads(reply)["scores"]}
+    except Exception as e:
+        logger.exception("Batch scoring failed for %d answers: %s", len(items), e)
+        return [unscored(str(e)) for _ in items]
+
+    results = []
+    for i in range(1, len(items) + 1):
+        try:
+            results.append(parse_rubric(entries[i]))
+        except (KeyError, TypeError, ValueError) as e:
+            results.append(unscored(f"missing or malformed score for answer {i}: {e}"))
+    return results
+
+# ─── Micro-Batching Across Requests ─────────────────────────────
+class ScoringBatcher:
+    """
+    Collects answers submitted within `window` seconds (from any session) and
+    scores them together, up to `max_batch` per rubric request.
+    """
+
+    def __init__(self, max_batch: int = SCORING_BATCH_SIZE, window: float = SCORING_BATCH_WINDOW):
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = self.answers = 0
+
+    async def score(self, question: str, answer: str, resume: str = "") -> Dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(({"question": question, "answer": answer, "resume": resume}, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that gave up (cancelled turn) are dropped before paying for them
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if batch:
+            background.spawn(self._run(batch), name=f"score-batch:{len(batch)}")
+
+    async def _run(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        self.requests += 1
+        self.answers += len(batch)
+        try:
+            results = await score_answers([item for item, _ in batch])
+        except Exception as e:
+            results = [unscored(str(e)) for _ in batch]
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+scoring_batcher = ScoringBatcher()
+
+# ─── End-of-Session Batch ───────────────────────────────────────
+_session_runs: Dict[Tuple[str, bool], asyncio.Future] = {}
+
+async def score_session(candidate_id: str, resume: str = "", rescore: bool = False) -> Dict:
+    """
+    Score every unscored interview_logs row for a candidate (all rows when
+    `rescore`) in SESSION_BATCH_SIZE-answer requests. Failed answers keep
+    their previous values. Concurrent calls for a candidate share one run
+    (the client ends a session from both stopSession and beforeunload).
+    """
+    key = (candidate_id, rescore)
+    run = _session_runs.get(key)
+    if run is None:
+        run = _session_runs[key] = asyncio.ensure_future(_score_session(candidate_id, resume, rescore))
+        run.add_done_callback(lambda _: _session_runs.pop(key, None))
+    return await asyncio.shield(run)
+
+async def _score_session(candidate_id: str, resume: str, rescore: bool) -> Dict:
+    query = interview_logs.select().where(interview_logs.c.candidate_id == candidate_id)
+    if not rescore:
+        query = query.where(interview_logs.c.score.is_(None))
+    rows = await database.fetch_all(query.order_by(interview_logs.c.timestamp))
+    items = [{"question": r["question"] or "", "answer": r["answer"], "resume": resume} for r in rows]
+
+    chunks = [items[i:i + SESSION_BATCH_SIZE] for i in range(0, len(items), SESSION_BATCH_SIZE)]
+    results = [r for chunk in await asyncio.gather(*(score_answers(c, use_cache=not rescore) for c in chunks))
+               for r in chunk]
+
+    scored = [(row, result) for row, result in zip(rows, results) if result["score"] is not None]
+    async with database.transaction():
+        for row, result in scored:
+            await database.execute(
+                interview_logs.update()
+                .where(interview_logs.c.id == row["id"])
+                .values(score=result["score"], subscores=result["subscores"], hallucination=result["hallucination"])
+            )
+
+    scores = [result["score"] for _, result in scored]
+    return {
+        "candidate_id": candidate_id,
+        "answers": len(rows),
+        "scored": len(scored),
+        "failed": len(rows) - len(scored),
+        "requests": len(chunks),
+        "average": round(sum(scores) / len(scores), 3) if scores else None,
+    }
 
 # ─── Weighted Total Score ─────────────────────────────────────────
 def adaptive_score(subscores: Dict[str, float], weights=SCORE_WEIGHTS) -> float:
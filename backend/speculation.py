@@ -0,0 +1,146 @@
+# backend/speculation.py
+"""
+Speculative turns: start on a partial transcript, commit on a close final one.
+
+While the candidate is still finishing a sentence the client posts what ASR
+has so far (`/interview/ask` with `partial: true`). The next question is
+drafted, and its audio pre-synthesized, in the background. When the final
+utterance arrives the draft is used if the conversation has not moved on and
+the final text is close enough to the partial; otherwise it is cancelled and
+the turn runs as usual. Latency saved per hit is the speculative work that
+had already run by the time the final utterance arrived.
+
+The follow-up work (`prepare`, e.g. pre-synthesized audio) runs in the same
+task as the draft, so dropping a draft cancels it too. Drafts live in this
+process only: a final /ask served by another worker finds none and runs
+normally, and the draft here expires.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from difflib import SequenceMatcher
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ─── Tunables ───────────────────────────────────────────────────
+MIN_SIMILARITY = float(os.getenv("SPECULATION_MIN_SIMILARITY", "0.85"))   # word-level, 0..1
+TTL            = float(os.getenv("SPECULATION_TTL", "30"))                # seconds a draft waits for its final utterance
+
+def words(text: str) -> list:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+def similarity(partial: str, final: str) -> float:
+    return SequenceMatcher(None, words(partial), words(final), autojunk=False).ratio()
+
+class Speculation:
+    __slots__ = ("partial", "turn", "task", "draft", "started", "finished")
+
+    def __init__(self, partial: str, turn: int):
+        self.partial = partial
+        self.turn = turn          # conversation length the draft was built on
+        self.task: Optional[asyncio.Task] = None
+        self.draft = asyncio.get_running_loop().create_future()   # resolved before `prepare` runs
+        self.draft.add_done_callback(lambda f: f.cancelled() or f.exception())   # failures are logged by the task
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    async def run(self, draft: Callable[[], Awaitable[dict]],
+                  prepare: Optional[Callable[[dict], Awaitable[None]]]) -> None:
+        try:
+            result = await draft()
+        except asyncio.CancelledError:
+            self.draft.cancel()
+            raise
+        except Exception as e:
+            self.draft.set_exception(e)
+            raise
+        self.finished = time.monotonic()
+        self.draft.set_result(result)
+        if prepare is not None:
+            await prepare(result)
+
+# ─── Speculator ─────────────────────────────────────────────────
+class Speculator:
+    """At most one speculative draft per session."""
+
+    def __init__(self, min_similarity: float = MIN_SIMILARITY, ttl: float = TTL):
+        self.min_similarity = min_similarity
+        self.ttl = ttl
+        self._pending: Dict[str, Speculation] = {}
+        self.started = self.hits = self.misses = self.superseded = self.expired = 0
+        self.saved_s = 0.0
+
+    def start(self, session_id: str, partial: str, turn: int, draft: Callable[[], Awaitable[dict]],
+              prepare: Optional[Callable[[dict], Awaitable[None]]] = None) -> bool:
+        """Draft a turn for `partial` unless one for (nearly) the same text is already running."""
+        self._expire()
+        current = self._pending.get(session_id)
+        if current is not None:
+            if current.turn == turn and similarity(current.partial, partial) >= self.min_similarity:
+                return False
+            self.superseded += 1
+            current.task.cancel()
+
+        speculation = self._pending[session_id] = Speculation(partial, turn)
+        speculation.task = asyncio.create_task(speculation.run(draft, prepare), name=f"speculate:{session_id}")
+        speculation.task.add_done_callback(self._finished)
+        self.started += 1
+        return True
+
+    async def take(self, session_id: str, final: str, turn: int) -> Optional[dict]:
+        """The draft for this final utterance, or None (no draft, a mismatch, or it failed)."""
+        self._expire()
+        speculation = self._pending.pop(session_id, None)
+        if speculation is None:
+            return None
+        if speculation.turn != turn or similarity(speculation.partial, final) < self.min_similarity:
+            self.misses += 1
+            speculation.task.cancel()
+            return None
+
+        arrived = time.monotonic()
+        try:
+            # Only the draft: its follow-up (audio) keeps running for the client's next request
+            result = await asyncio.shield(speculation.draft)
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved_s += min(arrived, speculation.finished or arrived) - speculation.started
+        return result
+
+    def discard(self, session_id: str) -> None:
+        speculation = self._pending.pop(session_id, None)
+        if speculation is not None:
+            speculation.task.cancel()
+
+    def stats(self) -> dict:
+        decided = self.hits + self.misses
+        return {
+            "pending":         len(self._pending),
+            "started":         self.started,
+            "hits":            self.hits,
+            "misses":          self.misses,
+            "superseded":      self.superseded,
+            "expired":         self.expired,
+            "hit_rate":        round(self.hits / decided, 3) if decided else None,
+            "saved_ms_total":  round(self.saved_s * 1000, 1),
+            "saved_ms_per_hit": round(self.saved_s * 1000 / self.hits, 1) if self.hits else None,
+        }
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for session_id in [s for s, spec in self._pending.items() if spec.started < cutoff]:
+            self.expired += 1
+            self._pending.pop(session_id).task.cancel()
+
+    @staticmethod
+    def _finished(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️ Speculative turn {task.get_name()} failed: {task.exception()}")
+
+speculator = Speculator()
@@ -0,0 +1,98 @@
+# backend/startup_profile.py
+"""
+Startup-time profile: per-module import cost plus named startup phases.
+
+`install()` runs first thing in main.py; from then on every first import is
+timed (inclusive and self time, like `python -X importtime`). Modules that
+are imported lazily show up when first used, so a heavy SDK creeping back
+into the cold start is easy to spot. Served at GET /admin/startup-profile
+and summarized in the log once the app is ready.
+
+Set STARTUP_PROFILE=0 to disable.
+"""
+
+import os
+import sys
+import time
+import builtins
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+ENABLED = os.getenv("STARTUP_PROFILE", "1") == "1"
+
+_original_import = builtins.__import__
+_local = threading.local()                # per-thread stack of child-time accumulators
+_modules: Dict[str, List[float]] = {}     # module → [inclusive s, self s]
+_phases: Dict[str, float] = {}            # startup phase → seconds
+_installed_at = None
+_ready_after = None
+_root_imports = 0.0                       # wall time spent in outermost imports
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    global _root_imports
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        else:
+            _root_imports += elapsed
+        record = _modules.setdefault(name, [0.0, 0.0])
+        record[0] += elapsed
+        record[1] += elapsed - children
+
+def install() -> None:
+    global _installed_at
+    if ENABLED and builtins.__import__ is not _timed_import:
+        _installed_at = time.perf_counter()
+        builtins.__import__ = _timed_import
+
+@contextmanager
+def phase(name: str):
+    """Time one startup step (DB connect, migrations, ...)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = round(time.perf_counter() - start, 4)
+
+def mark_ready() -> None:
+    global _ready_after
+    if _installed_at is not None:
+        _ready_after = time.perf_counter() - _installed_at
+
+# ─── Report ─────────────────────────────────────────────────────
+def report(top: int = 20) -> dict:
+    packages: Dict[str, float] = {}
+    for name, (_, own) in _modules.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + own
+    slowest = sorted(_modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "enabled": _installed_at is not None,
+        "ready_after_s": round(_ready_after, 4) if _ready_after is not None else None,
+        "imports_s": round(_root_imports, 4),
+        "phases_s": dict(_phases),
+        "packages_s": {p: round(s, 4) for p, s in sorted(packages.items(), key=lambda i: i[1], reverse=True)[:top]},
+        "modules": [
+            {"module": name, "inclusive_s": round(inclusive, 4), "self_s": round(own, 4)}
+            for name, (inclusive, own) in slowest
+        ],
+    }
+
+def summary(top: int = 5) -> str:
+    data = report(top)
+    packages = ", ".join(f"{p} {s * 1000:.0f}ms" for p, s in data["packages_s"].items())
+    ready = f"ready in {data['ready_after_s'] * 1000:.0f}ms, " if data["ready_after_s"] is not None else ""
+    return f"🕒 Startup {ready}imports {data['imports_s'] * 1000:.0f}ms (heaviest: {packages})"
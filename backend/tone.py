@@ -1,8 +1,24 @@
 # backend/tone.py
 
+from typing import List
 from db import database, interview_logs
+from behavior_logs import get_recent
 
-async def compute_tone(session_id: str) -> str:
+def tone_from_engagement(scores: List[float]) -> str:
+    avg = sum(scores) / len(scores)
+    return (
+        "confident" if avg > 0.85 else
+        "hesitant"  if avg > 0.5 else
+        "nervous"
+    )
+
+async def compute_tone(session_id: str, limit: int = 3) -> str:
+    # Prefer live engagement from the rolling window (no DB hit when warm)
+    scores = await get_recent(session_id, limit)
+    if scores:
+        return tone_from_engagement(scores)
+
+    # No behavior signal (e.g. camera off) → fall back to answer wording
     query = interview_logs.select().where(interview_logs.c.candidate_id == session_id)
     logs = await database.fetch_all(query)
 
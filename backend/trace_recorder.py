@@ -0,0 +1,202 @@
+# backend/trace_recorder.py
+"""
+Opt-in recording of anonymized per-session request timelines, for replay
+with benchmarks/replay.py. Enabled by setting TRACE_DIR.
+
+Each traced request becomes one JSONL line:
+
+    {"session": "s_3f9a…", "t": 12.48, "at": 1718000000.0, "method": "POST",
+     "route": "/interview/ask", "status": 200, "ms": 812.3, "shape": {...}}
+
+`t` is seconds since the session's first request. Session ids and free
+text are never written: ids become salted HMACs, text becomes lengths plus
+salted content ids (so repeats stay repeats). Only categorical values
+([EMPTY]/[SKIP] markers, emotions, gaze, known static phrases) are kept as is.
+"""
+
+import os
+import json
+import time
+import hmac
+import asyncio
+import hashlib
+import logging
+import secrets
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+from fastapi import Request
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+TRACE_DIR      = os.getenv("TRACE_DIR")                     # unset = recording off
+TRACE_SAMPLE   = float(os.getenv("TRACE_SAMPLE", "1.0"))    # share of sessions recorded
+TRACE_SALT     = os.getenv("TRACE_SALT")                    # fixed salt links ids across restarts
+FLUSH_INTERVAL = 5.0
+MAX_SESSIONS   = 10000                                      # session clocks kept in memory
+
+MARKERS = {"[EMPTY]", "[SKIP]"}
+
+# Traced route → where its session id lives
+SESSION_FROM_RESPONSE = {"/interview/start-session": "session_id", "/interview/upload-resume": "candidate_id"}
+TRACED_ROUTES = {
+    "/interview/ask",
+    "/interview/ask/stream",
+    "/interview/log-behavior",
+    "/interview/log-behavior/batch",
+    "/interview/resume-status/{candidate_id}",
+    "/clarify-check",
+    "/speak",
+    "/speak/stream",
+    *SESSION_FROM_RESPONSE,
+}
+
+TRACED_PREFIXES = ("/interview/", "/speak", "/clarify-check")   # bodies are only read for these
+
+# ─── Recorder ───────────────────────────────────────────────────
+class TraceRecorder:
+    def __init__(self, directory: Optional[str] = TRACE_DIR, sample: float = TRACE_SAMPLE,
+                 salt: Optional[str] = TRACE_SALT):
+        self.directory = directory
+        self.sample = sample
+        self._salt = (salt or secrets.token_hex(16)).encode()
+        self._public: Set[str] = set()
+        self._clocks: "OrderedDict[str, float]" = OrderedDict()   # session key → first-seen monotonic time
+        self._lines: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self.path = None
+        if directory:
+            self.path = os.path.join(directory, f"trace_{datetime.utcnow():%Y%m%dT%H%M%S}_{os.getpid()}.jsonl")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def keep_verbatim(self, texts: Iterable[str]) -> None:
+        """Texts that are not user data (e.g. static TTS phrases) and may be recorded as is."""
+        self._public.update(texts)
+
+    def anon_id(self, value: str, prefix: str = "") -> str:
+        return prefix + hmac.new(self._salt, value.encode(), hashlib.sha256).hexdigest()[:16]
+
+    def sampled(self, session_key: str) -> bool:
+        return int(session_key[-8:], 16) / 0xFFFFFFFF < self.sample
+
+    def record(self, session_id: str, method: str, route: str, status: int, ms: float, shape: dict) -> None:
+        key = self.anon_id(session_id, "s_")
+        if not self.sampled(key):
+            return
+        now = time.monotonic()
+        first = self._clocks.setdefault(key, now)
+        self._clocks.move_to_end(key)
+        while len(self._clocks) > MAX_SESSIONS:
+            self._clocks.popitem(last=False)
+        self._lines.append(json.dumps({
+            "session": key, "t": round(now - first, 3), "at": round(time.time(), 3),
+            "method": method, "route": route, "status": status, "ms": round(ms, 2), "shape": shape,
+        }))
+
+    # ─── Payload shapes ─────────────────────────────────────────
+    def text_shape(self, text: str) -> dict:
+        if text in self._public or text.strip() in MARKERS:
+            return {"text": text, "chars": len(text)}
+        return {"text_id": self.anon_id(text), "chars": len(text)}
+
+    def shape(self, route: str, body: dict, raw: bytes) -> dict:
+        if route in ("/interview/ask", "/interview/ask/stream"):
+            shape = {"input": self.text_shape(body.get("user_input", ""))}
+            if body.get("partial"):
+                shape["partial"] = True
+            history = body.get("history")
+            if history is not None:   # legacy clients only; the server keeps the conversation otherwise
+                shape["history_turns"] = len(history)
+                shape["history_chars"] = sum(len(str(m.get("content", ""))) for m in history if isinstance(m, dict))
+            return shape
+        if route == "/interview/log-behavior":
+            return {k: body.get(k) for k in ("emotion", "face_present", "gaze_direction")}
+        if route == "/interview/log-behavior/batch":
+            return {"samples": [{k: s.get(k) for k in ("emotion", "face_present", "gaze_direction")}
+                                for s in body.get("samples", [])]}
+        if route in ("/speak", "/speak/stream"):
+            return {**self.text_shape(body.get("text", "")), "voice": body.get("voice")}
+        if route == "/clarify-check":
+            return {"input": self.text_shape(body.get("user_input", "")), "question_chars": len(body.get("question", ""))}
+        if route == "/interview/upload-resume":
+            # Single-file multipart body: hash the file part only (the boundary differs per request)
+            content = raw.split(b"\r\n\r\n", 1)[-1].rsplit(b"\r\n--", 1)[0]
+            return {"bytes": len(content), "file_id": self.anon_id(hashlib.sha256(content).hexdigest())}
+        return {}
+
+    # ─── Middleware ─────────────────────────────────────────────
+    async def capture(self, request: Request, call_next):
+        if not self.enabled or not request.url.path.startswith(TRACED_PREFIXES):
+            return await call_next(request)
+
+        raw = await request.body()   # cached by Starlette, so the route can still read it
+        start = time.perf_counter()
+        response = await call_next(request)
+        ms = (time.perf_counter() - start) * 1000
+
+        route = getattr(request.scope.get("route"), "path", None)
+        if route not in TRACED_ROUTES:
+            return response
+        try:
+            body = json.loads(raw) if raw and request.headers.get("content-type", "").startswith("application/json") else {}
+            session_id = request.headers.get("x-session-id") or body.get("session_id") \
+                or request.path_params.get("candidate_id")
+            if route in SESSION_FROM_RESPONSE and response.status_code < 400:
+                # Session is born here; its id is only in the (small JSON) response
+                content = b"".join([chunk async for chunk in response.body_iterator])
+                session_id = json.loads(content).get(SESSION_FROM_RESPONSE[route])
+                response = Response(content=content, status_code=response.status_code,
+                                    headers=dict(response.headers), media_type=response.media_type)
+            if session_id:
+                self.record(session_id, request.method, route, response.status_code, ms,
+                            self.shape(route, body, raw))
+        except Exception as e:
+            logger.warning(f"Trace capture failed for {route}: {e}")
+        return response
+
+    # ─── Writing ────────────────────────────────────────────────
+    async def flush(self) -> int:
+        if not self._lines or not self.path:
+            return 0
+        lines, self._lines = self._lines, []
+        await asyncio.to_thread(self._append, lines)
+        return len(lines)
+
+    def _append(self, lines: List[str]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def start(self) -> None:
+        if self.enabled:
+            logger.info(f"🎞️ Recording session traces to {self.path}")
+            self._ensure_running()
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except OSError as e:
+                logger.warning(f"Trace flush failed: {e}")
+
+trace_recorder = TraceRecorder()
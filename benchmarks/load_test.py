@@ -0,0 +1,316 @@
+# benchmarks/load_test.py
+"""
+Load test for the interview backend.
+
+Simulates concurrent interview sessions (resume upload or voice-only start,
+then turns of /interview/ask + /speak while behavior samples stream in) and
+reports p50/p95/p99 latency and requests/sec per endpoint, plus event-loop lag.
+
+By default the app runs in-process against the local model stand-ins
+(MODEL_PROVIDER=local) and a throwaway SQLite database, so only our own
+overhead is measured:
+
+    python benchmarks/load_test.py --sessions 50 --turns 5
+    LOCAL_CHAT_LATENCY_MS=800 python benchmarks/load_test.py     # model-like latency
+    python benchmarks/load_test.py --url http://localhost:8000     # a running server
+    python benchmarks/load_test.py --compare benchmarks/results/baseline.json --fail-on-regression 20
+
+In-process, event-loop lag includes the load generator (it shares the loop);
+with --url it is the client's loop only.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import contextlib
+import tempfile
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND = os.path.join(ROOT, "backend")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+ANSWERS = [
+    "I'm applying for a machine learning engineer role.",
+    "At my last job I rebuilt our feature pipeline in Python and cut training time by 40%.",
+    "I'd start by profiling the service, then look at the database queries and caching.",
+    "We had a disagreement about the rollout plan, so I wrote up both options and we picked one together.",
+    "Can you rephrase the question?",
+    "[EMPTY]",
+    "I mostly used PyTorch, some TensorFlow, and a lot of SQL for analysis.",
+]
+EMOTIONS = ["neutral", "happy", "neutral", "surprised", "sad"]
+GAZE = ["center", "center", "left", "right", "down", "away"]
+
+# ─── Metrics ────────────────────────────────────────────────────
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return round(ordered[rank], 2)
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.loop_lag: List[float] = []
+
+    async def request(self, client: httpx.AsyncClient, method: str, path: str, label: str = None, **kwargs):
+        label = label or f"{method} {path}"
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, path, **kwargs)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            resp, ok = None, False
+        self.latencies[label].append((time.perf_counter() - start) * 1000)
+        if not ok:
+            self.errors[label] += 1
+        return resp if ok else None
+
+    async def watch_loop(self, interval: float = 0.01) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag.append(max(0.0, (loop.time() - started - interval) * 1000))
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            endpoints[label] = {
+                "count":  len(values),
+                "errors": self.errors.get(label, 0),
+                "rps":    round(len(values) / elapsed, 2),
+                "mean_ms": round(sum(values) / len(values), 2),
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "p99_ms": percentile(values, 99),
+                "max_ms": round(max(values), 2),
+            }
+        return {
+            "endpoints": endpoints,
+            "event_loop_lag_ms": {
+                "p50": percentile(self.loop_lag, 50),
+                "p99": percentile(self.loop_lag, 99),
+                "max": round(max(self.loop_lag), 2) if self.loop_lag else None,
+            },
+        }
+
+# ─── Synthetic Resume ───────────────────────────────────────────
+def make_pdf(lines: List[str]) -> bytes:
+    """Minimal single-page PDF with one text line per entry."""
+    def escape(s: str) -> str:
+        return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    text = "BT /F1 11 Tf 50 750 Td 14 TL " + " ".join(f"({escape(l)}) '" for l in lines) + " ET"
+    objs = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(text)} >>\nstream\n{text}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = "%PDF-1.4\n", []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n" + "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+def resume_pdf(n: int) -> bytes:
+    return make_pdf([f"Candidate {n}: senior engineer, Python, SQL, distributed systems."] +
+                    [f"Project {i}: built and operated service {n}-{i} serving production traffic." for i in range(40)])
+
+# ─── Virtual Session ────────────────────────────────────────────
+async def stream_behavior(client, rec: Recorder, session_id: str, interval: float, rng: random.Random):
+    while True:
+        await asyncio.sleep(interval * rng.uniform(0.8, 1.2))
+        await rec.request(client, "POST", "/interview/log-behavior", json={
+            "session_id": session_id,
+            "emotion": rng.choice(EMOTIONS),
+            "face_present": rng.random() > 0.1,
+            "gaze_direction": rng.choice(GAZE),
+        })
+
+async def run_session(client, rec: Recorder, args, n: int, resumes: List[bytes]) -> None:
+    rng = random.Random(args.seed + n)
+    await asyncio.sleep(rng.uniform(0, args.ramp))
+
+    if rng.random() < args.upload_ratio:
+        pdf = resumes[n % len(resumes)]
+        resp = await rec.request(client, "POST", "/interview/upload-resume",
+                                 files={"file": (f"resume_{n}.pdf", pdf, "application/pdf")})
+        if resp is None:
+            return
+        session_id = resp.json()["candidate_id"]
+        for _ in range(int(args.ingest_timeout / 0.25)):
+            status = await rec.request(client, "GET", f"/interview/resume-status/{session_id}",
+                                       label="GET /interview/resume-status")
+            if status is None or status.json()["status"] in ("done", "failed"):
+                break
+            await asyncio.sleep(0.25)
+    else:
+        resp = await rec.request(client, "POST", "/interview/start-session")
+        if resp is None:
+            return
+        session_id = resp.json()["session_id"]
+
+    behavior = asyncio.create_task(stream_behavior(client, rec, session_id, args.behavior_interval, rng))
+    history: List[dict] = []
+    try:
+        for _ in range(args.turns):
+            answer = rng.choice(ANSWERS)
+            body = {"user_input": answer, "candidate_id": session_id, "session_id": session_id}
+            if args.client_history:
+                body["history"] = history + [{"role": "user", "content": answer}]
+            resp = await rec.request(client, "POST", "/interview/ask", json=body)
+            if resp is None:
+                continue
+            reply = resp.json()["answer"]
+            history += [{"role": "user", "content": answer}, {"role": "assistant", "content": reply}]
+            await rec.request(client, "POST", "/speak", json={"text": reply}, headers={"X-Session-Id": session_id})
+            await asyncio.sleep(args.think * rng.uniform(0.5, 1.5))
+    finally:
+        behavior.cancel()
+
+# ─── Drivers ────────────────────────────────────────────────────
+def prepare_in_process_env(workdir: str) -> None:
+    """Local stand-ins, throwaway SQLite and TTS cache; must run before the app is imported."""
+    os.environ.setdefault("MODEL_PROVIDER", "local")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("TTS_CACHE_DIR", os.path.join(workdir, "tts_cache"))
+    os.environ.setdefault("TTS_PREWARM", "0")
+    sys.path.insert(0, BACKEND)
+
+async def drive(client: httpx.AsyncClient, args) -> dict:
+    rec = Recorder()
+    resumes = [resume_pdf(i) for i in range(args.unique_resumes)]
+    watcher = asyncio.create_task(rec.watch_loop())
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_session(client, rec, args, n, resumes) for n in range(args.sessions)))
+    finally:
+        watcher.cancel()
+    return rec.summary(time.perf_counter() - start) | {"duration_s": round(time.perf_counter() - start, 3)}
+
+@contextlib.asynccontextmanager
+async def open_client(args) -> AsyncIterator[httpx.AsyncClient]:
+    """Client for --url, or for the app served in-process (startup/shutdown included)."""
+    limits = httpx.Limits(max_connections=max(100, args.sessions * 2))
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            yield client
+        return
+
+    with tempfile.TemporaryDirectory(prefix="interview-bench-") as workdir:
+        prepare_in_process_env(workdir)
+        from main import app
+        logging.getLogger().setLevel(logging.WARNING)   # per-request INFO logs would swamp the output
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                yield client
+
+async def run(args) -> dict:
+    async with open_client(args) as client:
+        return await drive(client, args)
+
+# ─── Reporting ──────────────────────────────────────────────────
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_table(result: dict) -> None:
+    print(f"\n{'endpoint':<36}{'count':>7}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for label, m in result["endpoints"].items():
+        print(f"{label:<36}{m['count']:>7}{m['errors']:>5}{m['rps']:>9}{m['p50_ms']:>9}{m['p95_ms']:>9}{m['p99_ms']:>9}")
+    lag = result["event_loop_lag_ms"]
+    print(f"\nevent-loop lag ms: p50={lag['p50']} p99={lag['p99']} max={lag['max']}   "
+          f"duration {result['duration_s']}s")
+
+def compare(result: dict, baseline: dict, fail_pct: Optional[float]) -> bool:
+    """Print p95/rps deltas against a previous run; False if p95 regressed past `fail_pct`."""
+    ok = True
+    print(f"\n{'vs baseline':<36}{'p95 ms':>18}{'rps':>18}")
+    for label, m in result["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(label)
+        if not base or not base.get("p95_ms") or not base.get("rps"):
+            continue
+        p95_delta = (m["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+        rps_delta = (m["rps"] - base["rps"]) / base["rps"] * 100
+        flag = ""
+        if fail_pct is not None and p95_delta > fail_pct:
+            ok, flag = False, "  ← regression"
+        print(f"{label:<36}{base['p95_ms']:>8}→{m['p95_ms']:<8}{p95_delta:+.0f}%"
+              f"{base['rps']:>8}→{m['rps']:<8}{rps_delta:+.0f}%{flag}")
+    return ok
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the interview backend.")
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent interview sessions")
+    parser.add_argument("--turns", type=int, default=5, help="/ask + /speak turns per session")
+    parser.add_argument("--upload-ratio", type=float, default=0.5, help="share of sessions that upload a resume")
+    parser.add_argument("--client-history", action="store_true",
+                        help="send the full history with every /ask (legacy clients) instead of server-side state")
+    parser.add_argument("--unique-resumes", type=int, default=5, help="distinct PDFs (repeats exercise dedup)")
+    parser.add_argument("--behavior-interval", type=float, default=0.5, help="seconds between behavior samples")
+    parser.add_argument("--think", type=float, default=0.2, help="mean candidate think time between turns (s)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="spread session starts over this many seconds")
+    parser.add_argument("--ingest-timeout", type=float, default=30.0, help="max wait for resume indexing (s)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="result JSON path (default: benchmarks/results/load_<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result JSON to diff against")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="with --compare, exit 1 if any endpoint's p95 grew by more than PCT%%")
+    args = parser.parse_args()
+
+    return report(args, asyncio.run(run(args)), prefix="load")
+
+def report(args, summary: dict, prefix: str) -> int:
+    """Write the result JSON, print it, and diff against --compare; returns the exit code."""
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "commit": git_commit(),
+            "target": args.url or "in-process",
+            "provider": os.getenv("MODEL_PROVIDER", "local" if not args.url else None),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "fail_on_regression")},
+        },
+        **summary,
+    }
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{prefix}_{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print_table(result)
+    print(f"\n📊 Results written to {out}")
+    if args.compare:
+        with open(args.compare) as f:
+            if not compare(result, json.load(f), args.fail_on_regression):
+                return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# benchmarks/replay.py
+"""
+Replay recorded session traces (backend TRACE_DIR, see trace_recorder.py)
+against the app, compressed in time and overlaid for capacity planning.
+
+    python benchmarks/replay.py traces/ --speed 10 --overlay 20
+    python benchmarks/replay.py traces/trace_*.jsonl --url http://staging:8000 --speed 1
+
+Each recorded session keeps its request order, gaps, payload sizes, history
+growth and [EMPTY]/[SKIP] turns; free text is regenerated as filler of the
+recorded length (identical ids → identical filler, so cache hit rates match).
+`--overlay N` plays every session N times with start jitter. Output uses the
+same JSON format as load_test.py, so --compare works across both.
+"""
+
+import os
+import sys
+import json
+import glob
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from typing import Dict, List
+
+from load_test import Recorder, open_client, report, make_pdf, EMOTIONS, GAZE
+
+WORDS = ("data team project python service latency model pipeline customer design "
+         "tests deploy scale queue cache review metrics incident migration api").split()
+
+# ─── Loading ────────────────────────────────────────────────────
+def load_traces(inputs: List[str]) -> Dict[str, List[dict]]:
+    """Session key → events ordered by `t`."""
+    files = []
+    for item in inputs:
+        files.extend(sorted(glob.glob(os.path.join(item, "*.jsonl"))) if os.path.isdir(item) else [item])
+    sessions: Dict[str, List[dict]] = defaultdict(list)
+    for path in files:
+        with open(path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue   # torn last line
+                sessions[event["session"]].append(event)
+    for events in sessions.values():
+        events.sort(key=lambda e: e["t"])
+    return dict(sessions)
+
+# ─── Payload Reconstruction ─────────────────────────────────────
+def filler(chars: int, seed: str) -> str:
+    rng = random.Random(seed)
+    words, size = [], 0
+    while size < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:max(chars, 1)]
+
+def text_of(shape: dict, salt: str = "") -> str:
+    if "text" in shape:
+        return shape["text"]
+    return filler(shape.get("chars", 0), shape.get("text_id", "") + salt)
+
+def history_of(turns: int, chars: int, seed: str) -> List[dict]:
+    per_turn = chars // turns if turns else 0
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": filler(per_turn, f"{seed}:{i}")}
+            for i in range(turns)]
+
+def pdf_of(shape: dict) -> bytes:
+    """Synthetic resume of about the recorded size; same file_id → same bytes (dedup behaves the same)."""
+    lines = max(1, (shape.get("bytes", 4000) - 600) // 75)
+    return make_pdf([filler(70, f"{shape.get('file_id', '')}:{i}") for i in range(lines)])
+
+def build_request(event: dict, session_id: str, rng: random.Random) -> dict:
+    route, shape = event["route"], event.get("shape") or {}
+    path = route.replace("{candidate_id}", session_id)
+    kwargs: dict = {}
+
+    if route in ("/interview/ask", "/interview/ask/stream"):
+        kwargs["json"] = {
+            "user_input": text_of(shape.get("input", {})),
+            "candidate_id": session_id,
+            "session_id": session_id,
+        }
+        if shape.get("partial"):
+            kwargs["json"]["partial"] = True
+        if "history_turns" in shape:   # recorded from a client that sent its history
+            kwargs["json"]["history"] = history_of(shape["history_turns"], shape.get("history_chars", 0), event["session"])
+    elif route == "/interview/log-behavior":
+        kwargs["json"] = {"session_id": session_id, **{
+            "emotion": shape.get("emotion") or rng.choice(EMOTIONS),
+            "face_present": shape.get("face_present", True),
+            "gaze_direction": shape.get("gaze_direction") or rng.choice(GAZE),
+        }}
+    elif route == "/interview/log-behavior/batch":
+        kwargs["json"] = {"session_id": session_id, "samples": shape.get("samples", [])}
+    elif route in ("/speak", "/speak/stream"):
+        kwargs["json"] = {"text": text_of(shape), "voice": shape.get("voice") or "alloy"}
+        kwargs["headers"] = {"X-Session-Id": session_id}
+    elif route == "/clarify-check":
+        kwargs["json"] = {"user_input": text_of(shape.get("input", {})),
+                          "question": filler(shape.get("question_chars", 40), event["session"])}
+    elif route == "/interview/upload-resume":
+        kwargs["files"] = {"file": ("resume.pdf", pdf_of(shape), "application/pdf")}
+    return {"method": event["method"], "path": path, **kwargs}
+
+# ─── Replay ─────────────────────────────────────────────────────
+async def replay_session(client, rec: Recorder, events: List[dict], delay: float, speed: float, copy: int) -> None:
+    loop = asyncio.get_running_loop()
+    rng = random.Random(f"{events[0]['session']}:{copy}")
+    await asyncio.sleep(delay)
+    started = loop.time()
+    session_id = f"replay-{events[0]['session']}-{copy}"   # replaced once start-session/upload answers
+
+    for event in events:
+        wait = started + event["t"] / speed - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        request = build_request(event, session_id, rng)
+        label = f"{event['method']} {event['route'].replace('/{candidate_id}', '')}"
+        resp = await rec.request(client, request.pop("method"), request.pop("path"), label=label, **request)
+        if resp is not None and event["route"] == "/interview/start-session":
+            session_id = resp.json()["session_id"]
+        elif resp is not None and event["route"] == "/interview/upload-resume":
+            session_id = resp.json()["candidate_id"]
+
+async def replay(args, sessions: Dict[str, List[dict]]) -> dict:
+    first_at = min(events[0]["at"] for events in sessions.values())
+    rng = random.Random(args.seed)
+    plan = []
+    for copy in range(args.overlay):
+        for events in sessions.values():
+            # Original relative start, compressed; copies are spread with jitter
+            delay = (events[0]["at"] - first_at) / args.speed
+            if copy:
+                delay += rng.uniform(0, args.jitter)
+            if args.max_start is not None:
+                delay = min(delay, args.max_start)
+            plan.append((events, delay, copy))
+
+    async with open_client(args) as client:
+        rec = Recorder()
+        watcher = asyncio.create_task(rec.watch_loop())
+        start = asyncio.get_running_loop().time()
+        try:
+            await asyncio.gather(*(replay_session(client, rec, events, delay, args.speed, copy)
+                                   for events, delay, copy in plan))
+        finally:
+            watcher.cancel()
+        elapsed = asyncio.get_running_loop().time() - start
+    return rec.summary(elapsed) | {
+        "duration_s": round(elapsed, 3),
+        "replayed_sessions": len(plan),
+        "replayed_requests": sum(len(events) for events, _, _ in plan),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded interview session traces.")
+    parser.add_argument("traces", nargs="+", help="trace .jsonl files and/or directories")
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression factor (10 = 10x faster)")
+    parser.add_argument("--overlay", type=int, default=1, help="play every recorded session this many times")
+    parser.add_argument("--jitter", type=float, default=5.0, help="max extra start delay for overlaid copies (s)")
+    parser.add_argument("--max-start", type=float, help="cap on any session's start delay (s)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="result JSON path (default: benchmarks/results/replay_<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result JSON to diff against")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="with --compare, exit 1 if any endpoint's p95 grew by more than PCT%%")
+    args = parser.parse_args()
+
+    sessions = load_traces(args.traces)
+    if not sessions:
+        sys.exit("No trace events found.")
+    args.sessions = len(sessions) * args.overlay   # sizes the client connection pool
+    print(f"▶️ Replaying {len(sessions)} sessions ×{args.overlay} at {args.speed}x")
+    return report(args, asyncio.run(replay(args, sessions)), prefix="replay")
+
+if __name__ == "__main__":
+    sys.exit(main())
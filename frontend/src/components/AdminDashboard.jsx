@@ -1,63 +1,99 @@
 // src/components/AdminDashboard.jsx
-import React, { useEffect, useState } from "react";
+import React, { useCallback, useEffect, useState } from "react";
 import api from "../api";
 
+const PAGE_SIZE = 50;
+
 export default function AdminDashboard({ onLogout }) {
   const [sessions, setSessions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [expandedLogs, setExpandedLogs] = useState({});
+  // per session and log type: { items, cursor, loaded }
+  const [logPages, setLogPages] = useState({});
+  const [timelines, setTimelines] = useState({});
+
+  const handleError = useCallback((err) => {
+    console.error("AdminDashboard loading error:", err);
+    if (String(err).includes("401")) {
+      setError("Unauthorized — please log in again.");
+      onLogout();
+    } else {
+      setError("Failed to load admin data.");
+    }
+  }, [onLogout]);
+
+  const loadSessions = useCallback(async (cursor = null) => {
+    try {
+      const query = `limit=${PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+      const { sessions: page = [], next_cursor = null } =
+        await api.get(`/admin/interview-sessions?${query}`);
+      setSessions((prev) => (cursor ? [...prev, ...page] : page));
+      setNextCursor(next_cursor);
+      setError(null);
+    } catch (err) {
+      handleError(err);
+    } finally {
+      setLoading(false);
+    }
+  }, [handleError]);
+
+  // Logs are fetched a page at a time, only once their section is opened
+  const loadLogs = async (id, type, cursor = null) => {
+    const path = type === "qa" ? "/admin/qa-log" : "/admin/behavior-logs";
+    // Answers still waiting on background or end-of-session scoring are listed too, marked pending
+    const query = `candidate_id=${id}&limit=${PAGE_SIZE}` + (type === "qa" ? "&include_unscored=true" : "")
+      + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+    let items = [];
+    let next = null;
+    try {
+      const res = await api.get(`${path}?${query}`);
+      items = (type === "qa" ? res.qa_log : res.logs) || [];
+      next = res.next_cursor || null;
+    } catch (err) {
+      if (String(err).includes("401")) return handleError(err);
+      if (!String(err).includes("404")) console.warn(`${type} logs error for`, id, err);
+    }
+    setLogPages((prev) => {
+      const current = prev[id]?.[type];
+      const merged = cursor && current ? [...current.items, ...items] : items;
+      return { ...prev, [id]: { ...(prev[id] || {}), [type]: { items: merged, cursor: next, loaded: true } } };
+    });
+  };
+
+  // Engagement per time bucket, aggregated by the server
+  const loadTimeline = async (id) => {
+    try {
+      const { buckets = [], bucket_seconds } = await api.get(`/admin/engagement-timeline?candidate_id=${id}`);
+      setTimelines((prev) => ({ ...prev, [id]: { buckets, bucketSeconds: bucket_seconds } }));
+    } catch (err) {
+      console.warn("Engagement timeline error for", id, err);
+    }
+  };
 
   const toggle = (id, type) => {
+    const opening = !expandedLogs[id]?.[type];
     setExpandedLogs((prev) => ({
       ...prev,
-      [id]: { ...(prev[id] || {}), [type]: !prev[id]?.[type] },
+      [id]: { ...(prev[id] || {}), [type]: opening },
     }));
+    if (opening && !logPages[id]?.[type]?.loaded) loadLogs(id, type);
+    if (opening && type === "behavior" && !timelines[id]) loadTimeline(id);
   };
 
   useEffect(() => {
-    (async () => {
-      try {
-        const { sessions: sessionsData = [] } =
-          await api.get("/admin/interview-sessions");
-
-        const enriched = await Promise.all(
-          sessionsData.map(async (s) => {
-            let qa = [];
-            try {
-              const { qa_log = [] } = await api.get(`/admin/qa-log?candidate_id=${s.id}`);
-              qa = qa_log;
-            } catch (err) {
-              if (!String(err).includes("404")) throw err;
-            }
-
-            let behavior = [];
-            try {
-              const { logs = [] } = await api.get(`/admin/behavior-logs?candidate_id=${s.id}`);
-              behavior = logs;
-            } catch (err) {
-              console.warn("Behavior logs error for", s.id, err);
-            }
-
-            return { ...s, qa, behavior };
-          })
-        );
-
-        setSessions(enriched);
-        setError(null);
-      } catch (err) {
-        console.error("AdminDashboard loading error:", err);
-        if (String(err).includes("401")) {
-          setError("Unauthorized — please log in again.");
-          onLogout();
-        } else {
-          setError("Failed to load admin data.");
-        }
-      } finally {
-        setLoading(false);
-      }
-    })();
-  }, [onLogout]);
+    loadSessions();
+  }, [loadSessions]);
+
+  const logsOf = (id, type) => logPages[id]?.[type] || { items: [], cursor: null, loaded: false };
+
+  const loadMoreLogs = (id, type) => {
+    const { cursor } = logsOf(id, type);
+    return cursor && (
+      <button style={styles.moreBtn} onClick={() => loadLogs(id, type, cursor)}>Load more</button>
+    );
+  };
 
   if (loading) return <p>Loading interview sessions…</p>;
   if (error) return <p style={{ color: "red" }}>{error}</p>;
@@ -79,17 +115,21 @@ export default function AdminDashboard({ onLogout }) {
             </button>
             {expandedLogs[session.id]?.behavior && (
               <div style={styles.behaviorBlock}>
-                {session.behavior.length === 0 ? (
+                <EngagementTimeline timeline={timelines[session.id]} />
+                {!logsOf(session.id, "behavior").loaded ? (
+                  <p>Loading…</p>
+                ) : logsOf(session.id, "behavior").items.length === 0 ? (
                   <p>No behavior logs.</p>
                 ) : (
                   <ul>
-                    {session.behavior.map((b, i) => (
+                    {logsOf(session.id, "behavior").items.map((b, i) => (
                       <li key={i}>
                         [{new Date(b.timestamp).toLocaleTimeString()}] Emotion: {b.emotion}, Face: {b.face_present ? "Yes" : "No"}, Gaze: {b.gaze_direction}
                       </li>
                     ))}
                   </ul>
                 )}
+                {loadMoreLogs(session.id, "behavior")}
               </div>
             )}
           </div>
@@ -101,14 +141,19 @@ export default function AdminDashboard({ onLogout }) {
             </button>
             {expandedLogs[session.id]?.qa && (
               <div style={styles.qaBlock}>
-                {session.qa.length === 0 ? (
+                {!logsOf(session.id, "qa").loaded ? (
+                  <p>Loading…</p>
+                ) : logsOf(session.id, "qa").items.length === 0 ? (
                   <p>No Q&A logs.</p>
                 ) : (
-                  session.qa.map((q, idx) => (
+                  logsOf(session.id, "qa").items.map((q, idx) => (
                     <div key={idx} style={styles.qaItem}>
                       <p><strong>Q:</strong> {q.question}</p>
                       <p><strong>A:</strong> {q.answer}</p>
-                      <p><strong>Score:</strong> {q.score}</p>
+                      <p>
+                        <strong>Score:</strong>{" "}
+                        {q.score ?? <span style={styles.pending}>⏳ scoring pending</span>}
+                      </p>
                       {q.subscores && (
                         <ul style={{ marginLeft: "1rem", fontSize: "0.9rem" }}>
                           <li>Relevance: {q.subscores.relevance}</li>
@@ -117,16 +162,46 @@ export default function AdminDashboard({ onLogout }) {
                           <li>Clarity: {q.subscores.clarity}</li>
                         </ul>
                       )}
-                      <p><strong>Hallucination:</strong> {q.hallucination}</p>
+                      {q.score != null && <p><strong>Hallucination:</strong> {q.hallucination}</p>}
 
                     </div>
                   ))
                 )}
+                {loadMoreLogs(session.id, "qa")}
               </div>
             )}
           </div>
         </div>
       ))}
+      {nextCursor && (
+        <button style={styles.moreBtn} onClick={() => loadSessions(nextCursor)}>
+          Load more sessions
+        </button>
+      )}
+    </div>
+  );
+}
+
+function EngagementTimeline({ timeline }) {
+  if (!timeline || timeline.buckets.length === 0) return null;
+  const { buckets, bucketSeconds } = timeline;
+  const width = 600;
+  const height = 60;
+  const step = buckets.length > 1 ? width / (buckets.length - 1) : 0;
+  const points = buckets
+    .map((b, i) => `${(i * step).toFixed(1)},${((1 - b.engagement) * height).toFixed(1)}`)
+    .join(" ");
+  const frames = buckets.reduce((sum, b) => sum + b.frames, 0);
+  const average = buckets.reduce((sum, b) => sum + b.engagement * b.frames, 0) / frames;
+
+  return (
+    <div style={styles.timeline}>
+      <svg width="100%" height={height} viewBox={`0 0 ${width} ${height}`} preserveAspectRatio="none">
+        <polyline points={points} fill="none" stroke="#2a7ae2" strokeWidth="2" />
+      </svg>
+      <small>
+        Engagement per {bucketSeconds}s · average {(average * 100).toFixed(0)}% over {frames} frames
+      </small>
     </div>
   );
 }
@@ -151,6 +226,15 @@ const styles = {
     cursor: "pointer",
     marginBottom: "0.5rem",
   },
+  moreBtn:       {
+    background: "#fff",
+    border: "1px solid #222",
+    padding: "0.4rem 1rem",
+    borderRadius: 5,
+    cursor: "pointer",
+    marginTop: "0.5rem",
+  },
+  timeline:      { marginBottom: "0.75rem" },
   behaviorBlock: {
     background: "#f0f8ff",
     padding: "1rem",
@@ -162,6 +246,7 @@ const styles = {
     borderRadius: 8,
     marginTop: "1rem",
   },
+  pending:       { color: "#b26a00", fontStyle: "italic" },
   qaItem:        {
     background: "#f9f9f9",
     borderRadius: 6,
@@ -12,7 +12,7 @@ export default function AdminLogin({ onLogin }) {
     const authHeader = "Basic " + btoa(`${username}:${password}`);
 
     try {
-      const res = await fetch(`${BACKEND}/admin/interview-sessions`, {
+      const res = await fetch(`${BACKEND}/admin/interview-sessions?limit=1`, {
         headers: { Authorization: authHeader },
       });
       if (!res.ok) throw new Error(`${res.status}`);
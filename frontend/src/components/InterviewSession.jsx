@@ -5,6 +5,7 @@ import useMediaPipeFaceMesh from "../hooks/useMediaPipeFaceMesh";
 
 const SILENCE_STAGE_1 = 10000;
 const SILENCE_STAGE_2 = 6000;
+const BEHAVIOR_FLUSH_MS = 2000;
 
 const SILENCE_PROMPT =
   "It seems you’ve been quiet. Would you like me to repeat the last question?";
@@ -17,7 +18,6 @@ export default function InterviewSession() {
   const isSpeakingRef = useRef(false);
   const isPausedRef = useRef(false);
   const fetchingNextRef = useRef(false);
-  const historyRef = useRef([]);
   const lastQuestionRef = useRef("");
   const lastFinalRef = useRef("");
   const lastSpokenTextRef = useRef("");
@@ -28,6 +28,8 @@ export default function InterviewSession() {
   const sessionTimer = useRef(null);
   const silenceTimers = useRef({ prompt: null, skip: null });
   const candidateIdRef = useRef(null);
+  const behaviorQueueRef = useRef([]);
+  const behaviorTimerRef = useRef(null);
 
   const [started, setStarted] = useState(false);
 
@@ -83,7 +85,7 @@ export default function InterviewSession() {
     await new Promise(r => setTimeout(r, 400));
     await audioCtx.suspend();
     lastSpokenTextRef.current = text;
-    await speakText(text);
+    await speakText(text, "alloy", candidateIdRef.current);
     await audioCtx.resume();
     await new Promise(r => setTimeout(r, 500));
 
@@ -101,18 +103,37 @@ export default function InterviewSession() {
     }
   }
 
+  // 📦 Send queued face-mesh samples in one request instead of one per frame
+  async function flushBehavior() {
+    const samples = behaviorQueueRef.current;
+    if (!candidateIdRef.current || samples.length === 0) return;
+    behaviorQueueRef.current = [];
+
+    await api.post("/interview/log-behavior/batch", {
+      session_id: candidateIdRef.current,
+      samples,
+    }).catch((err) => {
+      console.warn("⚠️ Behavior log failed:", err);
+    });
+  }
+
   function stopSession() {
     clearSilenceTimers();
     clearTimeout(sessionTimer.current);
+    clearInterval(behaviorTimerRef.current);
+    flushBehavior();
+    // Score whatever is still unscored in one batched pass
+    if (candidateIdRef.current) {
+      api.post("/interview/end-session", { candidate_id: candidateIdRef.current })
+        .catch((e) => console.warn("End-of-session scoring failed:", e));
+    }
     isPausedRef.current = false;
     isSpeakingRef.current = false;
     setStarted(false);
-    historyRef.current = [];
     lastQuestionRef.current = "";
   }
 
   async function handleUserTurn(content) {
-    historyRef.current.push({ role: "user", content });
     responseBufferRef.current = "";  // clear the buffer for the next answer
     await fetchNext(content);
   }
@@ -122,12 +143,9 @@ export default function InterviewSession() {
     fetchingNextRef.current = true;
 
     clearSilenceTimers();
-    const raw = historyRef.current.slice(-10);
-    const clean = raw.map(({ role, content }) => ({ role, content }));
-
     try {
       const resp = await api.post("/interview/ask", {
-        history: clean,
+        // the server keeps the conversation; only the new utterance is sent
         candidate_id: candidateIdRef.current,
         session_id: candidateIdRef.current,
         user_input: user_input || "[INIT]",
@@ -135,7 +153,6 @@ export default function InterviewSession() {
       const answer = resp.answer;
       if (!answer) throw new Error("Missing 'answer' in /interview/ask response");
 
-      historyRef.current.push({ role: "assistant", content: answer });
       lastQuestionRef.current = extractQuestion(answer);
       await controlSpeakAndListen(answer, true);
     } catch (e) {
@@ -149,6 +166,17 @@ export default function InterviewSession() {
     }
   }
 
+  // 🔮 Let the server draft the next question while we wait to finalize the answer
+  function speculate(partial) {
+    if (!candidateIdRef.current || /\b(move on|skip|next question|continue)\b/i.test(partial)) return;
+    api.post("/interview/ask", {
+      candidate_id: candidateIdRef.current,
+      session_id: candidateIdRef.current,
+      user_input: partial,
+      partial: true,
+    }).catch((err) => console.warn("Speculative ask failed:", err));
+  }
+
   function extractQuestion(text) {
     const qIdx = text.lastIndexOf("?");
     if (qIdx < 0) return text;
@@ -223,6 +251,7 @@ export default function InterviewSession() {
         clearTimeout(rec.finalizeTimer);
         const delay = isComplete(final) ? 1200 : 3000;
         rec.finalizeTimer = setTimeout(onFinalize, delay);
+        speculate(cleaned);
       } else if (interim) {
         // reset silence timers on interim to avoid false quiet detection
         hasHeardRef.current = true;
@@ -253,6 +282,7 @@ export default function InterviewSession() {
       clearSilenceTimers();
       clearTimeout(sessionTimer.current);
       clearTimeout(speechEndTimerRef.current);
+      clearInterval(behaviorTimerRef.current);
     };
   }, []);
 
@@ -271,6 +301,8 @@ export default function InterviewSession() {
     if (audioCtx.state === "suspended") await audioCtx.resume();
     try { recRef.current.start(); } catch {}
 
+    behaviorTimerRef.current = setInterval(flushBehavior, BEHAVIOR_FLUSH_MS);
+
     sessionTimer.current = setTimeout(() => {
       stopSession();
       controlSpeakAndListen("Your 30-minute session has ended. Thank you!", false);
@@ -291,13 +323,11 @@ export default function InterviewSession() {
     const face_present = Array.isArray(landmarks) && landmarks.length > 0;
     const gaze_direction = rawGaze ?? "center";
 
-    await api.post("/interview/log-behavior", {
-      session_id: candidateIdRef.current,
+    behaviorQueueRef.current.push({
       emotion,
       face_present,
       gaze_direction,
-    }).catch((err) => {
-      console.warn("⚠️ Behavior log failed:", err);
+      timestamp: new Date().toISOString(),
     });
   };
 
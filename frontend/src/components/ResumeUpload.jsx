@@ -1,10 +1,31 @@
 import React, { useState } from "react";
 import api from "../api";
 
+const STATUS_POLL_MS = 1000;
+const MAX_UNKNOWN_POLLS = 30;   // "unknown": no worker knows the upload (yet)
+const MAX_STATUS_POLLS = 660;   // ~11 min: just past the server's INGEST_TIMEOUT for a stuck upload
+
 export default function ResumeUpload({ onUploaded }) {
   const [resumeFile, setResumeFile] = useState(null);
   const [uploading, setUploading] = useState(false);
   const [error, setError] = useState(null);
+  const [progress, setProgress] = useState(null);
+
+  // ⏳ Ingestion runs in the background on the server; wait for the index
+  const waitForIndexing = async (candidateId) => {
+    for (let attempt = 0, unknown = 0; attempt < MAX_STATUS_POLLS; attempt++) {
+      const job = await api.get(`/interview/resume-status/${candidateId}`);
+      setProgress(Math.round((job.progress ?? 0) * 100));
+      if (job.status === "done") return;
+      if (job.status === "failed") throw new Error(job.error || "Resume indexing failed");
+      unknown = job.status === "unknown" ? unknown + 1 : 0;
+      if (unknown >= MAX_UNKNOWN_POLLS) {
+        throw new Error("Resume upload not found");
+      }
+      await new Promise((r) => setTimeout(r, STATUS_POLL_MS));
+    }
+    throw new Error("Resume indexing timed out");
+  };
 
   const uploadResume = async () => {
     if (!resumeFile) {
@@ -14,6 +35,7 @@ export default function ResumeUpload({ onUploaded }) {
 
     setUploading(true);
     setError(null);
+    setProgress(null);
 
     try {
       const formData = new FormData();
@@ -23,6 +45,8 @@ export default function ResumeUpload({ onUploaded }) {
 
       // ✅ Fixed check: response is raw JSON, not res.data
       if (res?.candidate_id) {
+        // Re-uploads of an already indexed PDF come back "done" straight away
+        if (res.status !== "done") await waitForIndexing(res.candidate_id);
         onUploaded(res.candidate_id);
       } else {
         console.error("Unexpected response:", res);
@@ -54,7 +78,9 @@ export default function ResumeUpload({ onUploaded }) {
           disabled={!resumeFile || uploading}
           style={styles.uploadButton}
         >
-          {uploading ? "Uploading..." : "Upload Resume"}
+          {uploading
+            ? progress === null ? "Uploading..." : `Indexing resume… ${progress}%`
+            : "Upload Resume"}
         </button>
 
         {error && <p style={styles.error}>{error}</p>}
@@ -2,7 +2,7 @@
 const AudioContextClass = window.AudioContext || window.webkitAudioContext;
 export const audioCtx = new AudioContextClass();
 
-export async function speakText(text, voice = "alloy") {
+export async function speakText(text, voice = "alloy", sessionId = null) {
   console.log("[TTS] speakText →", text);
 
   if (audioCtx.state === "suspended") {
@@ -12,7 +12,11 @@ export async function speakText(text, voice = "alloy") {
   try {
     const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/speak`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      headers: {
+        "Content-Type": "application/json",
+        // lets the server attribute TTS calls to a session (trace recording)
+        ...(sessionId && { "X-Session-Id": sessionId }),
+      },
       body: JSON.stringify({ text, voice }),
     });
 
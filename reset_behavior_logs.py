@@ -1,18 +1,20 @@
 # reset_behavior_logs.py
 
 import os
+import sys
 from dotenv import load_dotenv
 
 # Load your .env (so DATABASE_URL is set)
 load_dotenv()
 
-# Now import your DB metadata
-from backend.db import engine, metadata
+# Schema changes are versioned migrations now (backend/migrations.py): they
+# add columns and indexes in place instead of dropping behavior_logs.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from db import get_engine
+from migrations import sequential_scans
 
-if "behavior_logs" in metadata.tables:
-    metadata.tables["behavior_logs"].drop(engine, checkfirst=True)
-    print("Dropped existing behavior_logs table.")
+engine = get_engine()          # applies any pending migration
 
-# Re-create all tables
-metadata.create_all(engine)
-print("Recreated all tables (behavior_logs now includes engagement_score).")
+print("Schema is up to date (behavior_logs keeps its data).")
+for failure in sequential_scans(engine):
+    print(f"Warning, hot query scans a table: {failure}")
@@ -0,0 +1,13 @@
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+# The app refuses to start without a database; tests use a throwaway SQLite file
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'interview-tests.db')}")
+
+def pytest_sessionstart(session):
+    # The app creates and migrates the schema in its lifespan hook; tests talk to the DB directly
+    from db import get_engine
+    get_engine()
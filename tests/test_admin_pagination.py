@@ -0,0 +1,73 @@
+import sys
+import os
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient, BasicAuth
+from httpx._transports.asgi import ASGITransport
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+from main import app
+from db import database, behavior_logs
+
+@pytest.mark.asyncio
+async def test_behavior_logs_are_keyset_paginated(monkeypatch):
+    monkeypatch.setenv("ADMIN_PASSWORD", "secret")
+    start = datetime(2025, 1, 1, 10, 0, 0)
+    await database.connect()
+    try:
+        await database.execute(behavior_logs.delete().where(behavior_logs.c.session_id == "test-page-1"))
+        # Two frames share a timestamp, so the id tie-breaker matters
+        for i, offset in enumerate([0, 1, 1, 2, 3]):
+            await database.execute(behavior_logs.insert().values(
+                session_id="test-page-1", timestamp=start + timedelta(seconds=offset),
+                engagement_score=1.0, emotion=f"e{i}", face_present=True, gaze_direction="center",
+            ))
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test", auth=BasicAuth("admin", "secret")) as ac:
+            seen, cursor = [], None
+            while True:
+                params = {"candidate_id": "test-page-1", "limit": 2, **({"cursor": cursor} if cursor else {})}
+                page = (await ac.get("/admin/behavior-logs", params=params)).json()
+                seen += [log["emotion"] for log in page["logs"]]
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+            assert seen == ["e0", "e1", "e2", "e3", "e4"]
+
+            window = await ac.get("/admin/behavior-logs", params={
+                "candidate_id": "test-page-1", "since": "2025-01-01T10:00:01Z", "until": "2025-01-01T10:00:03Z",
+            })
+            assert [log["emotion"] for log in window.json()["logs"]] == ["e1", "e2", "e3"]
+
+            bad = await ac.get("/admin/behavior-logs", params={"candidate_id": "test-page-1", "cursor": "nope"})
+            assert bad.status_code == 400
+    finally:
+        await database.disconnect()
+
+@pytest.mark.asyncio
+async def test_engagement_timeline_is_bucketed_in_sql(monkeypatch):
+    monkeypatch.setenv("ADMIN_PASSWORD", "secret")
+    start = datetime(2025, 1, 1, 10, 0, 0)
+    frames = [(0.5, "happy", True, "center"), (9.9, "sad", False, "away"), (10.2, "happy", True, "left")]
+    await database.connect()
+    try:
+        await database.execute(behavior_logs.delete().where(behavior_logs.c.session_id == "test-timeline-1"))
+        for offset, emotion, face, gaze in frames:
+            await database.execute(behavior_logs.insert().values(
+                session_id="test-timeline-1", timestamp=start + timedelta(seconds=offset),
+                engagement_score=1.0 if face else 0.0, emotion=emotion, face_present=face, gaze_direction=gaze,
+            ))
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test", auth=BasicAuth("admin", "secret")) as ac:
+            resp = await ac.get("/admin/engagement-timeline",
+                                params={"candidate_id": "test-timeline-1", "bucket_seconds": 10})
+        first, second = resp.json()["buckets"]
+        assert first["start"] == "2025-01-01T10:00:00" and first["frames"] == 2
+        assert first["engagement"] == 0.5 and first["face_present_ratio"] == 0.5
+        assert first["emotions"] == {"happy": 1, "sad": 1} and first["gaze"] == {"center": 1, "away": 1}
+        assert second["start"] == "2025-01-01T10:00:10" and second["gaze"] == {"left": 1}
+    finally:
+        await database.disconnect()
@@ -1,12 +1,18 @@
 import sys
 import os
+import asyncio
 import pytest
 from httpx import AsyncClient
 from httpx._transports.asgi import ASGITransport
 
-# Add backend to path
+# Add backend to path; run against the deterministic local model stand-ins (no network)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
 from main import app
+from phrases import OPENING_QUESTIONS, TEACH_REPLY
+from routes.clarify_check import parse_intent_header, split_intent
+import llm_gateway
+import routes.interview as interview
 
 @pytest.mark.asyncio
 async def test_ask_endpoint_basic():
@@ -19,4 +25,63 @@ async def test_ask_endpoint_basic():
             "session_id": "test-candidate-1"
         })
         assert response.status_code == 200
-        assert "answer" in response.json()
+        assert response.json()["answer"]
+
+@pytest.mark.parametrize("reply, expected", [
+    ("INTENT: other\nWhat did you measure?", ("other", "What did you measure?")),
+    ("  intent:  Clarify \n\nWhich queue did you build?", ("clarify", "Which queue did you build?")),
+    ("INTENT: teach\nThe answer is a lock.", ("teach", "The answer is a lock.")),
+    ("INTENT: clarify", ("clarify", "")),
+    ("What did you measure?", ("other", "What did you measure?")),           # no header
+    ("INTENT: unsure\nWhat next?", ("other", "INTENT: unsure\nWhat next?")),  # unknown intent: kept verbatim
+    ("", ("other", "")),
+])
+def test_split_intent(reply, expected):
+    assert split_intent(reply) == expected
+
+def test_parse_intent_header_keeps_trailing_space_for_streamed_deltas():
+    assert parse_intent_header("INTENT: other\nWhat ") == ("other", "What ")
+
+LAST_QUESTION = "Tell me about a queue you built."
+HISTORY = [
+    {"role": "assistant", "content": OPENING_QUESTIONS[0]},
+    {"role": "user", "content": "Backend engineer."},
+    {"role": "assistant", "content": OPENING_QUESTIONS[1]},
+    {"role": "user", "content": "Five years of Python services."},
+    {"role": "assistant", "content": LAST_QUESTION},
+]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reply, answer, scored", [
+    ("INTENT: other\nWhat did you measure?", "What did you measure?", True),
+    ("What did you measure?", "What did you measure?", True),
+    ("INTENT: clarify\nWhich queue did you build?", interview.clarify_reply("Which queue did you build?"), False),
+    ("INTENT: clarify", interview.clarify_reply(LAST_QUESTION), False),
+    ("INTENT: TEACH\nUse a lock.", TEACH_REPLY, False),
+])
+async def test_ask_routes_on_the_folded_intent(monkeypatch, reply, answer, scored):
+    scoring = []
+
+    async def chat(messages, model=None, **kwargs):
+        return reply
+
+    async def no_hint(session_id):
+        return ""
+
+    async def score_and_log(candidate_id, question, answer, resume, asked_at):
+        scoring.append((question, answer))
+
+    monkeypatch.setattr(llm_gateway, "chat", chat)
+    monkeypatch.setattr(interview, "get_hint", no_hint)
+    monkeypatch.setattr(interview, "score_and_log", score_and_log)
+
+    user_input = "Some reply from the candidate."
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post("/interview/ask", json={
+            "user_input": user_input, "candidate_id": "test-intent-1", "session_id": "test-intent-1",
+            "history": HISTORY + [{"role": "user", "content": user_input}],
+        })
+    assert response.status_code == 200 and response.json()["answer"] == answer
+    await asyncio.sleep(0)   # let the spawned scoring task start
+    assert scoring == ([(LAST_QUESTION, user_input)] if scored else [])
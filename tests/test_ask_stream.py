@@ -0,0 +1,116 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+# Add backend to path; run against the deterministic local model stand-ins (no network)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
+from main import app
+from db import database
+from phrases import OPENING_QUESTIONS, TEACH_REPLY
+from scoring import ScoringBatcher
+import llm_gateway
+import routes.interview as interview
+
+LAST_QUESTION = "Tell me about a queue you built."
+HISTORY = [
+    {"role": "assistant", "content": OPENING_QUESTIONS[0]},
+    {"role": "user", "content": "Backend engineer."},
+    {"role": "assistant", "content": OPENING_QUESTIONS[1]},
+    {"role": "user", "content": "Five years of Python services."},
+    {"role": "assistant", "content": LAST_QUESTION},
+]
+
+logged = []
+
+@pytest.fixture
+def script(monkeypatch):
+    """Make the model stream the given chunks; returns a setter."""
+    chunks = []
+    logged.clear()
+
+    async def chat_stream(messages, model=None, **kwargs):
+        for chunk in chunks:
+            yield chunk
+
+    async def no_hint(session_id):
+        return ""
+
+    monkeypatch.setattr(llm_gateway, "chat_stream", chat_stream)
+    async def log_answer(candidate_id, question, answer, result, asked_at):
+        logged.append((question, answer))
+
+    monkeypatch.setattr(interview, "get_hint", no_hint)
+    monkeypatch.setattr(interview, "log_answer", log_answer)
+    # Each test runs on its own event loop; the shared batcher's timer would belong to an earlier one
+    monkeypatch.setattr(interview, "scoring_batcher", ScoringBatcher())
+    return lambda *parts: chunks.extend(parts)
+
+async def stream(user_input):
+    """[(event, data)] from /interview/ask/stream (legacy history, so nothing is stored)."""
+    await database.connect()
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            resp = await ac.post("/interview/ask/stream", json={
+                "user_input": user_input, "candidate_id": "test-stream-1", "session_id": "test-stream-1",
+                "history": HISTORY + [{"role": "user", "content": user_input}],
+            })
+            assert resp.status_code == 200
+        await asyncio.sleep(0.05)   # the answer is logged in the background
+    finally:
+        await database.disconnect()
+    events = []
+    for block in resp.text.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+def spoken(events):
+    return "".join(data["text"] for event, data in events if event == "token")
+
+@pytest.mark.asyncio
+async def test_other_streams_the_body_and_scores_the_answer(script):
+    script("INT", "ENT: ot", "her\n", "What did you ", "measure?")
+    events = await stream("A Redis-backed job queue.")
+    assert spoken(events) == "What did you measure?"
+    assert [e for e, _ in events][-2:] == ["score", "done"]
+    assert events[-1][1] == {"answer": "What did you measure?", "intent": "other"}
+    assert logged == [(LAST_QUESTION, "A Redis-backed job queue.")]
+
+@pytest.mark.asyncio
+async def test_clarify_rephrases_the_question(script):
+    script("INTENT: clarify\n", "Which queue ", "did you build?")
+    events = await stream("Sorry, what do you mean?")
+    answer = interview.clarify_reply("") + "Which queue did you build?"
+    assert spoken(events) == answer and events[-1][1] == {"answer": answer, "intent": "clarify"}
+    assert "score" not in [e for e, _ in events] and not logged
+
+@pytest.mark.asyncio
+async def test_clarify_without_a_body_repeats_the_last_question(script):
+    script("INTENT: clar", "ify")
+    events = await stream("Can you rephrase that?")
+    assert events[-1][1] == {"answer": interview.clarify_reply("") + LAST_QUESTION, "intent": "clarify"}
+
+@pytest.mark.asyncio
+async def test_teach_never_streams_the_explanation(script):
+    script("  intent:  Teach \n", "The answer is to use a lock.")
+    events = await stream("Can you just tell me the answer?")
+    assert spoken(events) == TEACH_REPLY
+    assert events[-1][1] == {"answer": TEACH_REPLY, "intent": "teach"}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunks", [
+    ("How did you ", "handle retries?"),                                     # ends while still buffering
+    ("How did you handle retries when a worker ", "crashed mid-job?"),       # longer than the header buffer
+])
+async def test_a_reply_without_a_header_counts_as_other(script, chunks):
+    script(*chunks)
+    events = await stream("It used visibility timeouts.")
+    assert spoken(events) == "".join(chunks)
+    assert events[-1][1] == {"answer": "".join(chunks), "intent": "other"}
+    assert "score" in [e for e, _ in events]
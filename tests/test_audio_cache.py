@@ -0,0 +1,98 @@
+import sys
+import os
+import time
+import asyncio
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+from audio_cache import AudioCache
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_synthesis(tmp_path):
+    cache = AudioCache(directory=str(tmp_path), max_bytes=1024)
+    calls = []
+
+    async def synth():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return b"mp3" * 10
+
+    paths = await asyncio.gather(*(cache.get_or_create("Hello there.", "alloy", synth) for _ in range(5)))
+
+    assert len(calls) == 1
+    assert len(set(paths)) == 1
+    assert open(paths[0], "rb").read() == b"mp3" * 10
+    assert cache.stats()["misses"] == 1 and cache.stats()["coalesced"] == 4
+    assert not list(tmp_path.glob("*.tmp"))
+
+@pytest.mark.asyncio
+async def test_lru_eviction_respects_byte_budget_and_pins(tmp_path):
+    cache = AudioCache(directory=str(tmp_path), max_bytes=250)
+
+    async def synth():
+        return b"x" * 100
+
+    await cache.get_or_create("pinned", "alloy", synth, pin=True)
+    await cache.get_or_create("a", "alloy", synth)
+    await cache.get_or_create("b", "alloy", synth)
+
+    assert cache.lookup(cache.key("a", "alloy")) is None      # least recently used, evicted
+    assert cache.lookup(cache.key("pinned", "alloy")) is not None
+    assert cache.stats()["bytes"] <= 250
+
+    # A fresh cache rebuilds the same index from disk
+    reloaded = AudioCache(directory=str(tmp_path), max_bytes=250)
+    assert reloaded.stats()["entries"] == 2
+
+@pytest.mark.asyncio
+async def test_abandoned_synthesis_is_cancelled_unless_shared(tmp_path):
+    cache = AudioCache(directory=str(tmp_path), max_bytes=1024)
+    started, finished = [], []
+
+    async def synth():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return b"mp3"
+
+    # Sole (speculative) caller goes away: the synthesis stops
+    alone = asyncio.create_task(cache.get_or_create("Only me.", "alloy", synth, abandon=True))
+    await asyncio.sleep(0.01)
+    alone.cancel()
+    await asyncio.sleep(0.08)
+    assert started and not finished and cache.lookup(cache.key("Only me.", "alloy")) is None
+
+    # A /speak request joined in the meantime: it still gets its audio
+    spec = asyncio.create_task(cache.get_or_create("Shared.", "alloy", synth, abandon=True))
+    await asyncio.sleep(0.01)
+    speak = asyncio.create_task(cache.get_or_create("Shared.", "alloy", synth))
+    await asyncio.sleep(0.01)
+    spec.cancel()
+    assert open(await speak, "rb").read() == b"mp3"
+
+@pytest.mark.asyncio
+async def test_recently_read_entries_outlive_older_ones(tmp_path):
+    cache = AudioCache(directory=str(tmp_path), max_bytes=250)
+
+    async def synth():
+        return b"x" * 100
+
+    await cache.get_or_create("a", "alloy", synth)
+    await cache.get_or_create("b", "alloy", synth)
+    await cache.get_or_create("a", "alloy", synth)   # hit: "a" is now the most recent
+    await cache.get_or_create("c", "alloy", synth)
+
+    assert cache.lookup(cache.key("b", "alloy")) is None
+    assert cache.lookup(cache.key("a", "alloy")) and cache.lookup(cache.key("c", "alloy"))
+    assert cache.stats()["hits"] == 1 and cache.stats()["evictions"] == 1
+
+def test_load_keeps_temp_files_other_workers_may_still_rename(tmp_path):
+    old, fresh = tmp_path / "123-old.tmp", tmp_path / "456-fresh.tmp"
+    old.write_bytes(b"partial")
+    fresh.write_bytes(b"partial")
+    an_hour_ago = time.time() - 3600
+    os.utime(old, (an_hour_ago, an_hour_ago))
+
+    AudioCache(directory=str(tmp_path)).load()
+    assert not old.exists() and fresh.exists()
@@ -0,0 +1,113 @@
+import sys
+import os
+import json
+import pytest
+
+# Add backend to path; run against the deterministic local model stand-ins (no network)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
+import bulk_ingest
+import llm_gateway
+import rag
+from bulk_ingest import BulkReport, _Pipeline, collect_pdfs, load_manifest, run_bulk, run_job
+from db import database
+
+@pytest.fixture
+def embedded(monkeypatch):
+    """Chunk texts sent for embedding; "PDFs" here are text files, one chunk per line."""
+    texts = []
+
+    def split(path):
+        with open(path) as f:
+            lines = f.read().splitlines()
+        return lines, 1
+
+    async def embed(batch, model=None):
+        texts.extend(batch)
+        return [[float(len(t)), 1.0] for t in batch]
+
+    monkeypatch.setattr(rag, "parse_and_split", split)   # parse_file runs in threads here (executor=None)
+    monkeypatch.setattr(llm_gateway, "embed", embed)
+    return texts
+
+def write_pdf(path, *lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines))
+    return str(path)
+
+@pytest.mark.asyncio
+async def test_copies_of_a_resume_are_embedded_once_and_all_recorded(tmp_path, embedded):
+    write_pdf(tmp_path / "a.pdf", "bulk-dedup Ada", "Compilers at Acme")
+    write_pdf(tmp_path / "copies" / "a.pdf", "bulk-dedup Ada", "Compilers at Acme")
+    write_pdf(tmp_path / "b.pdf", "bulk-dedup Bob", "Databases at Initech")
+    manifest = str(tmp_path / "manifest.jsonl")
+
+    await database.connect()
+    try:
+        report = await run_bulk(collect_pdfs([str(tmp_path)]), manifest, BulkReport("t"))
+    finally:
+        await database.disconnect()
+
+    assert report.files_done == 3 and report.files_failed == 0 and report.chunks == 4
+    assert sorted(embedded) == ["Compilers at Acme", "Databases at Initech", "bulk-dedup Ada", "bulk-dedup Bob"]
+    entries = [json.loads(line) for line in open(manifest)]
+    assert len(entries) == 3 and sum("duplicate_of" in e for e in entries) == 1
+    assert load_manifest(manifest) == set(collect_pdfs([str(tmp_path)]))
+
+@pytest.mark.asyncio
+async def test_a_copy_seen_after_its_resume_finished_is_not_queued_again(tmp_path, embedded):
+    first = write_pdf(tmp_path / "c.pdf", "bulk-late Cy", "Kernels at Hooli")
+    second = write_pdf(tmp_path / "c-copy.pdf", "bulk-late Cy", "Kernels at Hooli")
+    report = BulkReport("t")
+    pipeline = _Pipeline(str(tmp_path / "manifest.jsonl"), report)
+
+    await database.connect()
+    try:
+        path, digest, texts, pages = bulk_ingest.parse_file(first)
+        pipeline.add_file(path, digest, texts, pages)
+        await pipeline.pump(final=True)
+        pipeline.add_file(second, digest, texts, pages)
+        assert not pipeline.queue
+        await pipeline.pump(final=True)
+    finally:
+        await database.disconnect()
+
+    assert embedded == ["bulk-late Cy", "Kernels at Hooli"]
+    assert report.files_done == 2 and load_manifest(pipeline.manifest_path) == {first, second}
+
+@pytest.mark.asyncio
+async def test_a_rerun_resumes_from_the_manifest(tmp_path, embedded):
+    write_pdf(tmp_path / "d.pdf", "bulk-resume Dee", "Search at Pied Piper")
+    manifest = str(tmp_path / "manifest.jsonl")
+
+    await database.connect()
+    try:
+        await run_bulk(collect_pdfs([str(tmp_path)]), manifest, BulkReport("t"))
+        write_pdf(tmp_path / "e.pdf", "bulk-resume Eve", "Payments at Globex")
+        embedded.clear()
+        report = await run_bulk(collect_pdfs([str(tmp_path)]), manifest, BulkReport("t"))
+    finally:
+        await database.disconnect()
+
+    assert report.files_total == 2 and report.files_skipped == 1 and report.files_done == 1
+    assert embedded == ["bulk-resume Eve", "Payments at Globex"]
+
+@pytest.mark.asyncio
+async def test_failed_files_are_kept_for_the_next_run(tmp_path, embedded, monkeypatch):
+    async def broken_embed(batch, model=None):
+        raise RuntimeError("rate limited")
+
+    monkeypatch.setattr(llm_gateway, "embed", broken_embed)
+    uploads = tmp_path / "upload"
+    write_pdf(uploads / "f.pdf", "bulk-fail Fay", "Robotics at Umbrella")
+    write_pdf(uploads / "f-copy.pdf", "bulk-fail Fay", "Robotics at Umbrella")
+
+    await database.connect()
+    try:
+        report = await run_job("test-bulk-fail", str(uploads))
+    finally:
+        await database.disconnect()
+
+    assert report.status == "done" and report.files_failed == 2 and report.files_done == 0
+    assert load_manifest(str(uploads / bulk_ingest.MANIFEST_NAME)) == set()
+    assert (uploads / "f.pdf").exists()   # uploads stay until every file is recorded
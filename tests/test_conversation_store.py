@@ -0,0 +1,71 @@
+import sys
+import os
+import pytest
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+# Add backend to path; run against the deterministic local model stand-ins (no network)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
+from main import app
+from db import database, conversation_turns
+from conversation_store import conversation_store
+from routes.interview import OPENING_QUESTIONS
+
+@pytest.mark.asyncio
+async def test_server_keeps_the_conversation():
+    sid = "test-conversation-1"
+    await database.connect()
+    try:
+        await database.execute(conversation_turns.delete().where(conversation_turns.c.session_id == sid))
+        conversation_store.forget(sid)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            async def ask(text):
+                resp = await ac.post("/interview/ask", json={"user_input": text, "candidate_id": sid, "session_id": sid})
+                assert resp.status_code == 200
+                return resp.json()["answer"]
+
+            assert await ask("[INIT]") == OPENING_QUESTIONS[0]
+            assert await ask("Backend engineer.") == OPENING_QUESTIONS[1]
+            assert await ask("[EMPTY]") == OPENING_QUESTIONS[1]     # silence is not an answer
+            assert await ask("Five years of Python services.") not in OPENING_QUESTIONS
+            question = await ask("I led the payments migration.")
+
+            conversation = await conversation_store.get(sid)
+            assert conversation.answers == 3 and conversation.last_question == question
+
+            # Evicted (or another worker): the next turn rebuilds the same state from the DB
+            conversation_store.forget(sid)
+            reloaded = await conversation_store.get(sid)
+            assert reloaded.turns == conversation.turns and reloaded.last_question == question
+            assert conversation_store.loads >= 1
+    finally:
+        await database.disconnect()
+
+@pytest.mark.asyncio
+async def test_turns_from_another_worker_and_concurrent_writes():
+    import asyncio
+    from datetime import datetime
+    sid = "test-conversation-2"
+    await database.connect()
+    try:
+        await database.execute(conversation_turns.delete().where(conversation_turns.c.session_id == sid))
+        conversation_store.forget(sid)
+
+        await conversation_store.record_turn(sid, "[INIT]", OPENING_QUESTIONS[0])
+        cached = await conversation_store.get(sid)
+        # Another worker answers the next turn: our cached copy must pick it up
+        await database.execute(conversation_turns.insert().values([
+            {"session_id": sid, "turn": 1, "role": "user", "content": "Backend engineer.", "created_at": datetime.utcnow()},
+            {"session_id": sid, "turn": 2, "role": "assistant", "content": OPENING_QUESTIONS[1], "created_at": datetime.utcnow()},
+        ]))
+        assert (await conversation_store.get(sid)) is cached and cached.answers == 1
+        assert cached.last_question == OPENING_QUESTIONS[1]
+
+        await asyncio.gather(*(conversation_store.record_turn(sid, f"Answer {i}.", f"Question {i}?") for i in range(3)))
+        rows = await database.fetch_all(conversation_turns.select().where(conversation_turns.c.session_id == sid))
+        assert sorted(r["turn"] for r in rows) == list(range(9))
+    finally:
+        await database.disconnect()
@@ -0,0 +1,50 @@
+import sys
+import os
+import sqlite3
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import llm_gateway
+from embedding_cache import EmbeddingCache
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    calls = []
+
+    async def embed_query(text, model=None):
+        calls.append(text)
+        return [0.5, 0.25, float(len(calls))]   # exact in float32, as stored on disk
+
+    monkeypatch.setattr(llm_gateway, "embed_query", embed_query)
+    return calls
+
+@pytest.mark.asyncio
+async def test_a_hit_skips_the_provider(provider_calls):
+    cache = EmbeddingCache(disk_path=None)
+    first = await cache.embed_query("Tell me about Kafka")
+    # Same text after normalization (case, whitespace)
+    assert await cache.embed_query("  tell me   about KAFKA ") == first
+    assert provider_calls == ["Tell me about Kafka"]
+    assert cache.stats() == {"entries": 1, "hits": 1, "disk_hits": 0, "misses": 1}
+
+@pytest.mark.asyncio
+async def test_a_miss_is_persisted_and_reloaded_after_a_restart(tmp_path, provider_calls):
+    path = str(tmp_path / "embeddings.sqlite3")
+    vector = await EmbeddingCache(disk_path=path).embed_query("Describe a hard bug")
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT count(*) FROM embeddings").fetchone()[0] == 1
+
+    restarted = EmbeddingCache(disk_path=path)
+    assert await restarted.embed_query("Describe a hard bug") == vector
+    assert restarted.get("describe a hard bug") == vector   # now in memory
+    assert len(provider_calls) == 1
+    assert restarted.stats()["disk_hits"] == 1 and restarted.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_memory_is_bounded_least_recently_used_first(provider_calls):
+    cache = EmbeddingCache(max_entries=2, disk_path=None)
+    for text in ("a", "b", "a", "c"):
+        await cache.embed_query(text)
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+    assert provider_calls == ["a", "b", "c"]
@@ -0,0 +1,56 @@
+import sys
+import os
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import engagement
+from engagement import EMA_ALPHA, EngagementTracker
+
+def test_ring_buffer_keeps_the_newest_window():
+    tracker = EngagementTracker(window=3)
+    assert tracker.recent("s") is None   # cold miss
+    for score in (0.1, 0.2, 0.3, 0.4):
+        tracker.record("s", score)
+    assert tracker.recent("s", limit=3) == [0.4, 0.3, 0.2]
+    assert tracker.recent("s", limit=2) == [0.4, 0.3]
+    assert tracker.recent("s", limit=4) is None   # more than the window holds: ask the DB
+
+def test_ema_follows_the_recorded_scores():
+    tracker = EngagementTracker()
+    tracker.record("s", 1.0)
+    tracker.record("s", 0.0)
+    tracker.record("s", 0.5)
+    expected = EMA_ALPHA * 0.5 + (1 - EMA_ALPHA) * (EMA_ALPHA * 0.0 + (1 - EMA_ALPHA) * 1.0)
+    assert tracker.ema("s") == pytest.approx(expected)
+
+    # Seeding from the DB (newest first) replaces both the window and the EMA
+    tracker.seed("s", [0.2, 0.8])
+    assert tracker.recent("s", limit=2) == [0.2, 0.8]
+    assert tracker.ema("s") == pytest.approx(EMA_ALPHA * 0.2 + (1 - EMA_ALPHA) * 0.8)
+
+def test_idle_and_excess_sessions_are_evicted(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(engagement.time, "monotonic", lambda: clock[0])
+    tracker = EngagementTracker(max_sessions=2, idle_ttl=60, resync_ttl=3600)
+    for session_id in ("a", "b", "c"):
+        tracker.record(session_id, 1.0)
+    assert len(tracker) == 2 and tracker.recent("a") is None
+
+    clock[0] += 61
+    tracker.record("d", 1.0)
+    assert len(tracker) == 1 and tracker.recent("b") is None
+
+def test_window_is_resynced_from_the_db_after_the_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(engagement.time, "monotonic", lambda: clock[0])
+    tracker = EngagementTracker(resync_ttl=30)
+    tracker.seed("s", [0.9, 0.8, 0.7])
+    clock[0] += 20
+    tracker.record("s", 0.1)   # samples posted to this worker keep it current...
+    assert tracker.recent("s") == [0.1, 0.9, 0.8]
+
+    clock[0] += 11
+    assert tracker.recent("s") is None   # ...but other workers' samples only arrive through the DB
+    tracker.seed("s", [0.3, 0.1, 0.9])
+    assert tracker.recent("s") == [0.3, 0.1, 0.9]
@@ -0,0 +1,104 @@
+import sys
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+# Add backend to path; run against the deterministic local model stand-ins (no network)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
+from main import app
+from db import database, candidate_resumes
+import ingest_jobs
+import llm_gateway
+import rag
+
+@pytest.fixture
+def in_process_parsing(monkeypatch):
+    # Monkeypatched parsers don't reach a process pool
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(ingest_jobs, "get_pool", lambda: pool)
+
+    async def fake_embed(texts, model=None):
+        return [[float(len(t)), 1.0] for t in texts]
+
+    monkeypatch.setattr(llm_gateway, "embed", fake_embed)
+    yield
+    pool.shutdown()
+
+async def finish(job):
+    for _ in range(200):
+        if job.finished_at:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job still {job.status}")
+
+async def status(candidate_id):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.get(f"/interview/resume-status/{candidate_id}")
+        assert resp.status_code == 200
+        return resp.json()
+
+async def upload(tmp_path, candidate_id, contents):
+    path = tmp_path / f"{candidate_id}.pdf"
+    path.write_bytes(contents)
+    resume_hash = rag.document_hash(contents)
+    await database.execute(candidate_resumes.delete().where(candidate_resumes.c.candidate_id == candidate_id))
+    await rag.link_resume(candidate_id, resume_hash)
+    return ingest_jobs.submit(candidate_id, str(path), f"{candidate_id}.pdf", resume_hash), path
+
+@pytest.mark.asyncio
+async def test_job_runs_to_done_and_other_workers_see_it(tmp_path, in_process_parsing, monkeypatch):
+    monkeypatch.setattr(rag, "parse_and_split", lambda path: (["Go at Initech", "Ran the on-call rota"], 1))
+    await database.connect()
+    try:
+        job, path = await upload(tmp_path, "test-ingest-done", b"ingest lifecycle resume")
+        assert job.status == "queued" and (await status("test-ingest-done"))["status"] == "queued"
+        await finish(job)
+        assert job.to_dict()["status"] == "done" and job.progress == 1.0 and job.chunks_total == 2
+        assert not path.exists()
+
+        # Another worker (or after JOB_TTL): no job in memory, answered from the link row and the index
+        del ingest_jobs._jobs["test-ingest-done"]
+        assert (await status("test-ingest-done"))["status"] == "done"
+    finally:
+        await database.disconnect()
+
+@pytest.mark.asyncio
+async def test_failed_ingestion_is_reported_after_the_job_is_gone(tmp_path, in_process_parsing, monkeypatch):
+    def broken_pdf(path):
+        raise ValueError("not a PDF")
+
+    monkeypatch.setattr(rag, "parse_and_split", broken_pdf)
+    await database.connect()
+    try:
+        job, path = await upload(tmp_path, "test-ingest-failed", b"ingest broken resume")
+        await finish(job)
+        assert job.status == "failed" and job.error == "not a PDF" and not path.exists()
+
+        del ingest_jobs._jobs["test-ingest-failed"]
+        reported = await status("test-ingest-failed")
+        assert reported["status"] == "failed" and reported["error"] == "not a PDF"
+    finally:
+        await database.disconnect()
+
+@pytest.mark.asyncio
+async def test_unfinished_upload_is_pending_then_failed():
+    await database.connect()
+    try:
+        for candidate_id, age in (("test-ingest-pending", 0), ("test-ingest-stuck", ingest_jobs.INGEST_TIMEOUT + 60)):
+            await database.execute(candidate_resumes.delete().where(candidate_resumes.c.candidate_id == candidate_id))
+            # Linked at upload on a worker that is still ingesting, or that died
+            await database.execute(candidate_resumes.insert().values(
+                candidate_id=candidate_id, resume_hash=rag.document_hash(candidate_id.encode()),
+                created_at=datetime.utcnow() - timedelta(seconds=age),
+            ))
+        assert (await status("test-ingest-pending"))["status"] == "pending"
+        assert (await status("test-ingest-stuck"))["status"] == "failed"
+        assert (await status("test-ingest-never-uploaded"))["status"] == "unknown"
+    finally:
+        await database.disconnect()
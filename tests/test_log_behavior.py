@@ -0,0 +1,43 @@
+import sys
+import os
+import pytest
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+from main import app
+from db import database, behavior_logs
+from behavior_buffer import behavior_buffer
+
+@pytest.mark.asyncio
+async def test_log_behavior_batch_is_buffered_and_flushed():
+    await database.connect()
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.post("/interview/log-behavior/batch", json={
+                "session_id": "test-batch-1",
+                "samples": [
+                    {"emotion": "happy", "face_present": True, "gaze_direction": "center"},
+                    {"emotion": "sad", "face_present": False, "gaze_direction": "away",
+                     "timestamp": "2025-01-01T10:00:00Z"},
+                ],
+            })
+            assert response.status_code == 200
+            assert response.json()["accepted"] == 2
+
+            bad = await ac.post("/interview/log-behavior/batch", json={
+                "session_id": "test-batch-1",
+                "samples": [{"emotion": "bored", "face_present": True, "gaze_direction": "center"}],
+            })
+            assert bad.status_code == 400
+
+        await behavior_buffer.stop()
+        rows = await database.fetch_all(
+            behavior_logs.select().where(behavior_logs.c.session_id == "test-batch-1")
+        )
+        assert sorted(r["engagement_score"] for r in rows)[-2:] == [0.0, 1.0]
+    finally:
+        await database.execute(behavior_logs.delete().where(behavior_logs.c.session_id == "test-batch-1"))
+        await database.disconnect()
@@ -0,0 +1,51 @@
+import sys
+import os
+import sqlalchemy
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import migrations
+from db import metadata
+
+def test_legacy_schema_is_migrated_in_place(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        # behavior_logs as it was before engagement_score, with no secondary indexes
+        conn.execute(sqlalchemy.text(
+            "CREATE TABLE behavior_logs (id INTEGER PRIMARY KEY, session_id VARCHAR NOT NULL, "
+            "timestamp DATETIME NOT NULL, emotion VARCHAR, face_present BOOLEAN, gaze_direction VARCHAR)"
+        ))
+        conn.execute(sqlalchemy.text(
+            "INSERT INTO behavior_logs (session_id, timestamp, emotion, face_present, gaze_direction) VALUES "
+            "('s1', '2025-01-01 10:00:00', 'sad', 0, 'away'), ('s1', '2025-01-01 10:00:01', 'happy', 1, 'center')"
+        ))
+        metadata.tables["interview_logs"].create(conn)
+        conn.execute(sqlalchemy.text(
+            "CREATE TABLE candidate_resumes (candidate_id VARCHAR PRIMARY KEY, resume_hash VARCHAR NOT NULL, "
+            "created_at DATETIME NOT NULL)"
+        ))
+        conn.execute(sqlalchemy.text("DROP INDEX ix_interview_logs_candidate_ts"))
+
+    before = migrations.sequential_scans(engine)
+    assert {f.split(":")[0] for f in before} == set(migrations.HOT_QUERIES)
+
+    assert migrations.migrate(engine, metadata) == [1, 2, 3, 4, 5, 6]
+    assert migrations.migrate(engine, metadata) == []
+
+    with engine.connect() as conn:
+        assert migrations.has_column(conn, "candidate_resumes", "ingest_error")
+        scores = conn.execute(sqlalchemy.text("SELECT engagement_score FROM behavior_logs ORDER BY id")).scalars().all()
+    assert [round(s, 2) for s in scores] == [0.0, 1.0]
+    assert migrations.sequential_scans(engine) == []
+
+def test_workers_starting_together_migrate_once(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+
+    def worker(_):
+        # One engine per worker, as separate processes would have
+        return migrations.migrate(sqlalchemy.create_engine(url, connect_args={"timeout": 30}), metadata)
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(worker, range(4)))
+    assert sorted(results) == [[], [], [], [1, 2, 3, 4, 5, 6]]
@@ -0,0 +1,40 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Add backend to path; run against the deterministic local model stand-ins (no network)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
+from conversation_store import Conversation
+from prompt_builder import PromptBuilder, message_tokens
+
+@pytest.mark.asyncio
+async def test_prompt_stays_within_budget_with_a_stable_prefix():
+    conversation = Conversation("test-prompt-1")
+    for i in range(40):
+        conversation.add("assistant", f"Question {i}: tell me about project {i} in detail. " * 5)
+        conversation.add("user", f"Answer {i}: I built service {i} with queues and caches. " * 5)
+
+    builder = PromptBuilder("You are an interviewer.", budget=1500)
+    first = builder.build(conversation, "First answer.", profile="Python, Go, Postgres",
+                          excerpts=["Led the payments team"], tone="nervous")
+    assert message_tokens(first) <= 1500
+    assert [m["content"] for m in first[:2]] == ["You are an interviewer.", "Candidate resume profile:\nPython, Go, Postgres"]
+    # Per-turn context goes last, right before the utterance
+    assert "Led the payments team" in first[-2]["content"] and "nervous" in first[-2]["content"]
+    assert first[-1] == {"role": "user", "content": "First answer."}
+
+    # Over budget: older turns are folded into a summary in the background
+    assert conversation.summarizing
+    for _ in range(100):
+        if not conversation.summarizing:
+            break
+        await asyncio.sleep(0.01)
+    assert conversation.summary and 0 < conversation.summarized < len(conversation.turns)
+
+    second = builder.build(conversation, "Second answer.", profile="Python, Go, Postgres", excerpts=["Other"], tone=None)
+    third = builder.build(conversation, "Third answer.", profile="Python, Go, Postgres", excerpts=["More"], tone="calm")
+    assert second[:-2] == third[:-2]   # everything before the volatile tail is identical
+    assert second[2]["content"].startswith("Summary of the interview so far:")
+    assert message_tokens(third) <= 1500
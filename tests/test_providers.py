@@ -0,0 +1,30 @@
+import sys
+import os
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import providers
+from scoring import score_answer
+from routes.clarify_check import split_intent
+import llm_gateway
+
+@pytest.fixture
+def local(monkeypatch):
+    monkeypatch.setenv("MODEL_PROVIDER", "local")
+    monkeypatch.setenv("LOCAL_LATENCY_MS", "0")
+
+@pytest.mark.asyncio
+async def test_local_stand_ins_are_well_formed_and_deterministic(local):
+    result = await score_answer("Tell me about Acme.", "I built the billing pipeline in Python.")
+    assert result["hallucination"] == "Valid" and set(result["subscores"]) == {"relevance", "accuracy", "completeness", "clarity"}
+    assert result == await score_answer("Tell me about Acme.", "I built the billing pipeline in Python.")
+
+    intent, body = split_intent(await llm_gateway.chat([{"role": "system", "content": "INTENT: ..."}]))
+    assert intent == "other" and body in providers.LOCAL_QUESTIONS
+
+    a, b = await llm_gateway.embed(["python data pipelines", "python data pipelines at scale"])
+    assert len(a) == providers.LOCAL_EMBED_DIM and sum(x * y for x, y in zip(a, b)) > 0.5
+
+    audio = await llm_gateway.speech("Hello there, welcome.", voice="alloy")
+    assert audio.startswith(b"\xff\xfb") and len(audio) % len(providers.SILENT_MP3_FRAME) == 0
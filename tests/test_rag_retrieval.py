@@ -0,0 +1,79 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import llm_gateway
+import rag
+
+rng = np.random.default_rng(7)
+VECTORS = {}
+
+def vector_for(text):
+    if text not in VECTORS:
+        VECTORS[text] = rng.normal(size=8).tolist()
+    return VECTORS[text]
+
+def brute_force(query, texts, k=rag.TOP_K):
+    q = np.asarray(query) / np.linalg.norm(query)
+    cosine = {t: float(np.dot(q, vector_for(t)) / np.linalg.norm(vector_for(t))) for t in texts}
+    return sorted(texts, key=cosine.get, reverse=True)[:k]
+
+class FixedQuery:
+    """Stands in for the embedding cache: the query vector is chosen by the test."""
+    def __init__(self):
+        self.vector = None
+
+    async def embed_query(self, text):
+        return self.vector
+
+@pytest.fixture
+def candidates(monkeypatch):
+    async def embed(texts, model=None):
+        return [vector_for(t) for t in texts]
+
+    monkeypatch.setattr(llm_gateway, "embed", embed)
+    monkeypatch.setattr(rag, "COLLECTION_NAME", "resumes-retrieval-test")   # own vector dimension
+    query = FixedQuery()
+    monkeypatch.setattr(rag, "embedding_cache", query)
+    return query
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["matrix", "chroma"])
+async def test_retrieval_never_crosses_candidates(candidates, monkeypatch, mode):
+    monkeypatch.setattr(rag, "SEARCH_MODE", mode)
+    ada = [f"rag-{mode} Ada chunk {i}" for i in range(6)]
+    bob = [f"rag-{mode} Bob chunk {i}" for i in range(6)]
+    ada_hash, bob_hash = rag.document_hash(f"ada-{mode}".encode()), rag.document_hash(f"bob-{mode}".encode())
+    await rag.index_chunks(ada_hash, ada)
+    await rag.index_chunks(bob_hash, bob)
+    rag.remember_link(f"ada-{mode}", ada_hash)
+    rag.remember_link(f"bob-{mode}", bob_hash)
+
+    # Legacy: chunks stored before dedup carry the candidate id, and there is no link row
+    legacy = [f"rag-{mode} Cy chunk {i}" for i in range(3)]
+    rag.get_or_create_collection().upsert(
+        ids=[f"legacy-{mode}-{i}" for i in range(3)], documents=legacy,
+        metadatas=[{"candidate_id": f"cy-{mode}", "chunk_id": i} for i in range(3)],
+        embeddings=[vector_for(t) for t in legacy],
+    )
+
+    for candidate_id, texts in ((f"ada-{mode}", ada), (f"bob-{mode}", bob), (f"cy-{mode}", legacy)):
+        retriever = rag.get_retriever(candidate_id)
+        # Queries sitting right on the *other* candidates' chunks still only return this one's
+        for probe in ada + bob + legacy:
+            candidates.vector = vector_for(probe)
+            found = [d.page_content for d in await retriever.aget_relevant_documents("q")]
+            assert found and set(found) <= set(texts)
+            if mode == "matrix":
+                assert found == brute_force(candidates.vector, texts)
+
+def test_top_k_matches_brute_force_cosine():
+    texts = [f"top-k chunk {i}" for i in range(20)]
+    index = rag.CandidateIndex(texts, [np.asarray(vector_for(t)) * (i + 1) for i, t in enumerate(texts)])   # norms differ
+    for _ in range(10):
+        query = rng.normal(size=8).tolist()
+        assert index.top_k(query, k=5) == brute_force(query, texts, k=5)
+    assert rag.CandidateIndex([], np.zeros((0, 8))).top_k(query) == []
@@ -0,0 +1,26 @@
+import sys
+import os
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import rag
+import llm_gateway
+
+@pytest.mark.asyncio
+async def test_shared_chunks_are_embedded_once(monkeypatch):
+    embedded = []
+
+    async def fake_embed(texts, model=None):
+        embedded.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    monkeypatch.setattr(llm_gateway, "embed", fake_embed)
+    first, second = rag.document_hash(b"resume v1"), rag.document_hash(b"resume v2")
+
+    await rag.index_chunks(first, ["Python at Acme", "Led the data team"])
+    await rag.index_chunks(second, ["Python at Acme", "Kubernetes migration"])
+
+    assert embedded == ["Python at Acme", "Led the data team", "Kubernetes migration"]
+    assert rag.resume_indexed(first) and rag.resume_indexed(second)
+    assert not rag.resume_indexed(rag.document_hash(b"never uploaded"))
@@ -0,0 +1,98 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import llm_gateway
+import scoring
+from scoring import ScoringBatcher, score_answers
+
+@pytest.fixture
+def local(monkeypatch):
+    monkeypatch.setenv("MODEL_PROVIDER", "local")
+    monkeypatch.setenv("LOCAL_LATENCY_MS", "0")
+
+@pytest.fixture(autouse=True)
+def empty_score_cache():
+    scoring.score_cache.clear()
+
+@pytest.mark.asyncio
+async def test_concurrent_answers_share_one_rubric_request(local, monkeypatch):
+    prompts = []
+    real_chat = llm_gateway.chat
+
+    async def counting_chat(messages, **kwargs):
+        prompts.append(messages[-1]["content"])
+        return await real_chat(messages, **kwargs)
+
+    monkeypatch.setattr(llm_gateway, "chat", counting_chat)
+    batcher = ScoringBatcher(max_batch=8, window=0.05)
+
+    abandoned = asyncio.create_task(batcher.score("Q0", "dropped answer", resume="R"))
+    await asyncio.sleep(0)
+    abandoned.cancel()
+    results = await asyncio.gather(*(batcher.score(f"Q{i}", f"answer {i}", resume="R") for i in range(1, 5)))
+
+    assert len(prompts) == 1 and "dropped answer" not in prompts[0]
+    assert prompts[0].count("Resume 1:") == 1        # shared resume sent once
+    assert all(r["score"] is not None and r["hallucination"] == "Valid" for r in results)
+
+@pytest.mark.asyncio
+async def test_scoring_failures_are_explicit(monkeypatch):
+    async def broken_chat(messages, **kwargs):
+        return '{"scores": [{"id": 1, "relevance": 0.9}]}'
+
+    monkeypatch.setattr(llm_gateway, "chat", broken_chat)
+    results = await score_answers([{"question": "Q", "answer": "A"}, {"question": "Q2", "answer": "B"}])
+
+    assert [r["score"] for r in results] == [None, None]
+    assert all(r["error"] for r in results)
+
+@pytest.mark.asyncio
+async def test_repeated_answers_are_scored_once(local, monkeypatch):
+    calls = []
+    real_chat = llm_gateway.chat
+
+    async def counting_chat(messages, **kwargs):
+        calls.append(kwargs["response_format"])
+        return await real_chat(messages, **kwargs)
+
+    monkeypatch.setattr(llm_gateway, "chat", counting_chat)
+    item = {"question": "Why Python?", "answer": "Readable and fast to ship.", "resume": "R"}
+    first = await score_answers([item, dict(item), {**item, "answer": "Other"}])
+    again = await score_answers([item])
+
+    assert len(calls) == 1 and calls[0]["json_schema"]["strict"] is True
+    assert first[0] == first[1] == again[0] and first[0]["score"] is not None
+
+    await score_answers([item], use_cache=False)     # end-of-session rescore goes back to the model
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_session_scoring_runs_once(local, monkeypatch):
+    from db import database, interview_logs
+    from datetime import datetime
+    calls = []
+    real_chat = llm_gateway.chat
+
+    async def counting_chat(messages, **kwargs):
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return await real_chat(messages, **kwargs)
+
+    monkeypatch.setattr(llm_gateway, "chat", counting_chat)
+    cid = "test-score-session-1"
+    await database.connect()
+    try:
+        await database.execute(interview_logs.delete().where(interview_logs.c.candidate_id == cid))
+        await database.execute(interview_logs.insert().values([
+            {"candidate_id": cid, "question": f"Q{i}?", "answer": f"Answer number {i}.", "timestamp": datetime.utcnow()}
+            for i in range(3)
+        ]))
+        first, second = await asyncio.gather(scoring.score_session(cid), scoring.score_session(cid))
+        assert first == second and first["scored"] == 3
+        assert len(calls) == first["requests"]
+    finally:
+        await database.disconnect()
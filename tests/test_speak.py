@@ -0,0 +1,72 @@
+import sys
+import os
+import asyncio
+import pytest
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+# Add backend to path; run against the deterministic local model stand-ins (no network)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
+from main import app
+from audio_cache import AudioCache
+from phrases import TEACH_REPLY
+from providers import silent_mp3
+import llm_gateway
+import routes.speak as speak
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = AudioCache(directory=str(tmp_path), max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(speak, "audio_cache", cache)
+    return cache
+
+async def post(path, text):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post(path, json={"text": text, "voice": "alloy"})
+        assert resp.status_code == 200
+        return resp
+
+def test_split_sentences_keeps_abbreviations_and_short_fragments_attached():
+    assert speak.split_sentences("") == [] and speak.split_sentences("  \n ") == []
+    assert speak.split_sentences("Use a cache, e.g. Redis, for that. Why did you pick it?") == [
+        "Use a cache, e.g. Redis, for that.", "Why did you pick it?"]
+    # Tiny fragments join the next sentence, or the previous one at the end
+    assert speak.split_sentences("Great. Tell me about the rollout. Thanks!") == [
+        "Great. Tell me about the rollout. Thanks!"]
+    assert speak.split_sentences("Great. Tell me about the rollout!\nHow long did it take?") == [
+        "Great. Tell me about the rollout!", "How long did it take?"]
+    assert speak.split_sentences("Okay") == ["Okay"]
+
+@pytest.mark.asyncio
+async def test_stream_returns_each_sentence_in_order(cache):
+    text = "Thanks for walking me through it. What would you change next time?"
+    resp = await post("/speak/stream", text)
+    assert resp.headers["content-type"] == "audio/mpeg"
+    assert resp.content == b"".join(silent_mp3(s) for s in speak.split_sentences(text))
+    assert cache.stats()["entries"] == 2   # sentences are cached individually, shared with /speak
+
+@pytest.mark.asyncio
+async def test_static_phrases_are_pinned_on_first_synthesis(cache):
+    await post("/speak", TEACH_REPLY)
+    await post("/speak", "Tell me about your last project.")
+    assert cache.stats()["pinned"] == 1 and cache.stats()["entries"] == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_synthesis_per_model(cache, monkeypatch):
+    models = []
+    real_speech = llm_gateway.speech
+
+    async def speech(text, voice, model=llm_gateway.TTS_MODEL):
+        models.append(model)
+        return await real_speech(text, voice, model=model)
+
+    monkeypatch.setattr(llm_gateway, "speech", speech)
+    bodies = await asyncio.gather(*(post("/speak", "What did you learn from it?") for _ in range(4)))
+    assert len({b.content for b in bodies}) == 1 and models == [llm_gateway.TTS_MODEL]
+
+    # Audio from another model is never served for the new one
+    monkeypatch.setattr(llm_gateway, "TTS_MODEL", "tts-1-hd")
+    await post("/speak", "What did you learn from it?")
+    assert models[-1] == "tts-1-hd" and cache.stats()["entries"] == 2
@@ -0,0 +1,84 @@
+import sys
+import os
+import asyncio
+import pytest
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+# Add backend to path; run against the deterministic local model stand-ins (no network)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("MODEL_PROVIDER", "local")
+from main import app
+from db import database, conversation_turns
+from conversation_store import conversation_store
+from audio_cache import audio_cache
+from speculation import speculator, similarity
+
+def test_similarity_ignores_case_and_punctuation():
+    assert similarity("I led the payments migration", "I led the payments migration.") == 1.0
+    assert similarity("I led the payments", "Actually, I'd rather skip this one") < 0.5
+
+@pytest.mark.asyncio
+async def test_partial_transcript_is_drafted_ahead(tmp_path, monkeypatch):
+    sid = "test-speculation-1"
+    monkeypatch.setattr(audio_cache, "directory", str(tmp_path))
+    await database.connect()
+    try:
+        await database.execute(conversation_turns.delete().where(conversation_turns.c.session_id == sid))
+        conversation_store.forget(sid)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            async def ask(text, partial=False):
+                resp = await ac.post("/interview/ask", json={"user_input": text, "candidate_id": sid,
+                                                             "session_id": sid, "partial": partial})
+                assert resp.status_code == 200
+                return resp.json()
+
+            for text in ("[INIT]", "Backend engineer.", "Five years of Python services."):
+                await ask(text)
+            before = speculator.stats()
+
+            # Close enough: the draft is committed; the final utterance is what gets stored
+            assert (await ask("I led the payments migration", partial=True))["speculating"]
+            await asyncio.sleep(0.05)
+            hit = await ask("I led the payments migration.")
+            assert hit["speculated"] and hit["answer"]
+            conversation = await conversation_store.get(sid)
+            assert conversation.turns[-2]["content"] == "I led the payments migration."
+
+            # Changed course: the draft is cancelled and the turn runs as usual
+            await ask("I mostly worked on", partial=True)
+            miss = await ask("Let me talk about my open source work instead.")
+            assert not miss["speculated"]
+
+            stats = (await ac.get("/interview/speculation-stats")).json()
+            assert stats["hits"] == before["hits"] + 1 and stats["misses"] == before["misses"] + 1
+            assert stats["saved_ms_total"] > before["saved_ms_total"]
+    finally:
+        await database.disconnect()
+
+@pytest.mark.asyncio
+async def test_a_miss_cancels_follow_up_work():
+    from speculation import Speculator
+    speculator_ = Speculator()
+    prepared = []
+
+    async def draft():
+        return {"answer": "Next?"}
+
+    async def prepare(result):
+        await asyncio.sleep(0.05)
+        prepared.append(result)
+
+    speculator_.start("s", "I built a queue", 0, draft, prepare)
+    await asyncio.sleep(0.01)
+    assert await speculator_.take("s", "Something else entirely", 0) is None
+    await asyncio.sleep(0.08)
+    assert not prepared and speculator_.stats()["misses"] == 1
+
+    # A hit returns the draft without waiting for its follow-up
+    speculator_.start("s", "I built a queue", 0, draft, prepare)
+    assert await asyncio.wait_for(speculator_.take("s", "I built a queue.", 0), 0.03) == {"answer": "Next?"}
+    await asyncio.sleep(0.08)
+    assert len(prepared) == 1   # kept running after the hit
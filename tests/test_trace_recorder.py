@@ -0,0 +1,31 @@
+import sys
+import os
+import json
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+from trace_recorder import TraceRecorder
+
+@pytest.mark.asyncio
+async def test_traces_keep_shape_but_not_content(tmp_path):
+    rec = TraceRecorder(directory=str(tmp_path), salt="test")
+    rec.keep_verbatim(["Tell me about yourself."])
+    ask = {"user_input": "I worked at Acme on billing", "session_id": "cand-42",
+           "history": [{"role": "assistant", "content": "Tell me about yourself."}]}
+
+    rec.record("cand-42", "POST", "/interview/ask", 200, 12.5, rec.shape("/interview/ask", ask, b""))
+    rec.record("cand-42", "POST", "/interview/ask", 200, 9.0,
+               rec.shape("/interview/ask", {**ask, "user_input": "[SKIP]"}, b""))
+    rec.record("cand-42", "POST", "/speak", 200, 3.0,
+               rec.shape("/speak", {"text": "Tell me about yourself."}, b""))
+    assert await rec.flush() == 3
+
+    raw = open(rec.path).read()
+    assert "cand-42" not in raw and "Acme" not in raw
+    first, skip, speak = [json.loads(line) for line in raw.splitlines()]
+    assert first["session"] == skip["session"] and skip["t"] >= first["t"] == 0
+    assert first["shape"]["input"]["chars"] == len(ask["user_input"])
+    assert first["shape"]["history_turns"] == 1
+    assert skip["shape"]["input"]["text"] == "[SKIP]"
+    assert speak["shape"]["text"] == "Tell me about yourself."